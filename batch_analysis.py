@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Offline analysis of recorded sessions across a pool of worker processes.
+
+Takes video files, image directories and WAV files (or directories holding
+them), splits each recording into chunks of --chunk-seconds and runs the
+gesture and object stages on video chunks and speech recognition on audio
+chunks, one chunk per task:
+
+    python batch_analysis.py recordings/ --output analysis/
+    python batch_analysis.py a.mp4 a.wav --modalities speech --workers 4
+    python batch_analysis.py recordings/ --output analysis/ --restart   # after a model update
+    python batch_analysis.py recordings/ --workers 2 --batch 8         # batched YOLO / Whisper calls
+
+Every finished chunk is written to OUTPUT/parts/ in one atomic step, so an
+interrupted run picks up where it stopped when started again with the same
+settings. When all chunks are done their events are merged, in recording
+and time order, into OUTPUT/events.jsonl:
+
+    {"t": 62.4, "type": "gesture", "source": "day1/cam.mp4", "gesture": "VOLUME_UP"}
+    {"t": 64.0, "type": "transcript", "source": "day1/mic.wav", "text": "volume up"}
+
+Times are seconds into the recording. Gesture and presence state starts
+fresh in each chunk, so an object in view across a chunk boundary is
+reported as appearing again at the start of the next chunk. The audio track
+of a video file is not decoded; export it to WAV next to the video.
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import multiprocessing
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+# Caps the OpenMP/BLAS thread pools, so it has to come before numpy
+from thread_budget import THREAD_BUDGET, BLAS_ENV_VARS, physical_cores
+import numpy as np
+from model_loader import timed_import, lazy_import, warm_up_hands
+from detectors import create_detector, fixed_detector_name
+from speech_backends import create_backend, SAMPLE_RATE
+from presence import PresenceTracker
+from gestures import analyze_gesture
+from sources import read_wav, wav_duration, IMAGE_EXTENSIONS
+from pipeline import MODALITIES, SEGMENT_SECONDS, RateLimiter, parse_modalities
+
+cv2 = lazy_import("cv2")
+
+MANIFEST_VERSION = 2
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v")
+AUDIO_EXTENSIONS = (".wav",)
+IMAGE_DIR_FPS = 10.0
+
+WorkUnit = namedtuple("WorkUnit", ["id", "path", "source", "kind", "start", "end"])
+BatchReport = namedtuple("BatchReport", ["units", "done", "skipped", "failed", "events", "output"])
+
+
+def log(message):
+    print(f"[batch] {message}", file=sys.stderr, flush=True)
+
+
+def find_recordings(paths):
+    """(path, kind) for every video, image directory and WAV under paths"""
+    found = []
+    for path in paths:
+        if os.path.isfile(path):
+            kind = recording_kind(path)
+            if kind is None:
+                raise ValueError(f"{path} is not a video or WAV file")
+            found.append((path, kind))
+            continue
+        if not os.path.isdir(path):
+            raise ValueError(f"{path} does not exist")
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            if any(name.lower().endswith(IMAGE_EXTENSIONS) for name in files):
+                found.append((root, "frames"))
+            for name in sorted(files):
+                kind = recording_kind(name)
+                if kind:
+                    found.append((os.path.join(root, name), kind))
+    return found
+
+
+def recording_kind(path):
+    name = path.lower()
+    if name.endswith(VIDEO_EXTENSIONS):
+        return "video"
+    if name.endswith(AUDIO_EXTENSIONS):
+        return "audio"
+    return None
+
+
+def image_paths(directory):
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+
+
+def recording_duration(path, kind):
+    if kind == "audio":
+        return wav_duration(path)
+    if kind == "frames":
+        return len(image_paths(path)) / IMAGE_DIR_FPS
+    cap = cv2.VideoCapture(path)
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        return cap.get(cv2.CAP_PROP_FRAME_COUNT) / fps
+    finally:
+        cap.release()
+
+
+def unit_id(path, start, end):
+    """Stable ID of one chunk; a re-recorded file gets new IDs"""
+    stat = os.stat(path)
+    key = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}|{start:.3f}|{end:.3f}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+
+
+def plan_units(recordings, chunk_seconds, modalities, root=None):
+    """Split recordings into chunks the selected modalities have work for"""
+    wanted = {"video": {"gesture", "objects"}, "frames": {"gesture", "objects"}, "audio": {"speech"}}
+    # Whole speech segments per chunk, so chunking does not move segment boundaries
+    if chunk_seconds:
+        chunk_seconds = max(SEGMENT_SECONDS, chunk_seconds - chunk_seconds % SEGMENT_SECONDS)
+    units = []
+    for path, kind in recordings:
+        if not wanted[kind] & set(modalities):
+            continue
+        duration = recording_duration(path, kind)
+        source = os.path.relpath(path, root) if root else path
+        step = chunk_seconds or duration or 1.0
+        start = 0.0
+        while start < duration:
+            end = min(duration, start + step)
+            units.append(WorkUnit(unit_id(path, start, end), path, source, kind, start, end))
+            start = end
+    return units
+
+
+# Worker side: models load once per process and stay for every chunk it gets
+
+_worker = {}
+
+
+def _init_worker(settings):
+    _worker.clear()
+    _worker["settings"] = settings
+
+
+def _model(name):
+    if name not in _worker:
+        settings = _worker["settings"]
+        if name == "hands":
+            mp = timed_import("mediapipe")
+            hands = mp.solutions.hands.Hands(max_num_hands=1, min_detection_confidence=0.7,
+                                             min_tracking_confidence=0.5)
+            warm_up_hands(hands)
+            _worker[name] = hands
+        elif name == "yolo":
+            _worker[name] = create_detector(settings["detector"]).load()
+        else:
+            backend = create_backend(settings["speech_backend"])
+            backend.load()
+            _worker[name] = backend
+        THREAD_BUDGET.apply_libraries()
+    return _worker[name]
+
+
+def iter_frames(unit):
+    """(seconds into the recording, BGR frame) for one video chunk"""
+    if unit.kind == "frames":
+        paths = image_paths(unit.path)
+        first, last = int(round(unit.start * IMAGE_DIR_FPS)), int(round(unit.end * IMAGE_DIR_FPS))
+        for index in range(first, min(last, len(paths))):
+            frame = cv2.imread(paths[index])
+            if frame is not None:
+                yield index / IMAGE_DIR_FPS, frame
+        return
+    cap = cv2.VideoCapture(unit.path)
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        first, last = int(round(unit.start * fps)), int(round(unit.end * fps))
+        cap.set(cv2.CAP_PROP_POS_FRAMES, first)
+        for index in range(first, last):
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield index / fps, frame
+    finally:
+        cap.release()
+
+
+def analyze_video(unit, settings, emit):
+    modalities = settings["modalities"]
+    gesture_limit = RateLimiter(settings["gesture_fps"])
+    object_limit = RateLimiter(settings["object_fps"])
+    presence = PresenceTracker()
+    last_gesture = None
+    batch = []
+
+    def detect_batch():
+        # Detection lags gestures by up to one batch; events are sorted when the chunk is written
+        for (t, _), detections in zip(batch, _model("yolo").detect_batch([frame for _, frame in batch])):
+            for event in presence.update(detections, now=t):
+                emit("object", t, event=event.kind, name=event.name, count=event.count)
+        batch.clear()
+
+    for t, frame in iter_frames(unit):
+        if "gesture" in modalities and gesture_limit.ready(t):
+            # Same mirror view as the GUI, so left/right gestures match
+            results = _model("hands").process(cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB))
+            gesture = analyze_gesture(results.multi_hand_landmarks[0]) if results.multi_hand_landmarks else None
+            if gesture != last_gesture:
+                last_gesture = gesture
+                if gesture:
+                    emit("gesture", t, gesture=gesture)
+        if "objects" in modalities and object_limit.ready(t):
+            batch.append((t, frame))
+            if len(batch) >= settings["batch_size"]:
+                detect_batch()
+    if batch:
+        detect_batch()
+
+
+def analyze_audio(unit, settings, emit):
+    samples = read_wav(unit.path, SAMPLE_RATE, unit.start, unit.end)
+    segment = SAMPLE_RATE * SEGMENT_SECONDS
+    batch = []
+
+    def transcribe_batch():
+        for (t, _), text in zip(batch, _model("speech").transcribe_batch([audio for _, audio in batch])):
+            if text:
+                emit("transcript", t, text=text)
+        batch.clear()
+
+    for offset in range(0, samples.size, segment):
+        audio = samples[offset:offset + segment]
+        if audio.size < segment:
+            audio = np.concatenate([audio, np.zeros(segment - audio.size, dtype=np.float32)])
+        if np.mean(audio ** 2) < 0.001:
+            continue
+        batch.append((unit.start + offset / SAMPLE_RATE, audio))
+        if len(batch) >= settings["batch_size"]:
+            transcribe_batch()
+    if batch:
+        transcribe_batch()
+
+
+def process_unit(unit, parts_dir):
+    """Analyze one chunk and write its events; returns the number of events"""
+    settings = _worker["settings"]
+    events = []
+
+    def emit(kind, t, **fields):
+        event = {"t": round(t, 3), "type": kind, "source": unit.source}
+        event.update(fields)
+        events.append(event)
+
+    if unit.kind == "audio":
+        analyze_audio(unit, settings, emit)
+    else:
+        analyze_video(unit, settings, emit)
+
+    # The part file only appears once complete, which is what resuming relies on
+    events.sort(key=lambda event: event["t"])
+    path = os.path.join(parts_dir, f"{unit.id}.jsonl")
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        for event in events:
+            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+    os.replace(path + ".tmp", path)
+    return len(events)
+
+
+# Parent side
+
+def check_manifest(output, settings, restart=False):
+    """Make sure OUTPUT holds results for these settings (or start it over)"""
+    parts_dir = os.path.join(output, "parts")
+    manifest_path = os.path.join(output, "manifest.json")
+    manifest = {"version": MANIFEST_VERSION, "settings": settings}
+    if os.path.exists(manifest_path) and not restart:
+        with open(manifest_path, encoding="utf-8") as f:
+            existing = json.load(f)
+        if existing != manifest:
+            raise ValueError(f"{output} holds results from different settings; "
+                             f"use another --output or --restart to discard them")
+    if restart and os.path.isdir(parts_dir):
+        for name in os.listdir(parts_dir):
+            os.remove(os.path.join(parts_dir, name))
+    os.makedirs(parts_dir, exist_ok=True)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return parts_dir
+
+
+def merge_parts(units, parts_dir, path):
+    """Concatenate the finished chunks, in plan order, into one JSONL file"""
+    count = 0
+    with open(path + ".tmp", "w", encoding="utf-8") as out:
+        for unit in units:
+            part = os.path.join(parts_dir, f"{unit.id}.jsonl")
+            if not os.path.exists(part):
+                continue
+            with open(part, encoding="utf-8") as f:
+                for line in f:
+                    out.write(line)
+                    count += 1
+    os.replace(path + ".tmp", path)
+    return count
+
+
+def run_batch(paths, output, modalities=MODALITIES, workers=None, chunk_seconds=300, detector=None,
+              speech_backend=None, gesture_fps=15, object_fps=10, batch_size=1, restart=False):
+    """Analyze every recording under paths into output/events.jsonl; returns a BatchReport"""
+    settings = {
+        "modalities": sorted(modalities),
+        # Never the adaptive ladder: chunks must not depend on how loaded the pool was
+        "detector": fixed_detector_name(detector),
+        "speech_backend": speech_backend,
+        "gesture_fps": gesture_fps,
+        "object_fps": object_fps,
+        "chunk_seconds": chunk_seconds,
+        "batch_size": max(1, batch_size),
+    }
+    parts_dir = check_manifest(output, settings, restart)
+    recordings = find_recordings(paths)
+    root = os.path.commonpath([os.path.abspath(path) for path in paths]) if paths else None
+    if root and os.path.isfile(root):
+        root = os.path.dirname(root)
+    units = sorted(plan_units(recordings, chunk_seconds, modalities, root), key=lambda u: (u.source, u.start))
+    done = {name[:-len(".jsonl")] for name in os.listdir(parts_dir) if name.endswith(".jsonl")}
+    todo = [unit for unit in units if unit.id not in done]
+    log(f"{len(recordings)} recordings, {len(units)} chunks, {len(units) - len(todo)} already done")
+
+    workers = max(1, min(workers or physical_cores(), len(todo) or 1))
+    failed = 0
+    if todo:
+        # Each worker runs its models single-handed, so it gets a share of the cores
+        threads = str(max(1, physical_cores() // workers))
+        saved = {var: os.environ.get(var) for var in BLAS_ENV_VARS + ["MULTIMODAL_CPU_THREADS"]}
+        os.environ.update({var: threads for var in saved})
+        started = time.monotonic()
+        try:
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                                     initargs=(settings,)) as pool:
+                futures = {pool.submit(process_unit, unit, parts_dir): unit for unit in todo}
+                for finished, future in enumerate(as_completed(futures), 1):
+                    unit = futures[future]
+                    try:
+                        count = future.result()
+                    except Exception as e:
+                        failed += 1
+                        log(f"❌ {unit.source} {unit.start:.0f}-{unit.end:.0f} s: {e}")
+                        continue
+                    elapsed = time.monotonic() - started
+                    eta = elapsed / finished * (len(todo) - finished)
+                    log(f"{finished}/{len(todo)} {unit.source} {unit.start:.0f}-{unit.end:.0f} s: "
+                        f"{count} events (ETA {eta:.0f} s)")
+        finally:
+            for var, value in saved.items():
+                if value is None:
+                    os.environ.pop(var, None)
+                else:
+                    os.environ[var] = value
+
+    events_path = os.path.join(output, "events.jsonl")
+    events = merge_parts(units, parts_dir, events_path)
+    report = BatchReport(len(units), len(todo) - failed, len(units) - len(todo), failed, events, events_path)
+    log(f"{events} events from {len(units) - failed}/{len(units)} chunks written to {events_path}")
+    if failed:
+        log(f"⚠️ {failed} chunks failed; run again to retry them")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze recorded sessions offline with a process pool")
+    parser.add_argument("paths", nargs="+", help="video files, WAV files, image directories or folders of them")
+    parser.add_argument("--output", default="analysis", help="directory for progress and events.jsonl")
+    parser.add_argument("--modalities", type=parse_modalities, default=list(MODALITIES),
+                        help="comma-separated list of gesture, speech, objects (default: all)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: physical cores)")
+    parser.add_argument("--chunk-seconds", type=float, default=300, help="recording seconds per work unit (0 = whole file)")
+    parser.add_argument("--speech-backend", default=None, help="speech backend name")
+    parser.add_argument("--detector", default=None,
+                        help="object detector name (adaptive runs its ladder backend at a fixed size)")
+    parser.add_argument("--gesture-fps", type=float, default=15, help="max gesture frames per second (0 = every frame)")
+    parser.add_argument("--object-fps", type=float, default=10, help="max detector frames per second (0 = every frame)")
+    parser.add_argument("--batch", type=int, default=1, metavar="N",
+                        help="frames / speech segments per detector or Whisper call")
+    parser.add_argument("--restart", action="store_true", help="discard earlier progress in --output")
+    args = parser.parse_args(argv)
+
+    try:
+        report = run_batch(
+            args.paths, args.output,
+            modalities=args.modalities,
+            workers=args.workers,
+            chunk_seconds=args.chunk_seconds,
+            detector=args.detector,
+            speech_backend=args.speech_backend,
+            gesture_fps=args.gesture_fps,
+            object_fps=args.object_fps,
+            batch_size=args.batch,
+            restart=args.restart,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Micro-batching of object detection and speech recognition calls.
+
+Callers still ask for one frame or one audio segment at a time:
+
+    detect = MicroBatcher(detector.detect_batch, max_batch=8, run=...)
+    detections = await detect(frame)
+
+The batcher holds a request for at most max_wait seconds to see whether
+more arrive, then runs everything it has as one detect_batch() /
+transcribe_batch() call and hands each caller its own result. Only one
+batch per model runs at a time, and requests that arrive meanwhile form the
+next batch. With a single camera that keeps up, batches stay at one item
+and cost only the wait; when the model falls behind (several cameras, a
+replay at --speed 0, an offline backlog) batches grow towards max_batch and
+the model works through more frames per second.
+
+Batching is off unless asked for: pipeline.py --batch N or
+MULTIMODAL_BATCH_SIZE sets max_batch, MULTIMODAL_BATCH_WAIT_MS the wait
+(default 10 ms). Batch sizes are recorded in multimodal_batch_size.
+"""
+
+import os
+import asyncio
+from metrics import REGISTRY
+from tracing import TRACER
+
+BATCH_SIZE = int(os.environ.get("MULTIMODAL_BATCH_SIZE", "1"))
+BATCH_WAIT = float(os.environ.get("MULTIMODAL_BATCH_WAIT_MS", "10")) / 1000
+
+BATCH_SIZES = REGISTRY.histogram(
+    "multimodal_batch_size", "Items per batched inference call", ["model"], buckets=(1, 2, 4, 8, 16, 32, 64))
+
+
+class MicroBatcher:
+    """Collects single-item requests from the event loop into batched calls
+
+    batch_fn takes a list of items and returns a list of results in the same
+    order. run(batch_fn, items, trace) awaits the call; by default it goes to
+    the loop's default executor, the pipeline routes it through its scheduler.
+    """
+
+    def __init__(self, batch_fn, max_batch=BATCH_SIZE, max_wait=BATCH_WAIT, run=None, name="model"):
+        self.batch_fn = batch_fn
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait
+        self.run = run or self._run_in_executor
+        self.name = name
+        self.pending = []
+        self.busy = False
+        self.timer = None
+        self.batches = 0
+
+    @staticmethod
+    async def _run_in_executor(batch_fn, items, trace=None):
+        return await asyncio.get_running_loop().run_in_executor(None, batch_fn, items)
+
+    async def __call__(self, item, trace=None):
+        """The result for one item, computed as part of a batch"""
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((item, future, trace, TRACER.clock()))
+        if len(self.pending) >= self.max_batch:
+            self._flush()
+        elif self.timer is None and not self.busy:
+            self.timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if self.busy or not self.pending:
+            return
+        batch, self.pending = self.pending[:self.max_batch], self.pending[self.max_batch:]
+        self.busy = True
+        asyncio.get_running_loop().create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch):
+        started = TRACER.clock()
+        for _, _, trace, queued in batch:
+            TRACER.record(trace, "batch_wait", queued, started, model=self.name, size=len(batch))
+        try:
+            results = await self.run(self.batch_fn, [item for item, _, _, _ in batch], batch[0][2])
+            if len(results) != len(batch):
+                raise RuntimeError(f"{self.name}: batch of {len(batch)} gave {len(results)} results")
+        except Exception as e:
+            for _, future, _, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future, _, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            # Cancelled mid-run (CancelledError is not an Exception): release the callers
+            for _, future, _, _ in batch:
+                if not future.done():
+                    future.cancel()
+            BATCH_SIZES.observe(len(batch), model=self.name)
+            self.batches += 1
+            self.busy = False
+            # Whatever queued up while this batch ran has waited long enough
+            if self.pending:
+                self._flush()
+
+
+def scheduled(scheduler, modality, executor):
+    """A MicroBatcher run function that takes a scheduler slot per batch"""
+
+    async def run(batch_fn, items, trace=None):
+        return await scheduler.run(modality, executor, batch_fn, items, trace=trace)
+
+    return run
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the GUI entry points.
+
+Each app module is imported in a fresh interpreter. The import has to
+finish within the time budget and must not pull in any heavy dependency;
+those are only imported when the modality that needs them starts.
+With --window the app window is also built and drawn once (needs a display).
+
+    python bench_startup.py
+    python bench_startup.py --budget 0.3 --window
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+DEFAULT_BUDGET = 0.5
+
+# Dependencies that must stay out of the startup path
+HEAVY_MODULES = [
+    "torch", "ultralytics", "mediapipe", "whisper", "faster_whisper", "onnxruntime",
+    "cv2", "pyautogui", "screen_brightness_control", "scipy", "sounddevice",
+    "speech_recognition", "pyttsx3", "PIL.ImageTk",
+]
+
+APP_MODULES = [("main", "MultimodalApp"), ("myfile", "EVA")]
+
+PROBE = """
+import json, os, sys, time
+start = time.perf_counter()
+import {module}
+result = {{"import": time.perf_counter() - start, "modules": sorted(sys.modules), "window": None}}
+if {window}:
+    import tkinter as tk
+    start = time.perf_counter()
+    root = tk.Tk()
+    app = {module}.{app_class}(root)
+    root.update()
+    result["window"] = time.perf_counter() - start
+print(json.dumps(result), flush=True)
+os._exit(0)
+"""
+
+
+def measure(module, app_class, window=False):
+    """Import (and optionally show) one app in a fresh interpreter"""
+    code = PROBE.format(module=module, app_class=app_class, window=window)
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, timeout=120)
+    if proc.returncode != 0 or not proc.stdout.strip():
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "no output")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the startup import budget")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET, help="import budget in seconds")
+    parser.add_argument("--window", action="store_true", help="also time building the window")
+    args = parser.parse_args()
+
+    print("⏱️ Startup Benchmark")
+    print("=" * 40)
+    passed = True
+    for module, app_class in APP_MODULES:
+        try:
+            result = measure(module, app_class, args.window)
+        except Exception as e:
+            print(f"❌ {module}: could not start - {e}")
+            passed = False
+            continue
+
+        heavy = [name for name in HEAVY_MODULES if name in result["modules"]]
+        ok = result["import"] <= args.budget and not heavy
+        passed = passed and ok
+        line = f"{'✅' if ok else '❌'} {module}: import {result['import']:.3f} s (budget {args.budget:.2f} s)"
+        if result["window"] is not None:
+            line += f", window {result['window']:.3f} s"
+        print(line)
+        if heavy:
+            print(f"   heavy modules imported at startup: {', '.join(heavy)}")
+
+    print("=" * 40)
+    print("🎉 Startup within budget" if passed else "⚠️ Startup budget exceeded")
+    return passed
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
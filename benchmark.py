@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+Throughput and latency benchmarks for every pipeline stage.
+
+Each stage runs on recorded input (--video, --audio) or on seeded synthetic
+input, so two runs on the same machine see the same work:
+
+    gesture        analyze_gesture on hand landmarks
+    hands          MediaPipe hand tracking on a frame
+    letterbox      YOLO pre-processing (letterbox + tensor layout)
+    yolo_decode    YOLO post-processing (score filter + NMS) on a raw output
+    detector       full object detection with the configured detector
+    audio_segment  streaming ASR windowing on 100 ms blocks (stub recognizer)
+    speech         the configured speech backend on 2 s segments
+    display        BGR -> RGB, resize and PIL conversion of a frame
+    pipeline       the headless pipeline replaying the input end to end
+
+For every stage the report has FPS, p50/p95/p99 latency, CPU time per item
+and peak RSS. Stages whose dependencies are missing are reported as skipped.
+By default each stage runs in a fresh interpreter so peak RSS belongs to
+that stage alone. Results are saved as JSON and can be compared against an
+earlier run; a stage that got worse by more than --tolerance fails the run.
+
+    python benchmark.py
+    python benchmark.py --stages gesture,yolo_decode --iterations 500
+    python benchmark.py --audio clip.wav --output results/before.json
+    python benchmark.py --compare results/before.json --tolerance 0.15
+"""
+
+import os
+import sys
+import json
+import time
+import wave
+import platform
+import argparse
+import subprocess
+import tempfile
+from collections import namedtuple
+# Caps the OpenMP/BLAS thread pools, so it has to come before numpy
+from thread_budget import THREAD_BUDGET
+import numpy as np
+
+try:
+    import resource
+except ImportError:     # Windows
+    resource = None
+
+RESULTS_VERSION = 1
+SEED = 1234
+# Latency changes smaller than this are timer noise, never a regression
+MIN_DELTA_MS = 0.05
+
+BenchmarkOptions = namedtuple(
+    "BenchmarkOptions", ["iterations", "warmup", "video", "audio", "detector", "speech_backend"]
+)
+DEFAULT_OPTIONS = BenchmarkOptions(iterations=200, warmup=5, video=None, audio=None, detector=None,
+                                   speech_backend=None)
+
+# (metric, higher is better)
+COMPARED_METRICS = [
+    ("fps", True),
+    ("p50_ms", False),
+    ("p95_ms", False),
+    ("p99_ms", False),
+    ("cpu_ms_per_item", False),
+    ("peak_rss_mb", False),
+]
+
+
+class StageSkipped(Exception):
+    """A stage cannot run here (missing dependency or input)"""
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    import psutil
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+
+def summarize(latencies, items, wall, cpu):
+    """Reduce per-call latencies (seconds) and totals to the reported metrics"""
+    latencies = np.asarray(latencies, dtype=np.float64) * 1000
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if latencies.size else (0.0, 0.0, 0.0)
+    return {
+        "items": items,
+        "fps": items / wall if wall > 0 else 0.0,
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "cpu_ms_per_item": 1000 * cpu / items if items else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+# ---------------------------------------------------------------- inputs
+
+def synthetic_frames(count=8, shape=(480, 640, 3)):
+    rng = np.random.default_rng(SEED)
+    return [rng.integers(0, 256, shape, dtype=np.uint8) for _ in range(count)]
+
+
+def load_frames(options, count=8):
+    """Frames from --video, or seeded noise frames"""
+    if options.video is None:
+        return synthetic_frames(count)
+    from sources import open_video_source
+    try:
+        source = open_video_source(options.video, speed=0, start_time=0.0)
+    except ImportError as e:
+        raise StageSkipped(f"cannot read {options.video}: {e}")
+    frames = []
+    try:
+        while len(frames) < count:
+            ret, frame = source.read()
+            if not ret:
+                if source.finished:
+                    break
+                continue
+            frames.append(frame)
+    finally:
+        source.release()
+    if not frames:
+        raise StageSkipped(f"no frames in {options.video}")
+    return frames
+
+
+def load_audio(options, seconds=6.0):
+    """Mono 16 kHz samples from --audio, or seeded noise with speech-like energy"""
+    from sources import read_wav, SAMPLE_RATE
+    if options.audio is not None:
+        return read_wav(options.audio, SAMPLE_RATE)
+    rng = np.random.default_rng(SEED)
+    return rng.uniform(-0.3, 0.3, int(seconds * SAMPLE_RATE)).astype(np.float32)
+
+
+def synthetic_landmarks(count=32):
+    """Hand landmarks cycling through open hand, pinch and fist shapes"""
+    from inference_daemon import landmarks_from_points
+    rng = np.random.default_rng(SEED)
+    hands = []
+    for i in range(count):
+        points = rng.uniform(0.3, 0.7, (21, 3))
+        if i % 3 == 0:
+            points[[8, 12, 16, 20], 1] = 0.2
+        elif i % 3 == 1:
+            points[8] = points[4]
+        hands.append(landmarks_from_points(points.tolist()))
+    return hands
+
+
+def synthetic_yolo_output(classes=80, anchors=8400, boxes=40):
+    """A raw (1, 4 + classes, anchors) YOLOv8 output with a few confident boxes"""
+    rng = np.random.default_rng(SEED)
+    output = np.zeros((1, 4 + classes, anchors), dtype=np.float32)
+    output[0, 0:2] = rng.uniform(0, 640, (2, anchors))
+    output[0, 2:4] = rng.uniform(10, 200, (2, anchors))
+    output[0, 4:] = rng.uniform(0, 0.3, (classes, anchors))
+    hits = rng.choice(anchors, boxes, replace=False)
+    output[0, 4 + rng.integers(0, classes, boxes), hits] = rng.uniform(0.6, 0.95, boxes)
+    return output
+
+
+def write_wav(path, samples, sample_rate=16000):
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes((np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes())
+
+
+# ---------------------------------------------------------------- stages
+# Each setup function returns step(i), which processes one item; a step may
+# return how many items it processed when that is not one.
+
+def setup_gesture(options):
+    from gestures import analyze_gesture
+    hands = synthetic_landmarks()
+    return lambda i: analyze_gesture(hands[i % len(hands)])
+
+
+def setup_hands(options):
+    try:
+        from model_loader import timed_import, warm_up_hands
+        mp = timed_import("mediapipe")
+    except ImportError as e:
+        raise StageSkipped(str(e))
+    hands = mp.solutions.hands.Hands(max_num_hands=1, min_detection_confidence=0.7, min_tracking_confidence=0.5)
+    frames = [np.ascontiguousarray(frame[..., ::-1]) for frame in load_frames(options)]
+    warm_up_hands(hands, frames[0].shape)
+    return lambda i: hands.process(frames[i % len(frames)])
+
+
+def setup_letterbox(options):
+    from detectors import OnnxDetector
+    detector = OnnxDetector()
+    frames = load_frames(options)
+    return lambda i: detector.preprocess(frames[i % len(frames)])
+
+
+def setup_yolo_decode(options):
+    from detectors import OnnxDetector
+    detector = OnnxDetector()
+    output = synthetic_yolo_output()
+    _, scale, pad = detector.preprocess(synthetic_frames(1)[0])
+    return lambda i: detector.postprocess(output, scale, pad, (480, 640, 3))
+
+
+def setup_detector(options):
+    from detectors import create_detector, DetectorError
+    frames = load_frames(options)
+    try:
+        detector = create_detector(options.detector)
+        detector.load()
+        detector.warmup(frames[0].shape)
+    except (ImportError, DetectorError) as e:
+        raise StageSkipped(str(e))
+    return lambda i: detector.detect(frames[i % len(frames)])
+
+
+def setup_audio_segment(options):
+    from speech_backends import StubBackend, SAMPLE_RATE
+    from streaming_asr import StreamingTranscriber
+    audio = load_audio(options)
+    block = SAMPLE_RATE // 10
+    blocks = [audio[start:start + block] for start in range(0, audio.size - block + 1, block)]
+    transcriber = StreamingTranscriber(StubBackend(["turn the volume up"]))
+
+    def step(i):
+        transcriber.feed(blocks[i % len(blocks)])
+        transcriber.step()
+    return step
+
+
+def setup_speech(options):
+    from speech_backends import create_backend, SAMPLE_RATE
+    audio = load_audio(options)
+    segment = 2 * SAMPLE_RATE
+    segments = [audio[start:start + segment] for start in range(0, audio.size - segment + 1, segment)]
+    if not segments:
+        raise StageSkipped("audio shorter than one 2 s segment")
+    try:
+        backend = create_backend(options.speech_backend)
+        backend.load()
+        backend.warmup()
+    except ImportError as e:
+        raise StageSkipped(str(e))
+    return lambda i: backend.transcribe(segments[i % len(segments)])
+
+
+def setup_display(options):
+    try:
+        from model_loader import timed_import
+        cv2 = timed_import("cv2")
+        Image = timed_import("PIL.Image")
+    except ImportError as e:
+        raise StageSkipped(str(e))
+    frames = load_frames(options)
+
+    def step(i):
+        frame = cv2.resize(frames[i % len(frames)], (640, 480))
+        return Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    return step
+
+
+def setup_pipeline(options):
+    """One step replays the whole input; items are the inference calls it made"""
+    import asyncio
+    from pipeline import HeadlessPipeline
+
+    modalities = ["speech"]
+    if options.video is not None:
+        modalities += ["gesture", "objects"]
+    if options.audio is not None:
+        audio_path = options.audio
+    else:
+        audio_path = os.path.join(tempfile.gettempdir(), "multimodal-bench-speech.wav")
+        write_wav(audio_path, load_audio(options))
+
+    class NullSink:
+        def write(self, event):
+            pass
+
+        def close(self):
+            pass
+
+    def step(i):
+        pipeline = HeadlessPipeline(
+            modalities=modalities, sinks=[NullSink()], video_source=options.video, audio_source=audio_path,
+            speed=0, start_time=0.0, speech_backend=options.speech_backend or "stub",
+            detector=options.detector,
+        )
+        if pipeline.speech_backend.name == "stub":
+            pipeline.speech_backend.responses = ["volume up"]
+        asyncio.run(pipeline.run())
+        return max(1, sum(stats.runs for stats in pipeline.scheduler.stats.values()))
+    return step
+
+
+Stage = namedtuple("Stage", ["setup", "iterations"])
+
+# iterations: None = use --iterations, a number caps it for slow stages
+STAGES = {
+    "gesture": Stage(setup_gesture, None),
+    "hands": Stage(setup_hands, 50),
+    "letterbox": Stage(setup_letterbox, None),
+    "yolo_decode": Stage(setup_yolo_decode, None),
+    "detector": Stage(setup_detector, 50),
+    "audio_segment": Stage(setup_audio_segment, None),
+    "speech": Stage(setup_speech, 10),
+    "display": Stage(setup_display, None),
+    "pipeline": Stage(setup_pipeline, 3),
+}
+
+
+def run_stage(name, options=DEFAULT_OPTIONS):
+    """Run one stage in this process and return its metrics (or the skip reason)"""
+    stage = STAGES[name]
+    try:
+        step = stage.setup(options)
+    except StageSkipped as e:
+        return {"skipped": str(e)}
+    iterations = min(options.iterations, stage.iterations or options.iterations)
+    for i in range(min(options.warmup, iterations)):
+        step(i)
+
+    latencies, items = [], 0
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    for i in range(iterations):
+        started = time.perf_counter()
+        count = step(i)
+        latencies.append(time.perf_counter() - started)
+        items += count if isinstance(count, int) and not isinstance(count, bool) else 1
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    return summarize(latencies, items, wall, cpu)
+
+
+CHILD = """
+import json, sys
+import benchmark
+options = benchmark.BenchmarkOptions(**json.loads(sys.argv[2]))
+print(json.dumps(benchmark.run_stage(sys.argv[1], options)), flush=True)
+"""
+
+
+def run_isolated(name, options, timeout=600):
+    """Run one stage in a fresh interpreter so its peak RSS is its own"""
+    proc = subprocess.run(
+        [sys.executable, "-c", CHILD, name, json.dumps(options._asdict())],
+        capture_output=True, text=True, timeout=timeout, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if proc.returncode != 0 or not proc.stdout.strip():
+        reason = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "no output"
+        return {"error": reason}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run_benchmarks(stages, options=DEFAULT_OPTIONS, isolate=True):
+    """Run the stages and return the results document"""
+    results = {
+        "version": RESULTS_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "host": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "threads": THREAD_BUDGET.summary(),
+        },
+        "options": options._asdict(),
+        "stages": {},
+    }
+    for name in stages:
+        results["stages"][name] = run_isolated(name, options) if isolate else run_stage(name, options)
+    return results
+
+
+def compare(baseline, current, tolerance=0.1):
+    """Compare two results documents
+
+    Returns (stage, metric, old, new, change, regressed) rows, where change
+    is the relative change and regressed means worse by more than tolerance
+    (and, for latencies, by more than MIN_DELTA_MS).
+    """
+    rows = []
+    for name, new in current["stages"].items():
+        old = baseline.get("stages", {}).get(name)
+        if not old or "fps" not in old or "fps" not in new:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS:
+            before, after = old.get(metric), new.get(metric)
+            if before is None or after is None:
+                continue
+            change = (after - before) / before if before else 0.0
+            worse = -change if higher_is_better else change
+            regressed = worse > tolerance
+            if metric.endswith("_ms") and after - before < MIN_DELTA_MS:
+                regressed = False
+            rows.append((name, metric, before, after, change, regressed))
+    return rows
+
+
+def format_results(results):
+    lines = [f"{'stage':<14} {'fps':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'cpu ms':>9} {'rss MB':>8}"]
+    for name, r in results["stages"].items():
+        if "fps" not in r:
+            lines.append(f"{name:<14} {'skipped: ' + r['skipped'] if 'skipped' in r else 'error: ' + r['error']}")
+            continue
+        lines.append(
+            f"{name:<14} {r['fps']:>10.1f} {r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} {r['p99_ms']:>9.3f}"
+            f" {r['cpu_ms_per_item']:>9.3f} {r['peak_rss_mb']:>8.1f}"
+        )
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline stages")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"comma-separated, from {', '.join(STAGES)}")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_OPTIONS.iterations, help="timed calls per stage")
+    parser.add_argument("--warmup", type=int, default=DEFAULT_OPTIONS.warmup, help="untimed calls first")
+    parser.add_argument("--video", default=None, help="video file or image directory instead of synthetic frames")
+    parser.add_argument("--audio", default=None, help="WAV file instead of synthetic audio")
+    parser.add_argument("--detector", default=None, help="object detector name")
+    parser.add_argument("--speech-backend", default=None, help="speech backend name")
+    parser.add_argument("--output", default=None, help="write the results as JSON to this file")
+    parser.add_argument("--compare", default=None, help="results JSON of an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed relative regression (0.1 = 10%%)")
+    parser.add_argument("--in-process", action="store_true", help="run all stages in this interpreter")
+    args = parser.parse_args()
+
+    stages = [name.strip() for name in args.stages.split(",") if name.strip()]
+    unknown = [name for name in stages if name not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage {', '.join(unknown)} (choose from {', '.join(STAGES)})")
+    options = BenchmarkOptions(args.iterations, args.warmup, args.video, args.audio, args.detector,
+                               args.speech_backend)
+
+    print("⏱️ Pipeline Benchmark")
+    print("=" * 40)
+    results = run_benchmarks(stages, options, isolate=not args.in_process)
+    for line in format_results(results):
+        print(line)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results saved to {args.output}")
+
+    passed = True
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print("=" * 40)
+        print(f"Compared with {args.compare} (tolerance {args.tolerance:.0%}):")
+        for name, metric, before, after, change, regressed in compare(baseline, results, args.tolerance):
+            mark = "❌" if regressed else "  "
+            print(f"{mark} {name:<14} {metric:<16} {before:>10.3f} → {after:>10.3f} ({change:+.1%})")
+            passed = passed and not regressed
+        print("🎉 No regressions" if passed else "⚠️ Regressions found")
+    return passed
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
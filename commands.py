@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Voice command actions (volume, brightness, screenshots, launching apps).
+
+run_command() performs the action for a recognized phrase and returns the
+message to log, so the GUI and the headless pipeline behave the same.
+"""
+
+import os
+import time
+from model_loader import lazy_import
+from metrics import ACTION_SECONDS
+
+pyautogui = lazy_import("pyautogui")
+sbc = lazy_import("screen_brightness_control")
+
+# Returned for "close"/"exit"; the caller decides how to shut down
+EXIT = "exit"
+
+
+def run_command(command):
+    """Run the action for a lower-case command phrase
+
+    Returns a log message, EXIT, or None if the phrase is not a command.
+    """
+    started = time.perf_counter()
+    message = _run_command(command)
+    if message is not None:
+        ACTION_SECONDS.observe(time.perf_counter() - started, source="voice")
+    return message
+
+
+def _run_command(command):
+    if "volume up" in command or "increase volume" in command:
+        pyautogui.press('volumeup')
+        return "🔊 Volume increased"
+        
+    elif "volume down" in command or "decrease volume" in command:
+        pyautogui.press('volumedown')
+        return "🔊 Volume decreased"
+        
+    elif "mute" in command or "unmute" in command:
+        pyautogui.press('volumemute')
+        return "🔇 Volume toggled"
+        
+    elif "brightness up" in command or "increase brightness" in command:
+        current = sbc.get_brightness()[0]
+        sbc.set_brightness(min(100, current + 10))
+        return "💡 Brightness increased"
+        
+    elif "brightness down" in command or "decrease brightness" in command:
+        current = sbc.get_brightness()[0]
+        sbc.set_brightness(max(0, current - 10))
+        return "💡 Brightness decreased"
+        
+    elif "screenshot" in command or "take screenshot" in command:
+        screenshot = pyautogui.screenshot()
+        screenshot.save(f"screenshot_{int(time.time())}.png")
+        return "📸 Screenshot taken"
+        
+    elif "open notepad" in command:
+        os.system("notepad")
+        return "📝 Notepad opened"
+        
+    elif "open calculator" in command:
+        os.system("calc")
+        return "🧮 Calculator opened"
+        
+    elif "close" in command or "exit" in command:
+        return EXIT
+    
+    return None
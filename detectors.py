@@ -0,0 +1,535 @@
+#!/usr/bin/env python3
+"""
+Object detection backends for the Multimodal AI Assistant.
+
+Every detector takes a BGR camera frame and returns the apps' detection
+dicts ({'name', 'confidence', 'bbox'}). Pick a detector by name with
+create_detector(), or set the MULTIMODAL_DETECTOR environment variable:
+
+    adaptive    - steps along DETECTOR_LADDER to stay within a latency budget (default)
+    ultralytics - YOLOv8n through the ultralytics PyTorch package
+    onnx        - YOLOv8n exported to ONNX and run with ONNX Runtime
+    onnx-int8   - the same model with int8 dynamically quantized weights
+
+The ONNX detectors do their own letterboxing and NMS in NumPy, so neither
+torch nor ultralytics is imported at runtime. The .onnx file is exported
+from yolov8n.pt once (needs ultralytics) if it is not on disk yet. Set
+MULTIMODAL_ONNX_PROVIDERS (e.g. "OpenVINOExecutionProvider") to use another
+ONNX Runtime execution provider.
+
+The adaptive detector runs one rung of a model/resolution ladder at a time
+and moves to a lighter rung when the smoothed inference time exceeds
+MULTIMODAL_DETECTOR_BUDGET_MS, or back to a heavier one when there is
+headroom. Its rungs use the backend named by MULTIMODAL_DETECTOR_BACKEND;
+rungs whose weights are not on disk are skipped rather than downloaded.
+Runs that have to repeat (replays, batch_analysis.py) use fixed_detector_name()
+instead, so the model never depends on how busy the machine was.
+"""
+
+import os
+import sys
+import ast
+import time
+import shutil
+import tempfile
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from model_loader import timed_import
+from thread_budget import THREAD_BUDGET
+
+DEFAULT_DETECTOR = os.environ.get("MULTIMODAL_DETECTOR", "adaptive")
+ONNX_PROVIDERS = [p for p in os.environ.get("MULTIMODAL_ONNX_PROVIDERS", "").split(",") if p]
+DEFAULT_BUDGET_MS = float(os.environ.get("MULTIMODAL_DETECTOR_BUDGET_MS", "100"))
+LADDER_BACKEND = os.environ.get("MULTIMODAL_DETECTOR_BACKEND", "ultralytics")
+
+# (weights, input size) from heaviest to lightest; the adaptive detector starts at DEFAULT_RUNG
+DETECTOR_LADDER = [
+    ("yolov8s.pt", 640),
+    ("yolov8n.pt", 640),
+    ("yolov8n.pt", 480),
+    ("yolov8n.pt", 320),
+]
+DEFAULT_RUNG = 1
+
+# Class list of the COCO-trained YOLOv8 models, used if the ONNX file has no metadata
+COCO_NAMES = [
+    "person", "bicycle", "car", "motorcycle", "airplane", "bus", "train", "truck", "boat",
+    "traffic light", "fire hydrant", "stop sign", "parking meter", "bench", "bird", "cat",
+    "dog", "horse", "sheep", "cow", "elephant", "bear", "zebra", "giraffe", "backpack",
+    "umbrella", "handbag", "tie", "suitcase", "frisbee", "skis", "snowboard", "sports ball",
+    "kite", "baseball bat", "baseball glove", "skateboard", "surfboard", "tennis racket",
+    "bottle", "wine glass", "cup", "fork", "knife", "spoon", "bowl", "banana", "apple",
+    "sandwich", "orange", "broccoli", "carrot", "hot dog", "pizza", "donut", "cake", "chair",
+    "couch", "potted plant", "bed", "dining table", "toilet", "tv", "laptop", "mouse",
+    "remote", "keyboard", "cell phone", "microwave", "oven", "toaster", "sink",
+    "refrigerator", "book", "clock", "vase", "scissors", "teddy bear", "hair drier",
+    "toothbrush",
+]
+
+
+class DetectorError(Exception):
+    """Raised when a detector's model or runtime is not available"""
+
+
+def detections_from_results(results, names, threshold=0.5):
+    """Turn ultralytics results into the apps' detection dicts"""
+    detected_objects = []
+    for result in results:
+        if result.boxes is None:
+            continue
+        for box in result.boxes:
+            confidence = float(box.conf[0])
+            if confidence > threshold:
+                x1, y1, x2, y2 = box.xyxy[0]
+                detected_objects.append({
+                    'name': names[int(box.cls[0])],
+                    'confidence': confidence,
+                    'bbox': [int(x1), int(y1), int(x2), int(y2)]
+                })
+    return detected_objects
+
+
+def letterbox(frame, size=640, pad_value=114):
+    """Resize keeping the aspect ratio and pad to size x size
+
+    Returns the padded image, the scale and the (left, top) padding.
+    Nearest-neighbour sampling keeps this a pair of NumPy index lookups.
+    """
+    height, width = frame.shape[:2]
+    scale = min(size / height, size / width)
+    new_h, new_w = max(1, round(height * scale)), max(1, round(width * scale))
+    rows = np.minimum((np.arange(new_h) / scale).astype(np.int64), height - 1)
+    cols = np.minimum((np.arange(new_w) / scale).astype(np.int64), width - 1)
+    top, left = (size - new_h) // 2, (size - new_w) // 2
+    image = np.full((size, size, frame.shape[2]), pad_value, dtype=frame.dtype)
+    image[top:top + new_h, left:left + new_w] = frame[rows[:, None], cols]
+    return image, scale, (left, top)
+
+
+def non_max_suppression(boxes, scores, iou_threshold=0.45):
+    """Greedy NMS on xyxy boxes, returns the indices to keep"""
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = scores.argsort()[::-1]
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        w = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        h = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        inter = w * h
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
+
+
+class ObjectDetector:
+    """Base class for object detection backends"""
+
+    name = "base"
+    names = COCO_NAMES
+
+    def load(self):
+        """Load the model ahead of the first call (optional)"""
+        return self
+
+    def available(self):
+        """True if load() needs no download"""
+        return True
+
+    def warmup(self, frame_shape=(480, 640, 3), runs=2):
+        """Run on blank frames so the first real frame runs at full speed"""
+        frame = np.zeros(frame_shape, dtype=np.uint8)
+        for _ in range(runs):
+            self.detect(frame)
+
+    def detect(self, frame):
+        """Detect objects in a BGR frame, return a list of detection dicts"""
+        raise NotImplementedError
+
+    def detect_batch(self, frames):
+        """Detect objects in several frames, one list of detection dicts per frame
+
+        Backends that can run a batch in one forward pass override this.
+        """
+        return [self.detect(frame) for frame in frames]
+
+
+class UltralyticsDetector(ObjectDetector):
+    """YOLOv8 through the ultralytics package (PyTorch)"""
+
+    name = "ultralytics"
+
+    def __init__(self, weights="yolov8n.pt", input_size=640, threshold=0.5):
+        self.weights = weights
+        self.input_size = input_size
+        self.threshold = threshold
+        self.model = None
+
+    def available(self):
+        return os.path.exists(self.weights)
+
+    def load(self):
+        if self.model is None:
+            YOLO = timed_import("ultralytics").YOLO
+            self.model = YOLO(self.weights)
+            self.names = self.model.names
+        return self
+
+    def detect(self, frame):
+        self.load()
+        results = self.model(frame, imgsz=self.input_size, verbose=False)
+        return detections_from_results(results, self.names, self.threshold)
+
+    def detect_batch(self, frames):
+        self.load()
+        results = self.model(list(frames), imgsz=self.input_size, verbose=False)
+        return [detections_from_results([result], self.names, self.threshold) for result in results]
+
+
+def export_onnx(weights="yolov8n.pt", imgsz=640, target=None):
+    """Export ultralytics weights to ONNX once, return the .onnx path"""
+    try:
+        YOLO = timed_import("ultralytics").YOLO
+    except ImportError:
+        raise DetectorError(f"No ONNX model for {weights}; export needs ultralytics (pip install ultralytics)")
+    target = target or os.path.splitext(weights)[0] + ".onnx"
+    # ultralytics writes next to the weights, so export from a copy in a scratch
+    # directory: a 320 px export must not replace an existing 640 px yolov8n.onnx
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(target))) as scratch:
+        local = os.path.join(scratch, os.path.basename(weights))
+        if os.path.exists(weights):
+            shutil.copy2(weights, local)
+        # A dynamic batch axis lets detect_batch run several frames in one call
+        path = YOLO(local).export(format="onnx", imgsz=imgsz, dynamic=True, simplify=True)
+        os.replace(path, target)
+    return target
+
+
+def has_dynamic_batch(session):
+    """True if the model's batch axis is symbolic (models exported with batch 1 are not)"""
+    shape = getattr(session.get_inputs()[0], "shape", None)
+    return bool(shape) and not isinstance(shape[0], int)
+
+
+def quantize_onnx(source, target):
+    """Write an int8 dynamically quantized copy of an ONNX model"""
+    quantization = timed_import("onnxruntime.quantization")
+    quantization.quantize_dynamic(source, target, weight_type=quantization.QuantType.QUInt8)
+    return target
+
+
+class OnnxDetector(ObjectDetector):
+    """YOLOv8 ONNX model on ONNX Runtime with NumPy pre- and post-processing"""
+
+    name = "onnx"
+
+    def __init__(self, weights="yolov8n.pt", input_size=640, threshold=0.5, iou_threshold=0.45,
+                 int8=False, model_path=None, providers=None, threads=0, session=None):
+        self.weights = weights
+        stem = os.path.splitext(weights)[0]
+        self.model_path = model_path or (f"{stem}.onnx" if input_size == 640 else f"{stem}-{input_size}.onnx")
+        self.threshold = threshold
+        self.iou_threshold = iou_threshold
+        self.input_size = input_size
+        self.int8 = int8
+        self.providers = providers or ONNX_PROVIDERS or ["CPUExecutionProvider"]
+        self.threads = threads
+        self.session = session
+        self.input_name = session.get_inputs()[0].name if session is not None else None
+        self.dynamic_batch = session is not None and has_dynamic_batch(session)
+
+    def available(self):
+        # An export from local weights is fine, a download is not
+        return os.path.exists(self.model_path) or os.path.exists(self.weights)
+
+    def _model_file(self):
+        path = self.model_path
+        if not os.path.exists(path):
+            path = export_onnx(self.weights, self.input_size, target=path)
+        if self.int8:
+            quantized = os.path.splitext(path)[0] + "-int8.onnx"
+            if not os.path.exists(quantized):
+                quantize_onnx(path, quantized)
+            path = quantized
+        return path
+
+    def load(self):
+        if self.session is None:
+            try:
+                ort = timed_import("onnxruntime")
+            except ImportError:
+                raise DetectorError("onnxruntime is not installed (pip install onnxruntime)")
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            options.intra_op_num_threads = self.threads or THREAD_BUDGET.threads("onnx")
+            options.inter_op_num_threads = 1
+            self.session = ort.InferenceSession(self._model_file(), options, providers=self.providers)
+            self.input_name = self.session.get_inputs()[0].name
+            self.dynamic_batch = has_dynamic_batch(self.session)
+            metadata = self.session.get_modelmeta().custom_metadata_map
+            if "names" in metadata:
+                names = ast.literal_eval(metadata["names"])
+                self.names = [names[i] for i in sorted(names)]
+        return self
+
+    def preprocess(self, frame):
+        """BGR uint8 frame -> 1x3xSxS float32 RGB tensor plus the letterbox geometry"""
+        image, scale, pad = letterbox(frame, self.input_size)
+        blob = image[..., ::-1].transpose(2, 0, 1)[None].astype(np.float32) / 255.0
+        return np.ascontiguousarray(blob), scale, pad
+
+    def postprocess(self, output, scale, pad, frame_shape):
+        """Decode a (1, 4 + classes, anchors) YOLOv8 output into detection dicts"""
+        predictions = output[0].T
+        class_scores = predictions[:, 4:]
+        class_ids = class_scores.argmax(axis=1)
+        scores = class_scores[np.arange(len(class_ids)), class_ids]
+        mask = scores > self.threshold
+        if not mask.any():
+            return []
+        predictions, class_ids, scores = predictions[mask], class_ids[mask], scores[mask]
+
+        cx, cy, w, h = predictions[:, :4].T
+        boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+        boxes -= [pad[0], pad[1], pad[0], pad[1]]
+        boxes /= scale
+        height, width = frame_shape[:2]
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, width)
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, height)
+
+        # Per-class NMS in one pass: shift each class into its own region
+        offsets = class_ids[:, None] * (max(width, height) + 1)
+        keep = non_max_suppression(boxes + offsets, scores, self.iou_threshold)
+        return [{
+            'name': self.names[int(class_ids[i])],
+            'confidence': float(scores[i]),
+            'bbox': [int(v) for v in boxes[i]]
+        } for i in keep]
+
+    def detect(self, frame):
+        self.load()
+        blob, scale, pad = self.preprocess(frame)
+        output = self.session.run(None, {self.input_name: blob})[0]
+        return self.postprocess(output, scale, pad, frame.shape)
+
+    def detect_batch(self, frames):
+        self.load()
+        if not self.dynamic_batch or len(frames) < 2:
+            return [self.detect(frame) for frame in frames]
+        prepared = [self.preprocess(frame) for frame in frames]
+        blob = np.concatenate([blob for blob, _, _ in prepared])
+        output = self.session.run(None, {self.input_name: blob})[0]
+        return [
+            self.postprocess(output[i:i + 1], scale, pad, frame.shape)
+            for i, (frame, (_, scale, pad)) in enumerate(zip(frames, prepared))
+        ]
+
+
+class QuantizedOnnxDetector(OnnxDetector):
+    """ONNX detector with int8 dynamically quantized weights"""
+
+    name = "onnx-int8"
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("int8", True)
+        super().__init__(**kwargs)
+
+
+class LatencyLadder:
+    """Decides when to move along a ladder of variants to meet a latency budget
+
+    Index 0 is the heaviest rung. Inference times are smoothed with an
+    exponential moving average. Stepping down needs down_frames frames over
+    budget; stepping up needs up_frames frames under headroom * budget. If a
+    step up is undone within probe_seconds, further step-ups back off.
+    """
+
+    def __init__(self, rungs, budget, start=0, alpha=0.2, down_frames=5, up_frames=30,
+                 headroom=0.6, probe_seconds=10.0, backoff_seconds=15.0, max_backoff_seconds=240.0):
+        self.rungs = list(rungs)
+        self.budget = budget
+        self.index = start
+        self.alpha = alpha
+        self.down_frames = down_frames
+        self.up_frames = up_frames
+        self.headroom = headroom
+        self.probe_seconds = probe_seconds
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.disabled = set()
+        self.latency = None
+        self.over = 0
+        self.under = 0
+        self.last_up = None
+        self.blocked_until = 0.0
+
+    def _next(self, step):
+        index = self.index + step
+        while 0 <= index < len(self.rungs) and index in self.disabled:
+            index += step
+        return index if 0 <= index < len(self.rungs) else None
+
+    def observe(self, seconds, now=None):
+        """Record one inference time; return the rung index to move to, or None"""
+        now = time.monotonic() if now is None else now
+        self.latency = seconds if self.latency is None else self.alpha * seconds + (1 - self.alpha) * self.latency
+        if self.latency > self.budget:
+            self.over, self.under = self.over + 1, 0
+            if self.over >= self.down_frames:
+                return self._next(1)
+        elif self.latency < self.headroom * self.budget:
+            self.over, self.under = 0, self.under + 1
+            if self.under >= self.up_frames and now >= self.blocked_until:
+                return self._next(-1)
+        else:
+            self.over = self.under = 0
+        return None
+
+    def switch(self, index, now=None):
+        """Move to a rung; measurements start over on the new variant"""
+        now = time.monotonic() if now is None else now
+        if index > self.index and self.last_up is not None and now - self.last_up < self.probe_seconds:
+            # The heavier rung did not fit after all: wait longer before trying again
+            self.blocked_until = now + self.backoff_seconds
+            self.backoff_seconds = min(2 * self.backoff_seconds, self.max_backoff_seconds)
+        self.last_up = now if index < self.index else None
+        self.index = index
+        self.latency = None
+        self.over = self.under = 0
+
+    def disable(self, index):
+        """Stop proposing a rung that failed to load"""
+        self.disabled.add(index)
+
+
+def _log_stderr(message):
+    print(message, file=sys.stderr, flush=True)
+
+
+class AdaptiveDetector(ObjectDetector):
+    """Switches between model/resolution variants to stay within a latency budget"""
+
+    name = "adaptive"
+
+    def __init__(self, backend=None, ladder=None, budget_ms=None, start=DEFAULT_RUNG, log=None, **kwargs):
+        self.backend = backend or LADDER_BACKEND
+        # Diagnostics go to stderr by default: stdout may carry the pipeline's JSONL
+        self.log = log or _log_stderr
+        self.variants = list(ladder or DETECTOR_LADDER)
+        budget = (budget_ms or DEFAULT_BUDGET_MS) / 1000.0
+        self.ladder = LatencyLadder(self.labels(), budget, start=min(start, len(self.variants) - 1))
+        self.kwargs = kwargs
+        self.detectors = {}
+        # Other rungs only use models already on disk: ultralytics would otherwise
+        # download e.g. yolov8s.pt mid-session, which stalls or fails offline.
+        # Rungs on the start rung's weights are fine, those arrive with it at startup.
+        start_weights = self.variants[self.ladder.index][0]
+        missing = [index for index, (weights, _) in enumerate(self.variants)
+                   if weights != start_weights and not self._variant(index).available()]
+        for index in missing:
+            self.ladder.disable(index)
+        if missing:
+            self.log(f"👁️ Detector ladder skips {', '.join(self.ladder.rungs[i] for i in missing)} (weights not on disk)")
+        self.current = None
+        self.pending = None
+        self.frame_shape = (480, 640, 3)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="detector-ladder")
+
+    def labels(self):
+        return [f"{os.path.splitext(weights)[0]}@{size}" for weights, size in self.variants]
+
+    def _variant(self, index):
+        if index not in self.detectors:
+            weights, size = self.variants[index]
+            self.detectors[index] = create_detector(self.backend, weights=weights, input_size=size, **self.kwargs)
+        return self.detectors[index]
+
+    def _prepare(self, index):
+        detector = self._variant(index).load()
+        detector.warmup(self.frame_shape, runs=1)
+        return index
+
+    def load(self):
+        if self.current is None:
+            self.current = self._variant(self.ladder.index).load()
+            self.names = self.current.names
+        return self
+
+    def warmup(self, frame_shape=(480, 640, 3), runs=2):
+        self.frame_shape = frame_shape
+        self.load().current.warmup(frame_shape, runs)
+
+    def status(self):
+        label = self.ladder.rungs[self.ladder.index]
+        if self.ladder.latency is None:
+            return label
+        return f"{label} ({self.ladder.latency * 1000:.0f}/{self.ladder.budget * 1000:.0f} ms)"
+
+    def _finish_switch(self):
+        # A variant loads and warms up in the background; the old one keeps running meanwhile
+        future, self.pending = self.pending, None
+        old = self.ladder.rungs[self.ladder.index]
+        try:
+            index = future.result()
+        except Exception as e:
+            self.ladder.disable(future.index)
+            self.log(f"❌ Detector variant {self.ladder.rungs[future.index]} failed to load: {e}")
+            return
+        latency = self.ladder.latency
+        self.ladder.switch(index)
+        self.current = self.detectors[index]
+        self.names = self.current.names
+        self.log(f"👁️ Detector {old} → {self.ladder.rungs[index]} ({latency * 1000:.0f} ms, budget {self.ladder.budget * 1000:.0f} ms)")
+
+    def detect(self, frame):
+        self.load()
+        if self.pending is not None and self.pending.done():
+            self._finish_switch()
+        self.frame_shape = frame.shape
+        start = time.perf_counter()
+        detections = self.current.detect(frame)
+        self._observe(time.perf_counter() - start)
+        return detections
+
+    def detect_batch(self, frames):
+        self.load()
+        if self.pending is not None and self.pending.done():
+            self._finish_switch()
+        if not len(frames):
+            return []
+        self.frame_shape = frames[0].shape
+        start = time.perf_counter()
+        detections = self.current.detect_batch(frames)
+        # The budget is per frame, so a batch counts as its per-frame cost
+        self._observe((time.perf_counter() - start) / len(frames))
+        return detections
+
+    def _observe(self, seconds):
+        target = self.ladder.observe(seconds)
+        if target is not None and self.pending is None:
+            self.pending = self.executor.submit(self._prepare, target)
+            self.pending.index = target
+
+
+DETECTORS = {
+    "ultralytics": UltralyticsDetector,
+    "onnx": OnnxDetector,
+    "onnx-int8": QuantizedOnnxDetector,
+    "adaptive": AdaptiveDetector,
+}
+
+
+def fixed_detector_name(name=None):
+    """A detector name that always runs the same model: adaptive becomes its ladder backend"""
+    name = (name or DEFAULT_DETECTOR).lower()
+    return LADDER_BACKEND if name == "adaptive" else name
+
+
+def create_detector(name=None, **kwargs):
+    """Create an object detector by name (defaults to MULTIMODAL_DETECTOR)"""
+    name = (name or DEFAULT_DETECTOR).lower()
+    if name not in DETECTORS:
+        raise ValueError(f"Unknown detector '{name}' (choose from {', '.join(DETECTORS)})")
+    return DETECTORS[name](**kwargs)
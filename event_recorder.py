@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Append-only structured event log for gestures, detections and transcripts.
+
+record() only puts the event on a bounded queue, so it never blocks the
+capture or inference loops; a background writer thread takes events off in
+batches, writes them as JSON lines and rotates files by size and age:
+
+    events-20250101-120000-4242.jsonl
+    {"t": 1735732800.123, "type": "gesture", "gesture": "VOLUME_UP"}
+
+If the writer falls behind and the queue fills, new events are counted as
+dropped (multimodal_events_dropped_total) instead of stalling the pipeline.
+
+fsync policy: "always" syncs after every batch, "interval" at most every
+fsync_interval seconds (default), "never" leaves it to the OS. With
+MULTIMODAL_EVENT_DIR set the apps record into that directory;
+MULTIMODAL_EVENT_MAX_MB, MULTIMODAL_EVENT_MAX_MINUTES and
+MULTIMODAL_EVENT_FSYNC tune rotation and syncing.
+"""
+
+import os
+import json
+import time
+import queue
+import threading
+from metrics import REGISTRY
+
+EVENT_DIR = os.environ.get("MULTIMODAL_EVENT_DIR")
+EVENT_MAX_BYTES = int(float(os.environ.get("MULTIMODAL_EVENT_MAX_MB", "64")) * 1024 * 1024)
+EVENT_MAX_AGE = float(os.environ.get("MULTIMODAL_EVENT_MAX_MINUTES", "60")) * 60
+EVENT_FSYNC = os.environ.get("MULTIMODAL_EVENT_FSYNC", "interval")
+FSYNC_POLICIES = ("always", "interval", "never")
+
+EVENTS_RECORDED = REGISTRY.counter("multimodal_events_recorded_total", "Events written to the event log")
+EVENTS_DROPPED = REGISTRY.counter("multimodal_events_dropped_total", "Events dropped because the writer fell behind")
+
+_STOP = object()
+
+
+class EventRecorder:
+    """Batches events from any thread into rotating JSONL files"""
+
+    def __init__(self, directory, prefix="events", max_bytes=EVENT_MAX_BYTES, max_age=EVENT_MAX_AGE,
+                 fsync=EVENT_FSYNC, fsync_interval=5.0, batch_size=256, flush_interval=1.0,
+                 queue_size=10000, clock=time.time):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy '{fsync}' (choose from {', '.join(FSYNC_POLICIES)})")
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.file = None
+        self.path = None
+        self.opened = 0.0
+        self.size = 0
+        self.last_sync = 0.0
+        self.files = []
+        self.dropped = 0
+        self.closed = False
+        os.makedirs(directory, exist_ok=True)
+        self.thread = threading.Thread(target=self._writer, name="event-recorder", daemon=True)
+        self.thread.start()
+
+    def record(self, kind, **fields):
+        """Queue one event; never blocks (returns False if it had to be dropped)"""
+        event = {"t": round(self.clock(), 3), "type": kind}
+        event.update(fields)
+        return self.write(event)
+
+    def write(self, event):
+        """Queue an already-built event dict"""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            EVENTS_DROPPED.inc()
+            return False
+
+    def close(self, timeout=5.0):
+        """Write everything still queued, sync and close the current file"""
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(_STOP)
+        self.thread.join(timeout)
+
+    def _writer(self):
+        stop = False
+        while not stop:
+            batch = []
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+                while True:
+                    if item is _STOP:
+                        stop = True
+                        break
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    item = self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                if batch:
+                    self._write_batch(batch)
+                elif self.file is not None and self.clock() - self.opened >= self.max_age:
+                    self._close_file()
+            except (OSError, TypeError, ValueError) as e:
+                print(f"Event recorder error: {e}")
+        try:
+            self._close_file()
+        except OSError as e:
+            print(f"Event recorder error: {e}")
+
+    def _write_batch(self, batch):
+        now = self.clock()
+        if self.file is not None and (self.size >= self.max_bytes or now - self.opened >= self.max_age):
+            self._close_file()
+        if self.file is None:
+            self._open_file(now)
+        data = "".join(json.dumps(event, ensure_ascii=False, default=str) + "\n" for event in batch).encode("utf-8")
+        self.file.write(data)
+        self.file.flush()
+        self.size += len(data)
+        EVENTS_RECORDED.inc(len(batch))
+        if self.fsync == "always" or (self.fsync == "interval" and now - self.last_sync >= self.fsync_interval):
+            os.fsync(self.file.fileno())
+            self.last_sync = now
+
+    def _open_file(self, now):
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now))
+        path = os.path.join(self.directory, f"{self.prefix}-{stamp}-{os.getpid()}.jsonl")
+        suffix = 1
+        while os.path.exists(path):
+            path = os.path.join(self.directory, f"{self.prefix}-{stamp}-{os.getpid()}.{suffix}.jsonl")
+            suffix += 1
+        self.file = open(path, "ab")
+        self.path = path
+        self.files.append(path)
+        self.opened = now
+        self.size = 0
+
+    def _close_file(self):
+        if self.file is None:
+            return
+        self.file.flush()
+        if self.fsync != "never":
+            os.fsync(self.file.fileno())
+        self.file.close()
+        self.file = None
+
+
+def open_recorder(directory=None, **kwargs):
+    """An EventRecorder for directory (default MULTIMODAL_EVENT_DIR), or None if unset"""
+    directory = directory or EVENT_DIR
+    return EventRecorder(directory, **kwargs) if directory else None
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Time-indexed store of recent gesture, object and speech events.
+
+Each event kind is kept in its own bounded, time-sorted ring, so a burst of
+gestures never pushes older detections out, and queries are binary searches
+rather than scans:
+
+    store.add("object", t=12.0, event="appeared", name="lamp", count=1)
+    store.add("transcript", t=14.5, text="turn that on")
+    store.range(13.0, 15.0)                    # everything in a window
+    store.nearest(14.5, kinds=["gesture"])     # closest gesture in time
+    store.visible_objects(14.5, 16.5)          # ["lamp"]
+
+Object events are also indexed per class name, which makes "what was
+visible while the user spoke" cost one search per class. A ring keeps
+MULTIMODAL_EVENT_STORE_SIZE events per kind (default 4096) and drops those
+more than MULTIMODAL_EVENT_STORE_SECONDS older than the newest (default 600).
+"""
+
+import os
+import time
+import heapq
+import bisect
+import threading
+from collections import namedtuple
+
+EVENT_STORE_SIZE = int(os.environ.get("MULTIMODAL_EVENT_STORE_SIZE", "4096"))
+EVENT_STORE_SECONDS = float(os.environ.get("MULTIMODAL_EVENT_STORE_SECONDS", "600"))
+
+StoredEvent = namedtuple("StoredEvent", ["t", "kind", "fields"])
+
+
+class TimeSeries:
+    """Bounded ring of events sorted by time
+
+    Kept as two parallel lists plus a start offset; evicted entries are cut
+    off in one go once they make up half the list, so adding stays O(1)
+    amortized while bisect works on plain lists.
+    """
+
+    __slots__ = ("capacity", "max_age", "times", "events", "start")
+
+    def __init__(self, capacity=EVENT_STORE_SIZE, max_age=EVENT_STORE_SECONDS):
+        self.capacity = max(1, capacity)
+        self.max_age = max_age
+        self.times = []
+        self.events = []
+        self.start = 0
+
+    def __len__(self):
+        return len(self.times) - self.start
+
+    def add(self, event):
+        if not len(self) or event.t >= self.times[-1]:
+            self.times.append(event.t)
+            self.events.append(event)
+        else:
+            # Late arrivals (a slow detection, a finished utterance) go in their place
+            index = bisect.bisect_right(self.times, event.t, self.start)
+            self.times.insert(index, event.t)
+            self.events.insert(index, event)
+        if len(self) > self.capacity:
+            self.start += len(self) - self.capacity
+        if self.max_age:
+            cutoff = self.times[-1] - self.max_age
+            if self.times[self.start] < cutoff:
+                self.start = bisect.bisect_left(self.times, cutoff, self.start)
+        if self.start > self.capacity // 2:
+            del self.times[:self.start]
+            del self.events[:self.start]
+            self.start = 0
+
+    def range(self, start, end):
+        """Events with start <= t <= end, oldest first"""
+        lo = bisect.bisect_left(self.times, start, self.start)
+        hi = bisect.bisect_right(self.times, end, lo)
+        return self.events[lo:hi]
+
+    def nearest(self, t):
+        """The event closest in time to t (the earlier one on a tie), or None"""
+        index = bisect.bisect_left(self.times, t, self.start)
+        best = None
+        for i in (index - 1, index):
+            if self.start <= i < len(self.times) and (best is None or abs(self.times[i] - t) < abs(self.times[best] - t)):
+                best = i
+        return None if best is None else self.events[best]
+
+    def before(self, t):
+        """The last event at or before t, or None"""
+        index = bisect.bisect_right(self.times, t, self.start) - 1
+        return self.events[index] if index >= self.start else None
+
+    def latest(self):
+        return self.events[-1] if len(self) else None
+
+
+class EventStore:
+    """Recent events from every modality, queryable by time"""
+
+    def __init__(self, capacity=EVENT_STORE_SIZE, max_age=EVENT_STORE_SECONDS, clock=time.time):
+        self.capacity = capacity
+        self.max_age = max_age
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.series = {}
+        self.objects = {}
+
+    def _series(self, table, key):
+        series = table.get(key)
+        if series is None:
+            series = table[key] = TimeSeries(self.capacity, self.max_age)
+        return series
+
+    def add(self, kind, t=None, **fields):
+        """Store one event and return it (t defaults to now)"""
+        event = StoredEvent(self.clock() if t is None else t, kind, fields)
+        with self.lock:
+            self._series(self.series, kind).add(event)
+            if kind == "object" and "name" in fields:
+                self._series(self.objects, fields["name"]).add(event)
+        return event
+
+    def add_event(self, event):
+        """Store a pipeline/recorder style dict: {"t": ..., "type": ..., **fields}"""
+        fields = {key: value for key, value in event.items() if key not in ("t", "type")}
+        return self.add(event["type"], event.get("t"), **fields)
+
+    def kinds(self):
+        with self.lock:
+            return [kind for kind, series in self.series.items() if len(series)]
+
+    def _selected(self, kinds):
+        if kinds is None:
+            return list(self.series.values())
+        return [self.series[kind] for kind in kinds if kind in self.series]
+
+    def range(self, start, end, kinds=None):
+        """Events with start <= t <= end across kinds, oldest first"""
+        with self.lock:
+            parts = [series.range(start, end) for series in self._selected(kinds)]
+        return list(heapq.merge(*parts, key=lambda event: event.t))
+
+    def nearest(self, t, kinds=None, max_gap=None):
+        """The event closest in time to t, or None if none is within max_gap seconds"""
+        with self.lock:
+            candidates = [series.nearest(t) for series in self._selected(kinds)]
+        candidates = [event for event in candidates if event is not None]
+        if not candidates:
+            return None
+        best = min(candidates, key=lambda event: abs(event.t - t))
+        return best if max_gap is None or abs(best.t - t) <= max_gap else None
+
+    def latest(self, kind):
+        with self.lock:
+            series = self.series.get(kind)
+            return series.latest() if series else None
+
+    def visible_objects(self, start, end=None):
+        """Names of the object classes present at any point between start and end
+
+        Follows the presence events (appeared / count_changed / left) that the
+        trackers emit; a class counts if it was present going into the window
+        or appeared during it.
+        """
+        end = start if end is None else end
+        names = []
+        with self.lock:
+            for name, series in self.objects.items():
+                before = series.before(start)
+                present = before is not None and before.fields.get("count", 0) > 0
+                if not present:
+                    present = any(event.fields.get("count", 0) > 0 for event in series.range(start, end))
+                if present:
+                    names.append(name)
+        return sorted(names)
+
+    def clear(self):
+        with self.lock:
+            self.series.clear()
+            self.objects.clear()
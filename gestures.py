@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Hand gesture classification from MediaPipe hand landmarks.
+
+Works on anything with a .landmark list of points with x, y and z (MediaPipe
+output, or the daemon's landmarks_from_points wrapper), so it is shared by
+the GUI and the headless pipeline.
+"""
+
+
+def analyze_gesture(landmarks):
+    """Analyze hand landmarks to determine gesture"""
+    try:
+        # Get landmark coordinates
+        points = []
+        for lm in landmarks.landmark:
+            points.append([lm.x, lm.y, lm.z])
+        
+        # Calculate distances and angles
+        thumb_tip = points[4]
+        index_tip = points[8]
+        
+        # Volume control gesture (thumb up/down)
+        if is_volume_gesture(points):
+            if thumb_tip[1] < points[3][1]:  # Thumb pointing up
+                return "VOLUME_UP"
+            else:  # Thumb pointing down
+                return "VOLUME_DOWN"
+        
+        # Brightness control gesture (index finger up/down)
+        if is_brightness_gesture(points):
+            if index_tip[1] < points[6][1]:  # Index pointing up
+                return "BRIGHTNESS_UP"
+            else:  # Index pointing down
+                return "BRIGHTNESS_DOWN"
+        
+        # Mouse control gesture (open palm)
+        if is_mouse_gesture(points):
+            return "MOUSE_CONTROL"
+        
+        # Screenshot gesture (peace sign)
+        if is_screenshot_gesture(points):
+            return "SCREENSHOT"
+        
+        return None
+        
+    except Exception:
+        return None
+
+
+def is_volume_gesture(points):
+    """Check if gesture is for volume control"""
+    # Thumb extended, other fingers closed
+    thumb_tip = points[4]
+    thumb_ip = points[3]
+    index_tip = points[8]
+    middle_tip = points[12]
+    
+    # Check if thumb is extended and others are closed
+    return (abs(thumb_tip[0] - thumb_ip[0]) > 0.05 and 
+            index_tip[1] > points[6][1] and 
+            middle_tip[1] > points[10][1])
+
+
+def is_brightness_gesture(points):
+    """Check if gesture is for brightness control"""
+    # Index finger extended, others closed
+    index_tip = points[8]
+    middle_tip = points[12]
+    ring_tip = points[16]
+    
+    return (index_tip[1] < points[6][1] and 
+            middle_tip[1] > points[10][1] and 
+            ring_tip[1] > points[14][1])
+
+
+def is_mouse_gesture(points):
+    """Check if gesture is for mouse control"""
+    # All fingers extended (open palm)
+    return all(points[i][1] < points[i-2][1] for i in [8, 12, 16, 20])
+
+
+def is_screenshot_gesture(points):
+    """Check if gesture is for screenshot (peace sign)"""
+    # Index and middle fingers extended, others closed
+    index_tip = points[8]
+    middle_tip = points[12]
+    ring_tip = points[16]
+    pinky_tip = points[20]
+    
+    return (index_tip[1] < points[6][1] and 
+            middle_tip[1] < points[10][1] and 
+            ring_tip[1] > points[14][1] and 
+            pinky_tip[1] > points[18][1])
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Warm inference daemon shared by the Tk frontends.
+
+    python inference_daemon.py
+    MULTIMODAL_DAEMON_SOCKET=/tmp/multimodal_inference.sock python main.py
+
+The daemon keeps MediaPipe, YOLO and the speech model loaded and the camera
+and microphone open. Frontends connect to its Unix socket and receive one
+JSON object per line:
+
+    {"topic": "hello", "shm": "...", "slots": 4, "shape": [480, 640, 3], "models": "..."}
+    {"topic": "frame", "seq": 42, "slot": 2, "t": 1700000000.0}
+    {"topic": "hands", "seq": 42, "hands": [[[x, y, z], ... 21 points], ...]}
+    {"topic": "detections", "seq": 42, "detections": [{"name": ..., "confidence": ..., "bbox": [...]}]}
+    {"topic": "transcript", "text": "volume up", "t": 1700000000.0}
+
+Frames are not sent over the socket. They are written to a shared-memory
+ring of slots and clients copy them out; each slot carries the sequence
+number of its frame, which is checked again after the copy so a frame
+overwritten mid-read is skipped. Clients can send
+{"cmd": "subscribe", "topics": [...]} to limit what they receive.
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import asyncio
+import argparse
+import tempfile
+import threading
+from types import SimpleNamespace
+from multiprocessing import shared_memory
+# Caps the OpenMP/BLAS thread pools, so it has to come before numpy
+from thread_budget import THREAD_BUDGET
+import numpy as np
+from model_loader import ModelLoader, timed_import, lazy_import, warm_up_hands
+from detectors import create_detector
+from speech_backends import create_backend
+from sources import open_video_source, open_audio_source
+from metrics import FRAMES_DROPPED, INFERENCE_SECONDS, METRICS_PORT, timed_transcribe, start_metrics_server
+from profiler import install_profile_signal
+
+cv2 = lazy_import("cv2")
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), "multimodal_inference.sock")
+ATTACH_SOCKET = os.environ.get("MULTIMODAL_DAEMON_SOCKET")
+TOPICS = ("frame", "hands", "detections", "transcript")
+FRAME_SHAPE = (480, 640, 3)
+MAX_CLIENT_BUFFER = 1 << 20   # skip frames for clients this far behind
+
+
+class SharedFrameRing:
+    """Ring of frame slots in shared memory, each tagged with its sequence number"""
+
+    def __init__(self, name=None, slots=4, shape=FRAME_SHAPE, create=False):
+        self.slots = slots
+        self.shape = tuple(shape)
+        size = 8 * slots + slots * int(np.prod(self.shape))
+        self.owner = create
+        if create:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = _attach_shared_memory(name)
+        self.name = self.shm.name
+        self.headers = np.ndarray((slots,), dtype=np.int64, buffer=self.shm.buf[:8 * slots])
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=self.shm.buf[8 * slots:size])
+        if create:
+            self.headers[:] = -1
+
+    def write(self, frame, seq):
+        """Store a frame (already resized to shape) and return its slot"""
+        slot = seq % self.slots
+        self.headers[slot] = -1
+        self.frames[slot] = frame
+        self.headers[slot] = seq
+        return slot
+
+    def read(self, slot, seq):
+        """Copy a frame out, or return None if it was overwritten meanwhile"""
+        if self.headers[slot] != seq:
+            return None
+        frame = self.frames[slot].copy()
+        if self.headers[slot] != seq:
+            return None
+        return frame
+
+    def close(self):
+        self.headers = None
+        self.frames = None
+        self.shm.close()
+        self.unlink()
+
+    def unlink(self):
+        """Remove the block's name (owner only); existing mappings stay valid"""
+        if self.owner:
+            self.owner = False
+            self.shm.unlink()
+
+
+def _attach_shared_memory(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: keep the resource tracker from unlinking the daemon's block
+        from multiprocessing import resource_tracker
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+def landmarks_from_points(points):
+    """Wrap [[x, y, z], ...] so the apps' gesture code can use it like MediaPipe output"""
+    return SimpleNamespace(landmark=[SimpleNamespace(x=x, y=y, z=z) for x, y, z in points])
+
+
+def daemon_available(socket_path=None):
+    """True if a daemon is listening on the socket"""
+    import socket
+    socket_path = socket_path or DEFAULT_SOCKET
+    if not os.path.exists(socket_path):
+        return False
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(0.2)
+    try:
+        sock.connect(socket_path)
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+class InferenceDaemon:
+    """Owns the models and devices and streams results to attached clients"""
+
+    def __init__(self, socket_path=None, camera_index=0, speech_backend=None,
+                 vision=True, speech=True, object_interval=0.1, detector=None, audio_source=None):
+        self.socket_path = socket_path or DEFAULT_SOCKET
+        self.camera_index = camera_index
+        self.audio_source = audio_source
+        self.vision = vision
+        self.speech = speech
+        self.object_interval = object_interval
+        self.sample_rate = 16000
+        self.running = False
+        self.clients = {}
+        self.ring = None
+        self.loop = None
+        self.workers = []
+
+        self.loader = ModelLoader(max_workers=3, after_load=THREAD_BUDGET.apply_libraries)
+        self.loader.register("hands", self._load_hands, warmup=lambda hands: warm_up_hands(hands, FRAME_SHAPE))
+        self.detector = create_detector(detector)
+        self.loader.register("yolo", self.detector.load, warmup=lambda detector: detector.warmup(FRAME_SHAPE))
+        self.speech_backend = create_backend(speech_backend)
+        self.loader.register("speech", self.speech_backend.load, warmup=lambda _: self.speech_backend.warmup())
+
+    def _load_hands(self):
+        mp = timed_import("mediapipe")
+        self.mp_hands = mp.solutions.hands
+        self.mp_drawing = mp.solutions.drawing_utils
+        return self.mp_hands.Hands(max_num_hands=1, min_detection_confidence=0.7, min_tracking_confidence=0.5)
+
+    async def serve(self):
+        self.loop = asyncio.get_running_loop()
+        self.running = True
+        self.ring = SharedFrameRing(create=True)
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+        workers = []
+        if self.vision:
+            self.loader.request_all(["hands", "yolo"])
+            workers.append(threading.Thread(target=self.vision_worker, name="daemon-vision", daemon=True))
+        if self.speech:
+            self.loader.request("speech")
+            workers.append(threading.Thread(target=self.audio_worker, name="daemon-audio", daemon=True))
+        for worker in workers:
+            worker.start()
+        self.workers.extend(workers)
+
+        server = await asyncio.start_unix_server(self.handle_client, path=self.socket_path)
+        print(f"[daemon] Serving on {self.socket_path}")
+        print(f"[daemon] {THREAD_BUDGET.summary()}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.running = False
+            self.close_ring()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+    def close_ring(self, timeout=5.0):
+        """Release the shared memory once no worker can still be writing a frame into it"""
+        for worker in self.workers:
+            worker.join(timeout)
+        if any(worker.is_alive() for worker in self.workers):
+            # A worker is stuck (e.g. in a camera read): unmapping under it could crash
+            # the process, so only remove the name and let exit reclaim the mapping
+            print("[daemon] Worker still running at shutdown; leaving shared memory mapped")
+            self.ring.unlink()
+            return
+        self.ring.close()
+
+    async def handle_client(self, reader, writer):
+        self.clients[writer] = set(TOPICS)
+        hello = {
+            "topic": "hello", "shm": self.ring.name, "slots": self.ring.slots,
+            "shape": list(self.ring.shape), "models": self.loader.status_text(),
+        }
+        writer.write((json.dumps(hello) + "\n").encode())
+        print(f"[daemon] Client attached ({len(self.clients)} connected)")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    continue
+                if request.get("cmd") == "subscribe":
+                    self.clients[writer] = set(request.get("topics", TOPICS)) & set(TOPICS)
+                elif request.get("cmd") == "status":
+                    status = {"topic": "status", "models": self.loader.status_text()}
+                    writer.write((json.dumps(status) + "\n").encode())
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.pop(writer, None)
+            writer.close()
+            print(f"[daemon] Client detached ({len(self.clients)} connected)")
+
+    def publish(self, message):
+        """Send a message to every subscribed client (callable from any thread)"""
+        line = (json.dumps(message) + "\n").encode()
+        self.loop.call_soon_threadsafe(self._broadcast, message["topic"], line)
+
+    def _broadcast(self, topic, line):
+        for writer, topics in list(self.clients.items()):
+            if topic not in topics or writer.is_closing():
+                continue
+            if topic == "frame" and writer.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+                FRAMES_DROPPED.inc(stage="client")
+                continue
+            writer.write(line)
+
+    def vision_worker(self):
+        cap = open_video_source(str(self.camera_index))
+        height, width = self.ring.shape[:2]
+        seq = 0
+        last_objects = 0.0
+        while self.running:
+            ret, frame = cap.read()
+            if not ret:
+                if cap.finished:
+                    break
+                time.sleep(0.01)
+                continue
+            seq += 1
+            frame = cv2.resize(frame, (width, height))
+
+            hands = self.loader.get_if_ready("hands")
+            if hands:
+                started = time.perf_counter()
+                results = hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+                INFERENCE_SECONDS.observe(time.perf_counter() - started, modality="gesture")
+                if results.multi_hand_landmarks:
+                    points = []
+                    for hand_landmarks in results.multi_hand_landmarks:
+                        self.mp_drawing.draw_landmarks(frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
+                        points.append([[lm.x, lm.y, lm.z] for lm in hand_landmarks.landmark])
+                    self.publish({"topic": "hands", "seq": seq, "hands": points})
+
+            detector = self.loader.get_if_ready("yolo")
+            now = time.monotonic()
+            if detector and now - last_objects >= self.object_interval:
+                last_objects = now
+                detections = detector.detect(frame)
+                INFERENCE_SECONDS.observe(time.monotonic() - now, modality="object")
+                self.publish({"topic": "detections", "seq": seq, "detections": detections})
+
+            slot = self.ring.write(frame, seq)
+            self.publish({"topic": "frame", "seq": seq, "slot": slot, "t": time.time()})
+        cap.release()
+
+    def audio_worker(self):
+        chunks = queue.Queue()
+        try:
+            self.loader.get("speech")
+        except Exception as e:
+            print(f"[daemon] Speech model failed to load: {e}")
+            return
+
+        def audio_callback(samples, timestamp):
+            chunks.put(samples)
+
+        buffer = np.zeros(0, dtype=np.float32)
+        with open_audio_source(self.audio_source, sample_rate=self.sample_rate).stream(audio_callback):
+            while self.running:
+                try:
+                    buffer = np.concatenate([buffer, chunks.get(timeout=0.1)])
+                except queue.Empty:
+                    continue
+                if buffer.size < self.sample_rate * 2:
+                    continue
+                segment, buffer = buffer[:self.sample_rate * 2], buffer[self.sample_rate * 2:]
+                if np.mean(segment ** 2) < 0.001:
+                    continue
+                try:
+                    text = timed_transcribe(self.speech_backend.transcribe, segment, self.sample_rate)
+                except Exception as e:
+                    print(f"[daemon] Speech backend error: {e}")
+                    continue
+                if text:
+                    self.publish({"topic": "transcript", "text": text, "t": time.time()})
+
+
+class DaemonClient:
+    """Asyncio client the Tk frontends use to attach to the daemon"""
+
+    def __init__(self, socket_path=None):
+        self.socket_path = socket_path or DEFAULT_SOCKET
+        self.reader = None
+        self.writer = None
+        self.ring = None
+        self.hello = None
+
+    async def connect(self, topics=None):
+        self.reader, self.writer = await asyncio.open_unix_connection(self.socket_path)
+        self.hello = json.loads(await self.reader.readline())
+        if topics is None or "frame" in topics:
+            self.ring = SharedFrameRing(name=self.hello["shm"], slots=self.hello["slots"], shape=self.hello["shape"])
+        if topics is not None:
+            self.writer.write((json.dumps({"cmd": "subscribe", "topics": list(topics)}) + "\n").encode())
+            await self.writer.drain()
+        return self.hello
+
+    async def messages(self):
+        """Yield daemon messages until the connection closes"""
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                return
+            yield json.loads(line)
+
+    def read_frame(self, message):
+        """Return the BGR frame referenced by a 'frame' message, or None if it was overwritten"""
+        if self.ring is None:
+            return None
+        return self.ring.read(message["slot"], message["seq"])
+
+    def close(self):
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm inference daemon for the multimodal apps")
+    parser.add_argument("--socket", default=ATTACH_SOCKET or DEFAULT_SOCKET, help="Unix socket path")
+    parser.add_argument("--camera", default="0", help="camera index, video file or image directory")
+    parser.add_argument("--audio", default=None, help="'mic' or a WAV file to replay")
+    parser.add_argument("--speech-backend", default=None, help="speech backend name")
+    parser.add_argument("--detector", default=None, help="object detector name (ultralytics, onnx, onnx-int8)")
+    parser.add_argument("--no-vision", action="store_true", help="do not open the camera")
+    parser.add_argument("--no-speech", action="store_true", help="do not open the microphone")
+    parser.add_argument("--metrics-port", type=int, default=METRICS_PORT,
+                        help="serve Prometheus metrics on this port (default off)")
+    args = parser.parse_args()
+
+    daemon = InferenceDaemon(
+        socket_path=args.socket,
+        camera_index=args.camera,
+        audio_source=args.audio,
+        speech_backend=args.speech_backend,
+        detector=args.detector,
+        vision=not args.no_vision,
+        speech=not args.no_speech
+    )
+    server = start_metrics_server(args.metrics_port)
+    if server:
+        print(f"[daemon] 📈 Metrics on http://{server.server_address[0]}:{server.server_port}/metrics")
+    install_profile_signal(on_done=lambda message: print(f"[daemon] {message}"))
+    try:
+        asyncio.run(daemon.serve())
+    except KeyboardInterrupt:
+        print("[daemon] Stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Wake-word and keyword spotting gate in front of full speech recognition.
+
+A small keyword model (PocketSphinx via KeywordBackend by default) listens
+to a short window of the audio ring buffer. Full ASR only runs for a few
+seconds after a wake word, and single-keyword commands ("mute",
+"screenshot", ...) are handled straight from the spotter. Enable it with
+MULTIMODAL_KEYWORD_GATE=1; wake words come from MULTIMODAL_WAKE_WORDS.
+"""
+
+import os
+import time
+import threading
+from collections import namedtuple
+import numpy as np
+from speech_backends import SAMPLE_RATE, KeywordBackend
+
+GATE_ENABLED = os.environ.get("MULTIMODAL_KEYWORD_GATE", "0") == "1"
+WAKE_WORDS = [w.strip() for w in os.environ.get("MULTIMODAL_WAKE_WORDS", "hey eva,eva").split(",") if w.strip()]
+
+# Commands that are complete on their own and skip full ASR
+DIRECT_COMMANDS = [
+    "volume up", "volume down", "unmute", "mute",
+    "brightness up", "brightness down", "screenshot",
+]
+
+# kind is "wake" or "command"; samples is the audio window that triggered it
+KeywordHit = namedtuple("KeywordHit", ["kind", "keyword", "samples"])
+
+
+class AudioRingBuffer:
+    """Fixed-size circular buffer of the most recent float32 samples"""
+
+    def __init__(self, seconds=3.0, sample_rate=SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.data = np.zeros(int(seconds * sample_rate), dtype=np.float32)
+        self.position = 0       # next write index
+        self.filled = 0         # valid samples in the buffer
+        self.total_written = 0  # samples written since creation
+        self.lock = threading.Lock()
+
+    def write(self, samples):
+        """Append samples, overwriting the oldest ones (safe from audio callbacks)"""
+        samples = np.asarray(samples, dtype=np.float32)[-self.data.size:]
+        with self.lock:
+            end = self.position + samples.size
+            if end <= self.data.size:
+                self.data[self.position:end] = samples
+            else:
+                split = self.data.size - self.position
+                self.data[self.position:] = samples[:split]
+                self.data[:end - self.data.size] = samples[split:]
+            self.position = end % self.data.size
+            self.filled = min(self.data.size, self.filled + samples.size)
+            self.total_written += samples.size
+
+    def latest(self, seconds):
+        """Return a copy of the newest samples in chronological order"""
+        with self.lock:
+            count = min(int(seconds * self.sample_rate), self.filled)
+            start = self.position - count
+            if start >= 0:
+                return self.data[start:self.position].copy()
+            return np.concatenate([self.data[start:], self.data[:self.position]])
+
+    def clear(self):
+        with self.lock:
+            self.filled = 0
+
+
+class KeywordSpotter:
+    """Cheap always-on stage that decides when full ASR should run"""
+
+    def __init__(self, detector=None, wake_words=None, commands=None,
+                 window_seconds=1.5, hop_seconds=0.25, open_seconds=6.0,
+                 silence_threshold=0.001, sample_rate=SAMPLE_RATE):
+        self.wake_words = sorted(wake_words or WAKE_WORDS, key=len, reverse=True)
+        self.commands = sorted(commands or DIRECT_COMMANDS, key=len, reverse=True)
+        self.detector = detector or KeywordBackend(keywords=self.wake_words + self.commands)
+        self.window_seconds = window_seconds
+        self.hop_seconds = hop_seconds
+        self.open_seconds = open_seconds
+        self.silence_threshold = silence_threshold
+        self.sample_rate = sample_rate
+        self.gate_until = 0.0
+        self.last_position = 0
+
+    def is_open(self, now=None):
+        """True while full ASR is allowed to run"""
+        return (now if now is not None else time.monotonic()) < self.gate_until
+
+    def open(self, now=None):
+        """Open (or extend) the ASR gate"""
+        self.gate_until = (now if now is not None else time.monotonic()) + self.open_seconds
+
+    def close(self):
+        self.gate_until = 0.0
+
+    def spot(self, samples, now=None):
+        """Check one audio window, return a KeywordHit or None"""
+        samples = np.asarray(samples, dtype=np.float32)
+        if samples.size == 0 or np.mean(samples ** 2) < self.silence_threshold:
+            return None
+        text = self.detector.transcribe(samples, self.sample_rate)
+        if not text:
+            return None
+        text = " ".join(text.lower().split())
+        for word in self.wake_words:
+            if word in text:
+                self.open(now)
+                return KeywordHit("wake", word, samples)
+        for command in self.commands:
+            if command in text:
+                return KeywordHit("command", command, samples)
+        return None
+
+    def poll(self, ring, now=None):
+        """Spot on the newest ring buffer window once enough new audio arrived"""
+        if ring.total_written - self.last_position < self.hop_seconds * self.sample_rate:
+            return None
+        self.last_position = ring.total_written
+        hit = self.spot(ring.latest(self.window_seconds), now)
+        if hit:
+            # Overlapping windows would report the same keyword again
+            ring.clear()
+        return hit
@@ -1,27 +1,38 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import asyncio
-import queue
 import time
-import cv2
+import queue
+# Caps the OpenMP/BLAS thread pools, so it has to come before numpy
+from thread_budget import THREAD_BUDGET
 import numpy as np
-from PIL import Image, ImageTk
-import speech_recognition as sr
-import mediapipe as mp
-from ultralytics import YOLO
-import pyautogui
-import screen_brightness_control as sbc
 import psutil
-import os
-import sounddevice as sd
-import scipy.io.wavfile as wav
-import tempfile
-import wave
-from concurrent.futures import ThreadPoolExecutor
 import threading
+from speech_backends import create_backend, audio_data_to_array, SpeechBackendError
+from keyword_spotter import KeywordSpotter, GATE_ENABLED
+from presence import PresenceTracker
+from scheduler import PriorityScheduler
+from resource_monitor import ResourceMonitor, describe
+from model_loader import ModelLoader, timed_import, lazy_import, warm_up_hands
+from detectors import create_detector
+from gestures import analyze_gesture
+from commands import run_command, EXIT
+from sources import open_video_source, AUDIO_SOURCE
+from metrics import REGISTRY, FRAMES_DROPPED, QUEUE_DEPTH, ASR_REAL_TIME_FACTOR, STATS_PANEL, start_metrics_server
+from tracing import TRACER, install_dump_signal
+from profiler import PROFILER, PROFILE_SECONDS, toggle as toggle_profiling, install_profile_signal
+from event_recorder import open_recorder
+from event_store import EventStore
+from inference_daemon import DaemonClient, daemon_available, landmarks_from_points, ATTACH_SOCKET
+
+# Heavy dependencies are imported on first use by the modality that needs them
+cv2 = lazy_import("cv2")
+sr = lazy_import("speech_recognition")
+Image = lazy_import("PIL.Image")
+ImageTk = lazy_import("PIL.ImageTk")
 # i m just kidding
 class MultimodalApp:
-    def __init__(self, root):
+    def __init__(self, root, speech_backend=None, keyword_gate=None, daemon_socket=None, detector=None):
         self.root = root
         self.root.title("Multimodal AI Assistant (Async)")
         self.root.geometry("1200x800")
@@ -29,7 +40,12 @@ class MultimodalApp:
         
         # Initialize asyncio components
         self.loop = asyncio.new_event_loop()
-        self.executor = ThreadPoolExecutor(max_workers=4)
+        # Each modality gets its own sized executor (see thread_budget.py)
+        self.executors = {name: THREAD_BUDGET.executor(name) for name in ("gesture", "vision", "speech")}
+        # Gesture and speech work is admitted ahead of object detection and display refresh
+        self.scheduler = PriorityScheduler()
+        # Lowers the YOLO rate / display FPS under CPU, memory, heat or battery pressure
+        self.monitor = ResourceMonitor(on_change=self.apply_degradation)
         
         # Initialize queues for inter-thread communication
         self.gesture_queue = asyncio.Queue()
@@ -47,12 +63,27 @@ class MultimodalApp:
         self.current_transcription = ""
         self.audio_buffer = []
         self.sample_rate = 16000
+        self.speech_backend_name = speech_backend
+        self.detector_name = detector
+        self.presence = PresenceTracker()
+        self.keyword_gate = GATE_ENABLED if keyword_gate is None else keyword_gate
+        
+        # Optional warm inference daemon to attach to instead of loading models
+        self.daemon_socket = daemon_socket or ATTACH_SOCKET
+        self.attached = False
+        
+        # Gestures, detections and transcripts are kept by time for fusion queries,
+        # and go to MULTIMODAL_EVENT_DIR when it is set
+        self.events = EventStore()
+        self.recorder = open_recorder()
         
         # Async tasks
         self.gesture_task = None
         self.speech_task = None
         self.object_task = None
         self.gui_update_task = None
+        self.daemon_task = None
+        self.monitor_task = None
         
         # Create GUI first
         self.create_gui()
@@ -64,28 +95,71 @@ class MultimodalApp:
         self.cap = None
         
     def init_models(self):
-        """Initialize all AI models"""
+        """Register model loaders; each model loads in the background when its modality starts"""
+        self.loader = ModelLoader(max_workers=3, after_load=THREAD_BUDGET.apply_libraries)
+        self.loader.register("hands", self._load_hands, warmup=warm_up_hands)
+        self.loader.register("yolo", self._load_yolo, warmup=lambda detector: detector.warmup())
+        self.loader.register("speech", self._load_speech, warmup=lambda backend: backend.warmup())
+        self.startup_reported = False
+        self.hands = None
+        self.detector = None
+        self.speech_backend = None
+        
+        # Optional wake-word / keyword gate in front of the full recognizer
+        self.keyword_spotter = KeywordSpotter() if self.keyword_gate else None
+    
+    def _load_hands(self):
+        """MediaPipe for gesture recognition"""
+        mp = timed_import("mediapipe")
+        self.mp_hands = mp.solutions.hands
+        self.mp_drawing = mp.solutions.drawing_utils
+        self.hands = self.mp_hands.Hands(
+            max_num_hands=1,
+            min_detection_confidence=0.7,
+            min_tracking_confidence=0.5
+        )
+        return self.hands
+    
+    def _load_yolo(self):
+        """YOLO for object detection (ultralytics or ONNX Runtime)"""
+        self.detector = create_detector(self.detector_name).load()
+        print(f"Object detector: {self.detector.name}")
+        return self.detector
+    
+    def _load_speech(self):
+        """Microphone capture + pluggable recognizer backend"""
+        self.recognizer = sr.Recognizer()
+        # MULTIMODAL_AUDIO_SOURCE=recording.wav replays a file instead of the microphone
+        self.microphone = sr.Microphone() if AUDIO_SOURCE == "mic" else sr.AudioFile(AUDIO_SOURCE)
+        self.speech_backend = create_backend(self.speech_backend_name)
+        self.speech_backend.load()
+        print(f"Speech backend: {self.speech_backend.name}")
+        return self.speech_backend
+    
+    async def wait_for_model(self, name):
+        """Wait for a background model load without blocking the event loop"""
         try:
-            # MediaPipe for gesture recognition
-            self.mp_hands = mp.solutions.hands
-            self.hands = self.mp_hands.Hands(
-                max_num_hands=1,
-                min_detection_confidence=0.7,
-                min_tracking_confidence=0.5
-            )
-            self.mp_drawing = mp.solutions.drawing_utils
-            
-            # YOLO for object detection
-            self.yolo_model = YOLO('yolov8n.pt')
-            
-            # Speech recognition (legacy)
-            self.recognizer = sr.Recognizer()
-            self.microphone = sr.Microphone()
-            
-            print("All models initialized successfully!")
-            
+            return await asyncio.wrap_future(self.loader.request(name))
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to initialize models: {str(e)}")
+            self.log_message(f"❌ Failed to load {name}: {str(e)}")
+            return None
+    
+    def update_load_progress(self):
+        """Show model loading progress (runs on the Tk thread)"""
+        self.load_status.config(text=self.loader.status_text())
+        done, total = self.loader.progress()
+        if done < total:
+            self.root.after(200, self.update_load_progress)
+        elif total and not self.startup_reported:
+            self.startup_reported = True
+            for line in self.loader.report():
+                self.log_message(line)
+    
+    def report_window_ready(self):
+        """Log how long it took from process start until the window was shown"""
+        elapsed = time.time() - psutil.Process().create_time()
+        self.log_message(f"🪟 Window ready {elapsed:.2f} s after process start")
+        self.log_message(f"🧵 {THREAD_BUDGET.summary()}")
     
     def create_gui(self):
         """Create the main GUI interface"""
@@ -120,10 +194,80 @@ class MultimodalApp:
         )
         self.start_button.pack(side=tk.LEFT, padx=5)
         
+        # Model loading progress
+        self.load_status = tk.Label(
+            control_frame,
+            text="Models: not loaded",
+            bg='#2c3e50',
+            fg='#bdc3c7',
+            font=("Arial", 10)
+        )
+        self.load_status.pack(side=tk.LEFT, padx=10)
+        
+        # Metrics panel toggle
+        self.stats_button = tk.Button(
+            control_frame,
+            text="📈 Stats",
+            command=self.toggle_stats,
+            font=("Arial", 10),
+            bg='#34495e',
+            fg='white'
+        )
+        self.stats_button.pack(side=tk.LEFT, padx=5)
+        
+        # Trace dump (Chrome/Perfetto JSON of the recent frames and utterances)
+        self.trace_button = tk.Button(
+            control_frame,
+            text="🧵 Trace",
+            command=self.dump_trace,
+            font=("Arial", 10),
+            bg='#34495e',
+            fg='white'
+        )
+        self.trace_button.pack(side=tk.LEFT, padx=5)
+        
+        # Sampling profiler (collapsed stacks for flamegraphs)
+        self.profile_button = tk.Button(
+            control_frame,
+            text="🔬 Profile",
+            command=self.toggle_profiler,
+            font=("Arial", 10),
+            bg='#34495e',
+            fg='white'
+        )
+        self.profile_button.pack(side=tk.LEFT, padx=5)
+        self.finished_profiles = queue.Queue()
+        PROFILER.on_done = self.profile_finished
+        self.root.after(250, self.poll_profiles)
+        
         # Individual model controls
         model_controls = tk.Frame(main_frame, bg='#2c3e50')
         model_controls.pack(pady=10)
         
+        # Stats panel (hidden until toggled)
+        self.stats_frame = tk.LabelFrame(
+            main_frame,
+            text="📈 Stats",
+            font=("Arial", 12, "bold"),
+            bg='#34495e',
+            fg='white'
+        )
+        self.stats_label = tk.Label(
+            self.stats_frame,
+            text="No metrics yet",
+            bg='#2c3e50',
+            fg='white',
+            font=("Consolas", 9),
+            justify=tk.LEFT,
+            anchor='w'
+        )
+        self.stats_label.pack(fill=tk.X, padx=5, pady=5)
+        self.model_controls = model_controls
+        self.stats_visible = False
+        self.stats_updated = 0.0
+        if STATS_PANEL:
+            self.toggle_stats()
+        
         # Gesture control
         gesture_frame = tk.LabelFrame(
             model_controls,
@@ -280,6 +424,58 @@ class MultimodalApp:
         
         # Note: GUI updates are now handled by async_gui_update method
     
+    def toggle_stats(self):
+        """Show or hide the metrics panel"""
+        self.stats_visible = not self.stats_visible
+        if self.stats_visible:
+            self.stats_frame.pack(pady=5, fill=tk.X, before=self.model_controls)
+            self.refresh_stats()
+        else:
+            self.stats_frame.pack_forget()
+    
+    def refresh_stats(self):
+        """Redraw the metrics panel from the registry"""
+        self.stats_updated = time.monotonic()
+        lines = REGISTRY.summary()
+        self.stats_label.config(text="\n".join(lines) if lines else "No metrics yet")
+    
+    def dump_trace(self):
+        """Write the recent trace spans as Chrome trace JSON"""
+        try:
+            self.log_message(f"🧵 Trace written to {TRACER.dump()}")
+        except OSError as e:
+            self.log_message(f"❌ Could not write trace: {str(e)}")
+    
+    def toggle_profiler(self):
+        """Start a profiling window, or end the running one early"""
+        if toggle_profiling(PROFILER):
+            self.profile_button.config(text="⏹️ Profile", bg='#e74c3c')
+            self.log_message(f"🔬 Profiling all threads for up to {PROFILE_SECONDS:.0f} s")
+    
+    def profile_finished(self, path):
+        """Called from the profiler thread once a window has been written"""
+        # Tk is not thread-safe, not even root.after: poll_profiles picks this up
+        self.finished_profiles.put(path)
+    
+    def poll_profiles(self):
+        """Show finished profiles (runs on the Tk thread)"""
+        try:
+            while True:
+                path = self.finished_profiles.get_nowait()
+                self.profile_button.config(text="🔬 Profile", bg='#34495e')
+                self.log_message(PROFILER.describe(path))
+                for label, share in PROFILER.top(3):
+                    self.log_message(f"   {share:5.1%} {label}")
+        except queue.Empty:
+            pass
+        self.root.after(250, self.poll_profiles)
+    
+    def record_event(self, kind, **fields):
+        """Add an event to the event store and queue it for the event log (never blocks)"""
+        event = self.events.add(kind, **fields)
+        if self.recorder:
+            self.recorder.write({"t": round(event.t, 3), "type": kind, **fields})
+    
     def log_message(self, message):
         """Add message to log with timestamp"""
         timestamp = time.strftime("%H:%M:%S")
@@ -301,10 +497,17 @@ class MultimodalApp:
             self.running = True
             self.start_button.config(text="⏹️ Stop All Models", bg='#e74c3c')
             
-            # Start camera
-            self.cap = cv2.VideoCapture(0)
-            if not self.cap.isOpened():
-                raise Exception("Cannot open camera")
+            # A running inference daemon already has the models and devices open
+            self.attached = bool(self.daemon_socket) and daemon_available(self.daemon_socket)
+            if not self.attached:
+                # Load the models for the enabled modalities in parallel, in the background
+                self.loader.request_all(["hands", "yolo", "speech"])
+                self.update_load_progress()
+                
+                # Start camera (or the replay source from MULTIMODAL_VIDEO_SOURCE)
+                self.cap = open_video_source()
+                if not self.cap.isOpened():
+                    raise Exception("Cannot open camera")
             
             # Start asyncio loop in a separate thread
             def run_async_loop():
@@ -330,6 +533,11 @@ class MultimodalApp:
     
     def _start_async_tasks(self):
         """Start all async tasks"""
+        self.monitor_task = self.loop.create_task(self.monitor.run(lambda: self.running))
+        if self.attached:
+            self.daemon_task = self.loop.create_task(self.daemon_client_loop())
+            self.gui_update_task = self.loop.create_task(self.async_gui_update())
+            return
         self.gesture_task = self.loop.create_task(self.gesture_recognition_loop())
         self.speech_task = self.loop.create_task(self.speech_recognition_loop())
         self.object_task = self.loop.create_task(self.object_detection_loop())
@@ -351,6 +559,10 @@ class MultimodalApp:
             self.object_task.cancel()
         if self.gui_update_task:
             self.gui_update_task.cancel()
+        if self.daemon_task:
+            self.daemon_task.cancel()
+        if self.monitor_task:
+            self.monitor_task.cancel()
         
         # Stop asyncio loop
         if self.loop.is_running():
@@ -360,48 +572,63 @@ class MultimodalApp:
             self.cap.release()
             self.cap = None
         
+        self.presence.reset()
         self.start_button.config(text="🚀 Start All Models", bg='#27ae60')
         self.log_message("⏹️ All models stopped")
+        report = self.scheduler.report()
+        if len(report) > 1:
+            for line in report:
+                self.log_message(line)
     
     async def gesture_recognition_loop(self):
         """Main loop for gesture recognition"""
         self.log_message("👋 Gesture recognition started")
         
+        if await self.wait_for_model("hands") is None:
+            self.gesture_running = False
+        
         while self.gesture_running and self.cap and self.cap.isOpened():
             try:
-                ret, frame = self.cap.read()
+                trace = TRACER.new_trace("frame")
+                with TRACER.span(trace, "capture"):
+                    ret, frame = self.cap.read()
                 if not ret:
                     continue
                 
-                # Flip frame horizontally for mirror effect
-                frame = cv2.flip(frame, 1)
-                
-                # Convert to RGB for MediaPipe
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                results = self.hands.process(rgb_frame)
+                with TRACER.span(trace, "preprocess"):
+                    # Flip frame horizontally for mirror effect
+                    frame = cv2.flip(frame, 1)
+                    
+                    # Convert to RGB for MediaPipe
+                    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                results = await self.scheduler.run(
+                    "gesture",
+                    self.executors["gesture"],
+                    self.hands.process,
+                    rgb_frame,
+                    trace=trace
+                )
                 
                 if results.multi_hand_landmarks:
                     for hand_landmarks in results.multi_hand_landmarks:
-                        # Draw landmarks
-                        self.mp_drawing.draw_landmarks(
-                            frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS
-                        )
-                        
-                        # Analyze gesture
-                        gesture = self.analyze_gesture(hand_landmarks)
+                        with TRACER.span(trace, "classify", stage="gesture"):
+                            # Draw landmarks
+                            self.mp_drawing.draw_landmarks(
+                                frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS
+                            )
+                            
+                            # Analyze gesture
+                            gesture = self.analyze_gesture(hand_landmarks)
                         if gesture:
-                            await self.gesture_queue.put(gesture)
+                            await self.gesture_queue.put((gesture, trace, TRACER.clock()))
                             self.log_message(f"👋 Gesture detected: {gesture}")
+                            self.record_event("gesture", gesture=gesture)
                 
-                # Convert frame for Tkinter display
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                frame_pil = Image.fromarray(frame_rgb)
-                frame_pil = frame_pil.resize((640, 480))
-                frame_tk = ImageTk.PhotoImage(frame_pil)
-                
-                # Update camera display
-                self.camera_label.config(image=frame_tk, text="")
-                self.camera_label.image = frame_tk
+                if self.scheduler.due("display"):
+                    with TRACER.span(trace, "render", widget="camera"):
+                        self.show_frame(frame)
+                else:
+                    FRAMES_DROPPED.inc(stage="display")
                 
                 await asyncio.sleep(0.033)  # ~30 FPS
                 
@@ -411,168 +638,179 @@ class MultimodalApp:
         
         self.log_message("👋 Gesture recognition stopped")
     
-    def analyze_gesture(self, landmarks):
-        """Analyze hand landmarks to determine gesture"""
+    def show_frame(self, frame):
+        """Show a BGR frame in the camera panel"""
+        # Convert frame for Tkinter display
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        frame_pil = Image.fromarray(frame_rgb)
+        frame_pil = frame_pil.resize((640, 480))
+        frame_tk = ImageTk.PhotoImage(frame_pil)
+        
+        # Update camera display
+        self.camera_label.config(image=frame_tk, text="")
+        self.camera_label.image = frame_tk
+    
+    async def daemon_client_loop(self):
+        """Thin-client mode: frames, hands, detections and transcripts come from the inference daemon"""
+        client = DaemonClient(self.daemon_socket)
         try:
-            # Get landmark coordinates
-            points = []
-            for lm in landmarks.landmark:
-                points.append([lm.x, lm.y, lm.z])
-            
-            # Calculate distances and angles
-            thumb_tip = points[4]
-            index_tip = points[8]
-            middle_tip = points[12]
-            ring_tip = points[16]
-            pinky_tip = points[20]
-            
-            # Volume control gesture (thumb up/down)
-            if self.is_volume_gesture(points):
-                if thumb_tip[1] < points[3][1]:  # Thumb pointing up
-                    return "VOLUME_UP"
-                else:  # Thumb pointing down
-                    return "VOLUME_DOWN"
-            
-            # Brightness control gesture (index finger up/down)
-            if self.is_brightness_gesture(points):
-                if index_tip[1] < points[6][1]:  # Index pointing up
-                    return "BRIGHTNESS_UP"
-                else:  # Index pointing down
-                    return "BRIGHTNESS_DOWN"
-            
-            # Mouse control gesture (open palm)
-            if self.is_mouse_gesture(points):
-                return "MOUSE_CONTROL"
-            
-            # Screenshot gesture (peace sign)
-            if self.is_screenshot_gesture(points):
-                return "SCREENSHOT"
-            
-            return None
-            
-        except Exception as e:
-            return None
+            await client.connect()
+            self.log_message(f"🔌 Attached to inference daemon ({client.hello['models']})")
+            async for message in client.messages():
+                if not self.running:
+                    break
+                topic = message["topic"]
+                if topic == "frame" and self.gesture_running:
+                    frame = client.read_frame(message)
+                    if frame is not None:
+                        # Flip frame horizontally for mirror effect
+                        self.show_frame(cv2.flip(frame, 1))
+                elif topic == "hands" and self.gesture_running:
+                    trace = TRACER.new_trace("frame")
+                    for points in message["hands"]:
+                        with TRACER.span(trace, "classify", stage="gesture"):
+                            gesture = self.analyze_gesture(landmarks_from_points(points))
+                        if gesture:
+                            await self.gesture_queue.put((gesture, trace, TRACER.clock()))
+                            self.log_message(f"👋 Gesture detected: {gesture}")
+                            self.record_event("gesture", gesture=gesture)
+                elif topic == "detections" and self.object_running:
+                    await self.handle_detections(message["detections"])
+                elif topic == "transcript" and self.speech_running:
+                    await self.handle_transcription(message["text"])
+            self.log_message("🔌 Inference daemon disconnected")
+        except (OSError, ValueError) as e:
+            self.log_message(f"❌ Inference daemon error: {str(e)}")
+        finally:
+            client.close()
     
-    def is_volume_gesture(self, points):
-        """Check if gesture is for volume control"""
-        # Thumb extended, other fingers closed
-        thumb_tip = points[4]
-        thumb_ip = points[3]
-        index_tip = points[8]
-        middle_tip = points[12]
-        
-        # Check if thumb is extended and others are closed
-        return (abs(thumb_tip[0] - thumb_ip[0]) > 0.05 and 
-                index_tip[1] > points[6][1] and 
-                middle_tip[1] > points[10][1])
-    
-    def is_brightness_gesture(self, points):
-        """Check if gesture is for brightness control"""
-        # Index finger extended, others closed
-        index_tip = points[8]
-        middle_tip = points[12]
-        ring_tip = points[16]
-        
-        return (index_tip[1] < points[6][1] and 
-                middle_tip[1] > points[10][1] and 
-                ring_tip[1] > points[14][1])
-    
-    def is_mouse_gesture(self, points):
-        """Check if gesture is for mouse control"""
-        # All fingers extended (open palm)
-        return all(points[i][1] < points[i-2][1] for i in [8, 12, 16, 20])
-    
-    def is_screenshot_gesture(self, points):
-        """Check if gesture is for screenshot (peace sign)"""
-        # Index and middle fingers extended, others closed
-        index_tip = points[8]
-        middle_tip = points[12]
-        ring_tip = points[16]
-        pinky_tip = points[20]
-        
-        return (index_tip[1] < points[6][1] and 
-                middle_tip[1] < points[10][1] and 
-                ring_tip[1] > points[14][1] and 
-                pinky_tip[1] > points[18][1])
+    def analyze_gesture(self, landmarks):
+        """Analyze hand landmarks to determine gesture"""
+        return analyze_gesture(landmarks)
     
     async def speech_recognition_loop(self):
         """Main loop for speech recognition with real-time transcription"""
         self.log_message("🎤 Speech recognition started")
         
+        if await self.wait_for_model("speech") is None:
+            self.speech_running = False
+            return
+        
         try:
+            # One open source for the whole loop: re-entering an AudioFile rewinds it
             with self.microphone as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=1)
-                self.log_message("🎤 Ambient noise adjusted")
-            
-            while self.speech_running:
-                try:
-                    # Run blocking speech recognition in thread pool
-                    loop = asyncio.get_event_loop()
-                    
-                    # Listen for audio
-                    audio = await loop.run_in_executor(
-                        self.executor,
-                        self._listen_for_audio
-                    )
-                    
-                    if audio:
-                        # Recognize speech
-                        text = await loop.run_in_executor(
-                            self.executor,
-                            self._recognize_audio,
-                            audio
-                        )
-                        
-                        if text:
-                            # Update transcription display
-                            self.current_transcription = text
-                            await self.transcription_queue.put(text)
-                            await self.speech_queue.put(text.lower())
-                            self.log_message(f"🎤 Transcribed: {text}")
-                            
-                            # Process voice commands
-                            await self.process_voice_command(text.lower())
-                            
-                except Exception as e:
-                    if self.speech_running:  # Only log if not intentionally stopped
-                        self.log_message(f"❌ Speech recognition error: {str(e)}")
-                    break
+                if AUDIO_SOURCE == "mic":
+                    self.recognizer.adjust_for_ambient_noise(source, duration=1)
+                    self.log_message("🎤 Ambient noise adjusted")
+                await self._speech_loop(source)
                     
         except Exception as e:
             self.log_message(f"❌ Speech recognition error: {str(e)}")
         
         self.log_message("🎤 Speech recognition stopped")
     
-    def _listen_for_audio(self):
-        """Blocking method to listen for audio"""
+    async def _speech_loop(self, source):
+        """Listen, gate and transcribe until stopped or the replayed file ends"""
+        while self.speech_running:
+            try:
+                # Run blocking speech recognition in thread pool
+                loop = asyncio.get_event_loop()
+                
+                # Listen for audio
+                listening = TRACER.clock()
+                audio = await loop.run_in_executor(
+                    self.executors["speech"],
+                    self._listen_for_audio,
+                    source
+                )
+                if audio is not None and not audio.frame_data:
+                    self.log_message("🎤 End of audio file")
+                    break
+                trace = TRACER.new_trace("audio") if audio else None
+                TRACER.record(trace, "capture", listening)
+                
+                if audio and self.keyword_spotter and not self.keyword_spotter.is_open():
+                    # Gate closed: only the cheap keyword spotter hears this utterance
+                    hit = await self.scheduler.run(
+                        "speech",
+                        self.executors["speech"],
+                        self.keyword_spotter.spot,
+                        audio_data_to_array(audio),
+                        trace=trace
+                    )
+                    if hit is None:
+                        continue
+                    self.log_message(f"🔑 Keyword spotted: {hit.keyword}")
+                    if hit.kind == "command":
+                        await self.process_voice_command(hit.keyword, trace)
+                        continue
+                
+                if audio:
+                    # Recognize speech
+                    text = await self.scheduler.run(
+                        "speech",
+                        self.executors["speech"],
+                        self._recognize_audio,
+                        audio,
+                        trace=trace
+                    )
+                    
+                    if text:
+                        await self.handle_transcription(text, trace)
+                        
+            except Exception as e:
+                if self.speech_running:  # Only log if not intentionally stopped
+                    self.log_message(f"❌ Speech recognition error: {str(e)}")
+                break
+    
+    async def handle_transcription(self, text, trace=None):
+        """Show a transcription and run any voice command in it"""
+        # Update transcription display
+        self.current_transcription = text
+        await self.transcription_queue.put(text)
+        await self.speech_queue.put(text.lower())
+        self.log_message(f"🎤 Transcribed: {text}")
+        self.record_event("transcript", text=text)
+        if self.keyword_spotter:
+            self.keyword_spotter.open()
+        
+        # Process voice commands
+        await self.process_voice_command(text.lower(), trace)
+    
+    def _listen_for_audio(self, source):
+        """Blocking method to listen for audio; empty audio once a file has run out"""
         try:
-            with self.microphone as source:
-                return self.recognizer.listen(source, timeout=1, phrase_time_limit=5)
+            return self.recognizer.listen(source, timeout=1, phrase_time_limit=5)
         except:
             return None
     
     def _recognize_audio(self, audio):
         """Blocking method to recognize audio"""
+        started = time.perf_counter()
         try:
-            return self.recognizer.recognize_google(audio)
-        except sr.UnknownValueError:
-            return None
-        except sr.RequestError as e:
+            return self.speech_backend.recognize(audio)
+        except SpeechBackendError as e:
             self.log_message(f"❌ Speech recognition service error: {str(e)}")
             return None
+        finally:
+            duration = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+            if duration:
+                ASR_REAL_TIME_FACTOR.observe((time.perf_counter() - started) / duration)
     
     async def recognize_speech(self, audio_file):
         """Recognize speech from audio file using speech_recognition"""
         try:
             loop = asyncio.get_event_loop()
+            await self.wait_for_model("speech")
             
             # Load audio file
             with sr.AudioFile(audio_file) as source:
                 audio = self.recognizer.record(source)
             
             # Recognize speech
-            text = await loop.run_in_executor(
-                self.executor,
+            text = await self.scheduler.run(
+                "speech",
+                self.executors["speech"],
                 self._recognize_audio,
                 audio
             )
@@ -583,47 +821,18 @@ class MultimodalApp:
             self.log_message(f"❌ Speech recognition error: {str(e)}")
             return None
     
-    async def process_voice_command(self, command):
+    async def process_voice_command(self, command, trace=None):
         """Process voice commands"""
         try:
-            if "volume up" in command or "increase volume" in command:
-                pyautogui.press('volumeup')
-                self.log_message("🔊 Volume increased")
-                
-            elif "volume down" in command or "decrease volume" in command:
-                pyautogui.press('volumedown')
-                self.log_message("🔊 Volume decreased")
-                
-            elif "mute" in command or "unmute" in command:
-                pyautogui.press('volumemute')
-                self.log_message("🔇 Volume toggled")
-                
-            elif "brightness up" in command or "increase brightness" in command:
-                current = sbc.get_brightness()[0]
-                sbc.set_brightness(min(100, current + 10))
-                self.log_message("💡 Brightness increased")
-                
-            elif "brightness down" in command or "decrease brightness" in command:
-                current = sbc.get_brightness()[0]
-                sbc.set_brightness(max(0, current - 10))
-                self.log_message("💡 Brightness decreased")
-                
-            elif "screenshot" in command or "take screenshot" in command:
-                screenshot = pyautogui.screenshot()
-                screenshot.save(f"screenshot_{int(time.time())}.png")
-                self.log_message("📸 Screenshot taken")
-                
-            elif "open notepad" in command:
-                os.system("notepad")
-                self.log_message("📝 Notepad opened")
-                
-            elif "open calculator" in command:
-                os.system("calc")
-                self.log_message("🧮 Calculator opened")
-                
-            elif "close" in command or "exit" in command:
+            with TRACER.span(trace, "action", command=command):
+                message = run_command(command)
+            if message == EXIT:
                 self.log_message("👋 Goodbye!")
                 self.root.after(1000, self.root.quit)
+            elif message:
+                self.log_message(message)
+            if message:
+                self.record_event("command", command=command, result=message)
                 
         except Exception as e:
             self.log_message(f"❌ Voice command error: {str(e)}")
@@ -632,40 +841,35 @@ class MultimodalApp:
         """Main loop for object detection"""
         self.log_message("👁️ Object detection started")
         
+        if await self.wait_for_model("yolo") is None:
+            self.object_running = False
+        
         while self.object_running and self.cap and self.cap.isOpened():
             try:
-                ret, frame = self.cap.read()
+                level = self.monitor.level
+                if not level.objects:
+                    # Paused by the resource monitor until pressure eases
+                    await asyncio.sleep(self.monitor.interval)
+                    continue
+                
+                trace = TRACER.new_trace("frame")
+                with TRACER.span(trace, "capture"):
+                    ret, frame = self.cap.read()
                 if not ret:
                     continue
                 
                 # Run YOLO detection
-                results = self.yolo_model(frame, verbose=False)
-                
-                detected_objects = []
-                for result in results:
-                    boxes = result.boxes
-                    if boxes is not None:
-                        for box in boxes:
-                            # Get box coordinates
-                            x1, y1, x2, y2 = box.xyxy[0]
-                            confidence = box.conf[0]
-                            class_id = int(box.cls[0])
-                            class_name = self.yolo_model.names[class_id]
-                            
-                            if confidence > 0.5:  # Confidence threshold
-                                detected_objects.append({
-                                    'name': class_name,
-                                    'confidence': float(confidence),
-                                    'bbox': [int(x1), int(y1), int(x2), int(y2)]
-                                })
+                detected_objects = await self.scheduler.run(
+                    "object",
+                    self.executors["vision"],
+                    self.detector.detect,
+                    frame,
+                    trace=trace
+                )
                 
-                if detected_objects:
-                    # Get most confident detection
-                    best_detection = max(detected_objects, key=lambda x: x['confidence'])
-                    await self.object_queue.put(best_detection)
-                    self.log_message(f"👁️ Detected: {best_detection['name']} ({best_detection['confidence']:.2f})")
+                await self.handle_detections(detected_objects, trace)
                 
-                await asyncio.sleep(0.1)  # Reduce CPU usage
+                await asyncio.sleep(level.object_interval)  # Reduce CPU usage
                 
             except Exception as e:
                 self.log_message(f"❌ Object detection error: {str(e)}")
@@ -673,14 +877,36 @@ class MultimodalApp:
         
         self.log_message("👁️ Object detection stopped")
     
+    def apply_degradation(self, change):
+        """Apply a resource monitor level: display FPS here, YOLO rate in the object loop"""
+        policy = self.scheduler.policy("display")
+        self.scheduler.policies["display"] = policy._replace(period=1 / change.level.display_fps)
+        self.log_message(describe(change))
+    
+    async def handle_detections(self, detected_objects, trace=None):
+        """Only report objects appearing, leaving or changing count"""
+        with TRACER.span(trace, "classify", stage="presence"):
+            events = self.presence.update(detected_objects)
+        for event in events:
+            await self.object_queue.put({'name': event.name, 'event': event.kind, 'count': event.count})
+            self.record_event("object", event=event.kind, name=event.name, count=event.count)
+            if event.kind == "appeared":
+                self.log_message(f"👁️ {event.name} appeared")
+            elif event.kind == "left":
+                self.log_message(f"👁️ {event.name} left")
+            else:
+                self.log_message(f"👁️ {event.name}: {event.previous} → {event.count}")
+    
     async def async_gui_update(self):
         """Async GUI update loop"""
         while self.running:
             try:
                 # Update gesture info
                 try:
-                    gesture = await asyncio.wait_for(self.gesture_queue.get(), timeout=0.1)
-                    self.gesture_info.config(text=f"Last: {gesture}")
+                    gesture, trace, queued = await asyncio.wait_for(self.gesture_queue.get(), timeout=0.1)
+                    TRACER.record(trace, "queue_wait", queued, queue="gesture")
+                    with TRACER.span(trace, "render", widget="gesture_info"):
+                        self.gesture_info.config(text=f"Last: {gesture}")
                 except asyncio.TimeoutError:
                     pass
                 
@@ -703,30 +929,39 @@ class MultimodalApp:
                 # Update object info
                 try:
                     obj = await asyncio.wait_for(self.object_queue.get(), timeout=0.1)
-                    self.object_info.config(text=f"Last: {obj['name']}")
+                    self.object_info.config(text=f"Last: {obj['name']} {obj['event']} ({obj['count']})")
                 except asyncio.TimeoutError:
                     pass
                 
                 # Update status indicators
-                if self.gesture_running:
-                    self.gesture_status.config(text="Status: Running", fg='#27ae60')
-                else:
-                    self.gesture_status.config(text="Status: Stopped", fg='#e74c3c')
-                
-                if self.speech_running:
-                    self.speech_status.config(text="Status: Running", fg='#27ae60')
-                else:
-                    self.speech_status.config(text="Status: Stopped", fg='#e74c3c')
+                self.update_status(self.gesture_status, self.gesture_running, "hands")
+                self.update_status(self.speech_status, self.speech_running, "speech")
+                self.update_status(self.object_status, self.object_running, "yolo")
+                if self.object_running and self.loader.is_ready("yolo") and hasattr(self.detector, "status"):
+                    self.object_status.config(text=f"Status: Running - {self.detector.status()}")
                 
-                if self.object_running:
-                    self.object_status.config(text="Status: Running", fg='#27ae60')
-                else:
-                    self.object_status.config(text="Status: Stopped", fg='#e74c3c')
+                # Queue depths and the stats panel (once a second)
+                for name, pending in (("gesture", self.gesture_queue), ("speech", self.speech_queue),
+                                      ("object", self.object_queue), ("transcription", self.transcription_queue)):
+                    QUEUE_DEPTH.set(pending.qsize(), queue=name)
+                if self.stats_visible and time.monotonic() - self.stats_updated >= 1.0:
+                    self.refresh_stats()
                 
             except Exception as e:
                 print(f"Async GUI update error: {str(e)}")
             
             await asyncio.sleep(0.1)  # Update every 100ms
+    
+    def update_status(self, label, running, model_name):
+        """Show Stopped / Loading / Warming up / Running for one modality"""
+        if not running:
+            label.config(text="Status: Stopped", fg='#e74c3c')
+        elif not self.attached and self.loader.phase(model_name) == "warming up":
+            label.config(text="Status: Warming up...", fg='#f39c12')
+        elif not self.attached and not self.loader.is_ready(model_name):
+            label.config(text="Status: Loading...", fg='#f39c12')
+        else:
+            label.config(text="Status: Running", fg='#27ae60')
 
 def main():
     root = tk.Tk()
@@ -735,9 +970,19 @@ def main():
     # Handle window close
     def on_closing():
         app.stop_all_models()
+        if app.recorder:
+            app.recorder.close()
         root.destroy()
     
     root.protocol("WM_DELETE_WINDOW", on_closing)
+    root.after(0, app.report_window_ready)
+    server = start_metrics_server()
+    if server:
+        app.log_message(f"📈 Metrics on http://{server.server_address[0]}:{server.server_port}/metrics")
+    install_dump_signal()
+    install_profile_signal(on_done=app.log_message)
+    if app.recorder:
+        app.log_message(f"📼 Recording events to {app.recorder.directory}")
     root.mainloop()
 
 if __name__ == "__main__":
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+In-process metrics for the Multimodal AI Assistant.
+
+A small registry of counters, gauges and fixed-bucket histograms, cheap
+enough to update on every frame (one lock and a bisect per observation).
+The apps, the daemon and the headless pipeline record into REGISTRY:
+
+    multimodal_frames_captured_total   frames read, by source kind
+    multimodal_capture_fps             capture rate over the last second
+    multimodal_frames_dropped_total    frames a stage skipped, by stage
+    multimodal_inference_seconds       inference time, by modality
+    multimodal_scheduler_wait_seconds  time spent waiting for a slot
+    multimodal_queue_depth             items waiting, by queue
+    multimodal_asr_real_time_factor    recognition time / audio duration
+    multimodal_action_seconds          time to carry out an action, by source
+
+Set MULTIMODAL_METRICS_PORT to serve them in Prometheus text format on
+http://127.0.0.1:PORT/metrics (MULTIMODAL_METRICS_HOST changes the address).
+MULTIMODAL_STATS_PANEL=1 opens the stats panel in the main app at startup.
+"""
+
+import os
+import time
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_port = os.environ.get("MULTIMODAL_METRICS_PORT", "").strip()
+METRICS_PORT = int(_port) if _port else None
+METRICS_HOST = os.environ.get("MULTIMODAL_METRICS_HOST", "127.0.0.1")
+STATS_PANEL = os.environ.get("MULTIMODAL_STATS_PANEL", "0") == "1"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RTF_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 4.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base class: a named family of values keyed by label values"""
+
+    kind = "untyped"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def _key(self, labels):
+        if len(labels) != len(self.label_names) or any(name not in labels for name in self.label_names):
+            raise ValueError(f"{self.name} takes labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def get(self, **labels):
+        with self.lock:
+            return self.values.get(self._key(labels), 0)
+
+    def samples(self):
+        """(suffix, label values, extra label, value) tuples for the exposition format"""
+        with self.lock:
+            return [("", key, None, value) for key, value in sorted(self.values.items())]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, key, extra, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(self.label_names, key, extra)} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    """Monotonically increasing count"""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError(f"{self.name}: counters only go up")
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """Value that can go up and down"""
+
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class HistogramValue:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.counts = [0] * (len(buckets) + 1)   # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(Metric):
+    """Observations counted into fixed buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            entry = self.values.get(key)
+            if entry is None:
+                entry = self.values[key] = HistogramValue(self.buckets)
+            entry.counts[index] += 1
+            entry.sum += value
+            entry.count += 1
+
+    def get(self, **labels):
+        """(count, sum) for one label set"""
+        with self.lock:
+            entry = self.values.get(self._key(labels))
+            return (entry.count, entry.sum) if entry else (0, 0.0)
+
+    def quantile(self, q, **labels):
+        """Bucket upper bound below which a fraction q of observations fall (None if empty)"""
+        with self.lock:
+            entry = self.values.get(self._key(labels))
+            if not entry or not entry.count:
+                return None
+            target, running = q * entry.count, 0
+            for bound, count in zip(self.buckets + (float("inf"),), entry.counts):
+                running += count
+                if running >= target:
+                    return bound
+        return float("inf")
+
+    def samples(self):
+        rows = []
+        with self.lock:
+            for key, entry in sorted(self.values.items()):
+                running = 0
+                for bound, count in zip(self.buckets + (float("inf"),), entry.counts):
+                    running += count
+                    rows.append(("_bucket", key, f'le="{_format_value(bound)}"', running))
+                rows.append(("_sum", key, None, entry.sum))
+                rows.append(("_count", key, None, entry.count))
+        return rows
+
+
+class MetricsRegistry:
+    """Named metrics, rendered together in Prometheus text format"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+
+    def _get_or_create(self, cls, name, help, labels, **kwargs):
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, help, labels, **kwargs)
+            elif type(metric) is not cls or metric.label_names != tuple(labels):
+                raise ValueError(f"Metric {name} already registered as a {metric.kind} with labels {metric.label_names}")
+            return metric
+
+    def counter(self, name, help, labels=()):
+        return self._get_or_create(Counter, name, help, labels)
+
+    def gauge(self, name, help, labels=()):
+        return self._get_or_create(Gauge, name, help, labels)
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        return self._get_or_create(Histogram, name, help, labels, buckets=buckets)
+
+    def render(self):
+        """The whole registry in Prometheus text exposition format"""
+        with self.lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """Short human-readable lines for the GUI stats panel"""
+        lines = []
+        with self.lock:
+            metrics = list(self.metrics.values())
+        for metric in metrics:
+            with metric.lock:
+                keys = sorted(metric.values)
+            for key in keys:
+                labels = dict(zip(metric.label_names, key))
+                tag = metric.name.replace("multimodal_", "") + "".join(f" {value}" for value in key)
+                if isinstance(metric, Histogram):
+                    count, total = metric.get(**labels)
+                    if count:
+                        p95 = metric.quantile(0.95, **labels)
+                        lines.append(f"{tag}: n={count} mean={total / count:.3g} p95≤{_format_value(p95)}")
+                else:
+                    lines.append(f"{tag}: {metric.get(**labels):.4g}")
+        return lines
+
+
+class RateMeter:
+    """Sets a gauge to the event rate, recomputed every window seconds"""
+
+    def __init__(self, gauge, window=1.0, **labels):
+        self.gauge = gauge
+        self.window = window
+        self.labels = labels
+        self.started = None
+        self.events = 0
+
+    def tick(self, now=None):
+        now = time.monotonic() if now is None else now
+        if self.started is None:
+            self.started = now
+        self.events += 1
+        elapsed = now - self.started
+        if elapsed >= self.window:
+            self.gauge.set(self.events / elapsed, **self.labels)
+            self.started, self.events = now, 0
+
+
+REGISTRY = MetricsRegistry()
+
+FRAMES_CAPTURED = REGISTRY.counter(
+    "multimodal_frames_captured_total", "Frames read from the video source", ["source"])
+CAPTURE_FPS = REGISTRY.gauge(
+    "multimodal_capture_fps", "Frames per second read from the video source")
+FRAMES_DROPPED = REGISTRY.counter(
+    "multimodal_frames_dropped_total", "Captured frames a stage skipped because it was busy or throttled", ["stage"])
+INFERENCE_SECONDS = REGISTRY.histogram(
+    "multimodal_inference_seconds", "Time per inference call", ["modality"])
+SCHEDULER_WAIT_SECONDS = REGISTRY.histogram(
+    "multimodal_scheduler_wait_seconds", "Time inference calls waited for a scheduler slot", ["modality"])
+QUEUE_DEPTH = REGISTRY.gauge(
+    "multimodal_queue_depth", "Items waiting in a queue", ["queue"])
+ASR_REAL_TIME_FACTOR = REGISTRY.histogram(
+    "multimodal_asr_real_time_factor", "Speech recognition time divided by audio duration", buckets=RTF_BUCKETS)
+ACTION_SECONDS = REGISTRY.histogram(
+    "multimodal_action_seconds", "Time to carry out a recognized gesture or command", ["source"])
+
+_capture_rate = RateMeter(CAPTURE_FPS)
+
+
+def frame_captured(source):
+    """Count one captured frame and update the capture FPS gauge"""
+    FRAMES_CAPTURED.inc(source=source)
+    _capture_rate.tick()
+
+
+def timed_transcribe(transcribe, samples, sample_rate=16000):
+    """Call transcribe(samples, sample_rate) and record its real-time factor"""
+    started = time.perf_counter()
+    try:
+        return transcribe(samples, sample_rate)
+    finally:
+        if len(samples):
+            ASR_REAL_TIME_FACTOR.observe((time.perf_counter() - started) * sample_rate / len(samples))
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass    # scrapes every few seconds would flood the log
+
+
+def start_metrics_server(port=None, host=None, registry=REGISTRY):
+    """Serve /metrics from a daemon thread
+
+    port defaults to MULTIMODAL_METRICS_PORT; without one nothing is started
+    and None is returned. Port 0 picks a free port (see server.server_port).
+    """
+    port = METRICS_PORT if port is None else port
+    if port is None:
+        return None
+    handler = type("RegistryHandler", (MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((host or METRICS_HOST, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Background model loading with a startup-time breakdown.
+
+Models are registered with a factory and only loaded when a modality first
+asks for them. Requested models load in parallel on a small thread pool so
+the window stays responsive, and the time spent in each heavy import and
+each model load is kept for the startup report.
+
+A model can also register a warm-up function. It runs on synthetic input
+right after loading, before the model counts as ready, so lazy allocation,
+graph preparation and kernel selection happen off the interaction path.
+"""
+
+import sys
+import time
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+# module name -> seconds spent on its first import (see timed_import)
+IMPORT_TIMES = {}
+
+
+def timed_import(module_name):
+    """Import a module, recording how long the first import took"""
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    IMPORT_TIMES.setdefault(module_name, time.perf_counter() - start)
+    return module
+
+
+class LazyModule:
+    """Module stand-in that imports the real module on first attribute access"""
+
+    def __init__(self, module_name):
+        self.__dict__["_module_name"] = module_name
+        self.__dict__["_module"] = None
+
+    def __getattr__(self, attr):
+        module = self.__dict__["_module"]
+        if module is None:
+            module = timed_import(self.__dict__["_module_name"])
+            self.__dict__["_module"] = module
+        value = getattr(module, attr)
+        # Cache so hot paths (cv2.cvtColor per frame) skip this method next time
+        self.__dict__[attr] = value
+        return value
+
+    def __repr__(self):
+        return f"<lazy module '{self.__dict__['_module_name']}'>"
+
+
+def lazy_import(module_name):
+    """Return a proxy that imports module_name the first time it is used"""
+    return LazyModule(module_name)
+
+
+def warm_up_hands(hands, frame_shape=(480, 640, 3), runs=2):
+    """Run MediaPipe Hands on blank frames of the camera resolution"""
+    frame = np.zeros(frame_shape, dtype=np.uint8)
+    for _ in range(runs):
+        hands.process(frame)
+
+
+class ModelLoader:
+    """Loads registered models lazily and in parallel"""
+
+    def __init__(self, max_workers=3, after_load=None):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="model-loader")
+        self.after_load = after_load
+        self.factories = {}
+        self.warmups = {}
+        self.futures = {}
+        self.timings = {}
+        self.warmup_timings = {}
+        self.phases = {}
+        self.lock = threading.Lock()
+
+    def register(self, name, factory, warmup=None):
+        """Register a zero-argument factory that builds the model
+
+        warmup, if given, is called with the model before it is marked ready.
+        """
+        self.factories[name] = factory
+        if warmup is not None:
+            self.warmups[name] = warmup
+
+    def request(self, name):
+        """Start loading a model (once) and return its Future"""
+        with self.lock:
+            if name not in self.futures:
+                if name not in self.factories:
+                    raise KeyError(f"No loader registered for '{name}'")
+                self.futures[name] = self.executor.submit(self._load, name)
+            return self.futures[name]
+
+    def request_all(self, names=None):
+        for name in names or list(self.factories):
+            self.request(name)
+
+    def _load(self, name):
+        self.phases[name] = "loading"
+        start = time.perf_counter()
+        try:
+            model = self.factories[name]()
+        finally:
+            self.timings[name] = time.perf_counter() - start
+        if self.after_load is not None:
+            self.after_load()
+
+        warmup = self.warmups.get(name)
+        if warmup is not None:
+            self.phases[name] = "warming up"
+            start = time.perf_counter()
+            try:
+                warmup(model)
+            finally:
+                self.warmup_timings[name] = time.perf_counter() - start
+        self.phases[name] = "ready"
+        return model
+
+    def phase(self, name):
+        """Return 'not loaded', 'loading', 'warming up' or 'ready'"""
+        return self.phases.get(name, "not loaded")
+
+    def get(self, name, timeout=None):
+        """Block until the model is loaded and return it"""
+        return self.request(name).result(timeout)
+
+    def get_if_ready(self, name):
+        """Return the model if it finished loading, otherwise None"""
+        future = self.futures.get(name)
+        if future is None or not future.done() or future.exception() is not None:
+            return None
+        return future.result()
+
+    def is_ready(self, name):
+        return self.get_if_ready(name) is not None
+
+    def progress(self):
+        """Return (loaded, requested) counts"""
+        with self.lock:
+            futures = list(self.futures.values())
+        return sum(1 for f in futures if f.done()), len(futures)
+
+    def status_text(self):
+        done, total = self.progress()
+        if total == 0:
+            return "Models: not loaded"
+        pending = [name for name, f in self.futures.items() if not f.done()]
+        if pending:
+            warming = [name for name in pending if self.phase(name) == "warming up"]
+            if len(warming) == len(pending):
+                return f"Warming up models {done}/{total} ({', '.join(warming)})..."
+            return f"Loading models {done}/{total} ({', '.join(pending)})..."
+        failed = [name for name, f in self.futures.items() if f.exception() is not None]
+        if failed:
+            return f"Models loaded with errors: {', '.join(failed)}"
+        total_seconds = sum(self.timings.values()) + sum(self.warmup_timings.values())
+        return f"Models ready ({done}/{total}, {total_seconds:.1f} s total)"
+
+    def report(self):
+        """Return the startup breakdown as a list of lines"""
+        lines = ["Startup time breakdown:"]
+        for module_name, seconds in sorted(IMPORT_TIMES.items(), key=lambda item: -item[1]):
+            lines.append(f"  import {module_name:<28} {seconds:6.2f} s")
+        for name, seconds in sorted(self.timings.items(), key=lambda item: -item[1]):
+            lines.append(f"  load   {name:<28} {seconds:6.2f} s")
+        for name, seconds in sorted(self.warmup_timings.items(), key=lambda item: -item[1]):
+            lines.append(f"  warmup {name:<28} {seconds:6.2f} s")
+        return lines
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
@@ -7,23 +7,37 @@ import asyncio
 import threading
 import time
 import queue
-import cv2
+# Caps the OpenMP/BLAS thread pools, so it has to come before numpy
+from thread_budget import THREAD_BUDGET
 import numpy as np
-import sounddevice as sd
-import scipy.io.wavfile as wav
-import tempfile
-import os
-import pyttsx3
-import pyautogui
-import screen_brightness_control as sbc
-import speech_recognition as sr
-import mediapipe as mp
-from PIL import Image, ImageTk
-from ultralytics import YOLO
-import whisper
+import psutil
+from speech_backends import create_backend
+from streaming_asr import StreamingTranscriber, STREAMING_ENABLED
+from keyword_spotter import KeywordSpotter, AudioRingBuffer, GATE_ENABLED
+from tts_worker import TTSWorker
+from presence import PresenceTracker
+from sources import open_video_source, open_audio_source
+from scheduler import PriorityScheduler
+from resource_monitor import ResourceMonitor, describe
+from metrics import FRAMES_DROPPED, QUEUE_DEPTH, ACTION_SECONDS, timed_transcribe, start_metrics_server
+from tracing import TRACER, install_dump_signal
+from profiler import install_profile_signal
+from event_recorder import open_recorder
+from event_store import EventStore
+from model_loader import ModelLoader, timed_import, lazy_import, warm_up_hands
+from detectors import create_detector
+from inference_daemon import DaemonClient, daemon_available, landmarks_from_points, ATTACH_SOCKET
+
+# Heavy dependencies are imported on first use by the modality that needs them
+cv2 = lazy_import("cv2")
+pyautogui = lazy_import("pyautogui")
+sbc = lazy_import("screen_brightness_control")
+Image = lazy_import("PIL.Image")
+ImageTk = lazy_import("PIL.ImageTk")
 
 class EVA:
-    def __init__(self, root):
+    def __init__(self, root, speech_backend=None, streaming=None, keyword_gate=None, daemon_socket=None,
+                 detector=None):
         self.root = root
         self.root.title("EVA - Multimodal AI Assistant")
         self.root.geometry("1280x800")
@@ -31,43 +45,89 @@ class EVA:
 
         # Initialize AI modules
         self.loop = asyncio.new_event_loop()
+        self.executors = {name: THREAD_BUDGET.executor(name) for name in ("gesture", "vision", "speech")}
+        self.scheduler = PriorityScheduler()
+        self.detect_task = None
+        self.last_detection = 0.0
+        self.monitor = ResourceMonitor(on_change=self.apply_degradation)
         threading.Thread(target=self.start_loop, daemon=True).start()
 
         self.sample_rate = 16000
         self.audio_buffer = []
-        self.whisper_model = whisper.load_model("base")
-        self.recognizer = sr.Recognizer()
-        self.mic = sr.Microphone()
+        self.speech_backend = create_backend(speech_backend)
+        self.detector = create_detector(detector)
+        self.streaming = STREAMING_ENABLED if streaming is None else streaming
+        self.streamer = StreamingTranscriber(self.speech_backend) if self.streaming else None
+        self.audio_chunks = queue.Queue()
+        if (GATE_ENABLED if keyword_gate is None else keyword_gate):
+            self.keyword_spotter = KeywordSpotter()
+            self.ring_buffer = AudioRingBuffer(seconds=3.0, sample_rate=self.sample_rate)
+        else:
+            self.keyword_spotter = None
+            self.ring_buffer = None
         self.speech_running = False
-        self.cap = cv2.VideoCapture(0)
+        self.cap = None
 
         # Queues for async updates
         self.transcription_queue = asyncio.Queue()
         self.object_queue = asyncio.Queue()
         self.gesture_queue = asyncio.Queue()
 
-        # Text-to-Speech (female voice)
-        self.tts_engine = pyttsx3.init()
-        self.tts_engine.setProperty('rate', 170)
-        voices = self.tts_engine.getProperty('voices')
-        for voice in voices:
-            if "female" in voice.name.lower():
-                self.tts_engine.setProperty('voice', voice.id)
-                break
-
-        # Models
-        self.yolo = YOLO("yolov8n.pt")
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(max_num_hands=1)
-        self.drawing = mp.solutions.drawing_utils
+        # Text-to-Speech (female voice) on its own worker thread
+        self.tts = TTSWorker(rate=170, voice_hint="female")
+        self.tts.start()
+
+        # Models load in parallel in the background once their loop starts
+        self.loader = ModelLoader(max_workers=3, after_load=THREAD_BUDGET.apply_libraries)
+        self.loader.register("speech", self.speech_backend.load, warmup=lambda _: self.speech_backend.warmup())
+        self.loader.register("yolo", self.detector.load, warmup=lambda detector: detector.warmup())
+        self.loader.register("hands", self.load_hands, warmup=warm_up_hands)
+        self.startup_reported = False
+        self.presence = PresenceTracker()
+        # Gestures, detections and transcripts are kept by time for fusion queries,
+        # and go to MULTIMODAL_EVENT_DIR when it is set
+        self.events = EventStore()
+        self.recorder = open_recorder()
 
         # UI Setup
         self.setup_ui()
 
+        # Attach to a warm inference daemon if one is running, otherwise load locally
+        self.daemon_socket = daemon_socket or ATTACH_SOCKET
+        self.attached = bool(self.daemon_socket) and daemon_available(self.daemon_socket)
+
         # Start tasks
         self.running = True
+        if self.attached:
+            self.load_label.config(text="Attached to inference daemon")
+        else:
+            self.loader.request_all()
+            self.update_load_progress()
         self.loop.call_soon_threadsafe(lambda: self.loop.create_task(self.run_all()))
 
+    def load_hands(self):
+        mp = timed_import("mediapipe")
+        self.mp_hands = mp.solutions.hands
+        self.drawing = mp.solutions.drawing_utils
+        self.hands = self.mp_hands.Hands(max_num_hands=1)
+        return self.hands
+
+    def update_load_progress(self):
+        # Runs on the Tk thread until every requested model has loaded
+        self.load_label.config(text=self.loader.status_text())
+        done, total = self.loader.progress()
+        if done < total:
+            self.root.after(200, self.update_load_progress)
+        elif not self.startup_reported:
+            self.startup_reported = True
+            for line in self.loader.report():
+                print(f"[EVA] {line}")
+
+    def report_window_ready(self):
+        elapsed = time.time() - psutil.Process().create_time()
+        print(f"[EVA] Window ready {elapsed:.2f} s after process start")
+        print(f"[EVA] {THREAD_BUDGET.summary()}")
+
     def start_loop(self):
         asyncio.set_event_loop(self.loop)
         self.loop.run_forever()
@@ -79,6 +139,9 @@ class EVA:
         self.status_text = tk.Label(self.root, text="Initializing...", font=("Arial", 14), bg="#1e272e", fg="#00d2d3")
         self.status_text.pack(pady=5)
 
+        self.load_label = tk.Label(self.root, text="Loading models...", font=("Arial", 10), bg="#1e272e", fg="#c8d6e5")
+        self.load_label.pack()
+
         self.transcription_label = tk.Label(self.root, text="Waiting for speech...", font=("Arial", 14), bg="#1e272e", fg="#feca57")
         self.transcription_label.pack(pady=5)
 
@@ -86,35 +149,96 @@ class EVA:
         self.image_label.pack(pady=10)
 
     def say(self, text):
-        self.tts_engine.say(text)
-        self.tts_engine.runAndWait()
+        # Never blocks: the TTS worker dedups, caches and interrupts older speech
+        self.tts.speak(text)
 
     def log(self, msg):
         print(f"[EVA] {msg}")
         self.status_text.config(text=msg)
 
     async def run_all(self):
+        monitor = self.monitor.run(lambda: self.running)
+        if self.attached:
+            await asyncio.gather(self.daemon_client_loop(), self.gui_update_loop(), monitor)
+            return
         await asyncio.gather(
             self.speech_loop(),
             self.camera_loop(),
-            self.gui_update_loop()
+            self.gui_update_loop(),
+            monitor
         )
 
+    def apply_degradation(self, change):
+        # The camera loop reads the YOLO rate from monitor.level; the display rate lives in the scheduler
+        policy = self.scheduler.policy("display")
+        self.scheduler.policies["display"] = policy._replace(period=1 / change.level.display_fps)
+        self.log(describe(change))
+
     async def speech_loop(self):
+        try:
+            await asyncio.wrap_future(self.loader.request("speech"))
+        except Exception as e:
+            self.log(f"❌ Failed to load speech model: {e}")
+            return
         self.log("🎤 Voice system online")
         self.speech_running = True
 
-        def audio_callback(indata, frames, time, status):
+        def audio_callback(audio_data, timestamp):
             if self.speech_running:
-                audio_data = indata[:, 0].astype(np.float32)
-                self.audio_buffer.extend(audio_data)
-                if len(self.audio_buffer) >= self.sample_rate * 2:
-                    asyncio.run_coroutine_threadsafe(self.process_audio(), self.loop)
-
-        with sd.InputStream(callback=audio_callback, channels=1, samplerate=self.sample_rate, dtype=np.float32):
+                if self.keyword_spotter:
+                    self.ring_buffer.write(audio_data)
+                    if not self.keyword_spotter.is_open():
+                        return
+                self.queue_asr_audio(audio_data)
+
+        # Microphone, or the WAV file named by MULTIMODAL_AUDIO_SOURCE
+        with open_audio_source(sample_rate=self.sample_rate).stream(audio_callback):
             while self.speech_running:
+                if self.keyword_spotter and not self.keyword_spotter.is_open():
+                    await self.spot_keywords()
+                elif self.streaming:
+                    await self.process_stream()
                 await asyncio.sleep(0.1)
 
+    def queue_asr_audio(self, audio_data):
+        if self.streaming:
+            self.audio_chunks.put(audio_data)
+            return
+        self.audio_buffer.extend(audio_data)
+        if len(self.audio_buffer) >= self.sample_rate * 2:
+            asyncio.run_coroutine_threadsafe(self.process_audio(), self.loop)
+
+    async def spot_keywords(self):
+        # Full ASR is idle until the spotter hears a wake word
+        hit = await self.scheduler.run("speech", self.executors["speech"], self.keyword_spotter.poll, self.ring_buffer)
+        if hit is None:
+            return
+        self.log(f"🔑 Keyword spotted: {hit.keyword}")
+        if hit.kind == "command":
+            await self.handle_command(hit.keyword)
+        else:
+            # Whatever followed the wake word in the same breath goes to ASR too
+            self.queue_asr_audio(hit.samples)
+
+    async def process_stream(self):
+        # Decode the sliding window; partial text goes to the label, commands
+        # only run once the utterance is final
+        QUEUE_DEPTH.set(self.audio_chunks.qsize(), queue="asr_chunks")
+        while not self.audio_chunks.empty():
+            self.streamer.feed(self.audio_chunks.get_nowait())
+        try:
+            update = await self.scheduler.run("speech", self.executors["speech"], self.streamer.step)
+        except Exception as e:
+            self.log(f"⚠️ Streaming transcription error: {e}")
+            return
+        if update is None:
+            return
+        if self.keyword_spotter:
+            self.keyword_spotter.open()
+        await self.transcription_queue.put(update.text)
+        if update.final:
+            await self.handle_command(update.text.lower())
+
     async def process_audio(self):
         audio_data = np.array(self.audio_buffer[:self.sample_rate * 2])
         self.audio_buffer = self.audio_buffer[self.sample_rate * 2:]
@@ -122,33 +246,31 @@ class EVA:
         if np.mean(audio_data ** 2) < 0.001:
             return
 
-        # Convert float32 audio to int16
-        audio_int16 = np.int16(audio_data * 32767)
-
-        # ✅ Save audio to a real file after the file is closed
-        temp_filename = os.path.join(tempfile.gettempdir(), f"eva_temp_{int(time.time())}.wav")
+        trace = TRACER.new_trace("audio")
         try:
-            wav.write(temp_filename, self.sample_rate, audio_int16)
-
-            if not os.path.exists(temp_filename):
-                self.log(f"❌ Temp file not found: {temp_filename}")
-                return
-
-            result = self.whisper_model.transcribe(temp_filename, language="en")
-            transcription = result['text'].strip()
+            transcription = await self.scheduler.run(
+                "speech", self.executors["speech"], timed_transcribe,
+                self.speech_backend.transcribe, audio_data.astype(np.float32), self.sample_rate, trace=trace
+            )
             if transcription:
+                if self.keyword_spotter:
+                    self.keyword_spotter.open()
                 await self.transcription_queue.put(transcription)
-                await self.handle_command(transcription.lower())
+                await self.handle_command(transcription.lower(), trace=trace)
         except Exception as e:
-            self.log(f"⚠️ Whisper error: {e}")
-        finally:
-            try:
-                os.remove(temp_filename)
-            except Exception as e:
-                self.log(f"⚠️ Failed to delete temp file: {e}")
-
-
-    async def handle_command(self, text):
+            self.log(f"⚠️ Speech backend error: {e}")
+
+    def record_event(self, kind, **fields):
+        event = self.events.add(kind, **fields)
+        if self.recorder:
+            self.recorder.write({"t": round(event.t, 3), "type": kind, **fields})
+
+    async def handle_command(self, text, source="voice", trace=None):
+        if source == "voice":
+            self.record_event("transcript", text=text)
+        elif source == "gesture":
+            self.record_event("gesture", gesture=text)
+        started = TRACER.clock()
         self.say(text)
         if "volume up" in text:
             pyautogui.press("volumeup")
@@ -164,40 +286,120 @@ class EVA:
             img = pyautogui.screenshot()
             img.save(f"screenshot_{int(time.time())}.png")
             self.say("Screenshot taken")
+        finished = TRACER.clock()
+        ACTION_SECONDS.observe(finished - started, source=source)
+        TRACER.record(trace, "action", started, finished, command=text)
 
     async def camera_loop(self):
+        # Opening the camera can take a while, keep it off the Tk thread
+        self.cap = await self.loop.run_in_executor(None, open_video_source)
         self.log("📷 Camera feed started")
         while self.running:
-            ret, frame = self.cap.read()
+            trace = TRACER.new_trace("frame")
+            with TRACER.span(trace, "capture"):
+                ret, frame = self.cap.read()
             if not ret:
+                if self.cap.finished:
+                    self.log("📷 Replay finished")
+                    break
                 continue
 
-            results = self.hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-            if results.multi_hand_landmarks:
-                for hand in results.multi_hand_landmarks:
-                    self.drawing.draw_landmarks(frame, hand, self.mp_hands.HAND_CONNECTIONS)
-                    gesture = self.interpret_gesture(hand)
-                    if gesture:
-                        await self.gesture_queue.put(gesture)
-                        await self.handle_command(gesture)
-
-            yolo_results = self.yolo(frame, verbose=False)
-            for det in yolo_results:
-                for box in det.boxes:
-                    cls_id = int(box.cls[0])
-                    name = self.yolo.names[cls_id]
-                    conf = float(box.conf[0])
-                    if conf > 0.5:
-                        await self.object_queue.put(name)
-                        await self.handle_command(name)
-
-            frame = cv2.resize(frame, (640, 480))
-            img = ImageTk.PhotoImage(Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
-            self.image_label.config(image=img)
-            self.image_label.image = img
+            # The feed shows right away; each model joins in once it has loaded
+            hands = self.loader.get_if_ready("hands")
+            if hands:
+                with TRACER.span(trace, "preprocess"):
+                    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                results = await self.scheduler.run(
+                    "gesture", self.executors["gesture"], hands.process, rgb_frame, trace=trace
+                )
+                if results.multi_hand_landmarks:
+                    for hand in results.multi_hand_landmarks:
+                        with TRACER.span(trace, "classify", stage="gesture"):
+                            self.drawing.draw_landmarks(frame, hand, self.mp_hands.HAND_CONNECTIONS)
+                            gesture = self.interpret_gesture(hand)
+                        if gesture:
+                            await self.gesture_queue.put(gesture)
+                            await self.handle_command(gesture, source="gesture", trace=trace)
+
+            # Detection runs beside the camera loop on whatever capacity is left,
+            # so a slow YOLO frame never holds up gestures or the feed
+            detector = self.loader.get_if_ready("yolo")
+            level = self.monitor.level
+            now = time.monotonic()
+            if detector and level.objects and now - self.last_detection >= level.object_interval:
+                if self.detect_task is None or self.detect_task.done():
+                    self.last_detection = now
+                    self.detect_task = self.loop.create_task(self.detect_objects(detector, frame, trace))
+                else:
+                    FRAMES_DROPPED.inc(stage="objects")
+
+            if self.scheduler.due("display"):
+                with TRACER.span(trace, "render", widget="camera"):
+                    self.show_frame(frame)
+            else:
+                FRAMES_DROPPED.inc(stage="display")
 
             await asyncio.sleep(0.03)
 
+    async def detect_objects(self, detector, frame, trace=None):
+        try:
+            detections = await self.scheduler.run(
+                "object", self.executors["vision"], detector.detect, frame, trace=trace
+            )
+        except Exception as e:
+            self.log(f"⚠️ Object detection error: {e}")
+            return
+
+        # Announce objects when they appear, not on every frame
+        with TRACER.span(trace, "classify", stage="presence"):
+            events = self.presence.update(detections)
+        for event in events:
+            await self.object_queue.put(event)
+            self.record_event("object", event=event.kind, name=event.name, count=event.count)
+            if event.kind == "appeared":
+                await self.handle_command(event.name, source="object", trace=trace)
+
+    def show_frame(self, frame):
+        frame = cv2.resize(frame, (640, 480))
+        img = ImageTk.PhotoImage(Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
+        self.image_label.config(image=img)
+        self.image_label.image = img
+
+    async def daemon_client_loop(self):
+        # Thin-client mode: the daemon owns camera, microphone and models
+        client = DaemonClient(self.daemon_socket)
+        try:
+            await client.connect()
+            self.log("🔌 Attached to inference daemon")
+            async for message in client.messages():
+                if not self.running:
+                    break
+                topic = message["topic"]
+                if topic == "frame":
+                    frame = client.read_frame(message)
+                    if frame is not None:
+                        self.show_frame(frame)
+                elif topic == "hands":
+                    for points in message["hands"]:
+                        gesture = self.interpret_gesture(landmarks_from_points(points))
+                        if gesture:
+                            await self.gesture_queue.put(gesture)
+                            await self.handle_command(gesture, source="gesture")
+                elif topic == "detections":
+                    for event in self.presence.update(message["detections"]):
+                        await self.object_queue.put(event)
+                        self.record_event("object", event=event.kind, name=event.name, count=event.count)
+                        if event.kind == "appeared":
+                            await self.handle_command(event.name, source="object")
+                elif topic == "transcript":
+                    await self.transcription_queue.put(message["text"])
+                    await self.handle_command(message["text"].lower())
+            self.log("🔌 Inference daemon disconnected")
+        except (OSError, ValueError) as e:
+            self.log(f"❌ Inference daemon error: {e}")
+        finally:
+            client.close()
+
     def interpret_gesture(self, hand):
         points = [ [lm.x, lm.y] for lm in hand.landmark ]
         if points[4][1] < points[3][1] and points[8][1] > points[6][1]:
@@ -212,6 +414,9 @@ class EVA:
         while self.running:
             try:
                 text = await asyncio.wait_for(self.transcription_queue.get(), timeout=0.1)
+                # Streaming mode queues several partial hypotheses; show only the newest
+                while not self.transcription_queue.empty():
+                    text = self.transcription_queue.get_nowait()
                 self.transcription_label.config(text=text)
             except asyncio.TimeoutError:
                 pass
@@ -222,8 +427,19 @@ def main():
     app = EVA(root)
     def on_close():
         app.running = False
+        app.tts.stop()
+        if app.recorder:
+            app.recorder.close()
         root.destroy()
     root.protocol("WM_DELETE_WINDOW", on_close)
+    root.after(0, app.report_window_ready)
+    server = start_metrics_server()
+    if server:
+        print(f"[EVA] 📈 Metrics on http://{server.server_address[0]}:{server.server_port}/metrics")
+    install_dump_signal(on_dump=lambda message: print(f"[EVA] {message}"))
+    install_profile_signal(on_done=lambda message: print(f"[EVA] {message}"))
+    if app.recorder:
+        print(f"[EVA] 📼 Recording events to {app.recorder.directory}")
     root.mainloop()
 
 if __name__ == "__main__":
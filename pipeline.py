@@ -0,0 +1,515 @@
+#!/usr/bin/env python3
+"""
+Headless capture -> inference -> action pipeline, no Tkinter needed.
+
+Runs the same gesture, speech and object stages as the GUI apps and writes
+what happens as JSON lines (one event per line) to one or more sinks:
+
+    {"t": 1700000000.123, "type": "gesture", "gesture": "VOLUME_UP"}
+    {"t": ..., "type": "object", "event": "appeared", "name": "person", "count": 1}
+    {"t": ..., "type": "transcript", "text": "volume up", "objects": ["person"]}
+    {"t": ..., "type": "command", "command": "volume up", "result": "🔊 Volume increased"}
+
+Voice commands are only acted on with --actions. Log messages go to stderr
+so stdout stays valid JSONL. With the objects modality on, each transcript
+lists the objects that were visible while it was spoken (see event_store.py).
+
+    python pipeline.py --modalities gesture,objects
+    python pipeline.py --sink file:events.jsonl --object-fps 2 --duration 60
+    python pipeline.py --sink record:events/    # batched, rotated log (event_recorder.py)
+    python pipeline.py --modalities speech --speech-backend faster-whisper --actions
+    python pipeline.py --video clip.mp4 --audio clip.wav --speed 0 --start-time 0
+    python pipeline.py --video clip.mp4 --duration 30 --trace trace.json
+    python pipeline.py --profile 20         # sampling profile of the first 20 s
+    python pipeline.py --video clip.mp4 --audio clip.wav --speed 0 --batch 8
+
+With --video/--audio the pipeline replays recordings instead of the camera and
+microphone (see sources.py) and stops when they end. Event times then come
+from the recording, and detection runs on every frame it is offered instead
+of skipping frames while busy, so the same input gives the same events. For
+the same reason replays default to a fixed detector rather than the adaptive
+ladder (see detectors.py).
+
+--batch N (throughput mode) runs detection and speech recognition in batches
+of up to N frames or segments (see batching.py). Several frames and segments
+are then in flight at once; their events are still emitted in input order.
+"""
+
+import sys
+import json
+import time
+import queue
+import asyncio
+import argparse
+# Caps the OpenMP/BLAS thread pools, so it has to come before numpy
+from thread_budget import THREAD_BUDGET
+import numpy as np
+from model_loader import ModelLoader, timed_import, lazy_import, warm_up_hands
+from detectors import create_detector, fixed_detector_name
+from speech_backends import create_backend, SAMPLE_RATE
+from presence import PresenceTracker
+from scheduler import PriorityScheduler
+from gestures import analyze_gesture
+from commands import run_command, EXIT
+from sources import open_video_source, open_audio_source, is_camera
+from metrics import FRAMES_DROPPED, METRICS_PORT, timed_transcribe, start_metrics_server
+from tracing import TRACER, install_dump_signal
+from profiler import PROFILER, install_profile_signal
+from event_recorder import EventRecorder, EVENT_DIR
+from event_store import EventStore
+from batching import MicroBatcher, scheduled, BATCH_SIZE, BATCH_WAIT
+
+cv2 = lazy_import("cv2")
+
+MODALITIES = ("gesture", "speech", "objects")
+SEGMENT_SECONDS = 2
+
+
+def log(message):
+    print(f"[pipeline] {message}", file=sys.stderr, flush=True)
+
+
+class JsonlSink:
+    """Writes one JSON object per line to a text stream (stdout by default)"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def write(self, event):
+        self.stream.write(json.dumps(event, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+    def close(self):
+        pass
+
+
+class FileSink(JsonlSink):
+    """Appends JSON lines to a file"""
+
+    def __init__(self, path):
+        super().__init__(open(path, "a", encoding="utf-8", buffering=1))
+        self.path = path
+
+    def close(self):
+        self.stream.close()
+
+
+class RecorderSink:
+    """Hands events to a background EventRecorder (rotating files, never blocks)"""
+
+    def __init__(self, directory):
+        self.recorder = EventRecorder(directory)
+
+    def write(self, event):
+        self.recorder.write(event)
+
+    def close(self):
+        self.recorder.close()
+        if self.recorder.dropped:
+            log(f"⚠️ Event recorder dropped {self.recorder.dropped} events")
+
+
+def create_sink(spec):
+    """Build a sink from a CLI spec: 'stdout', 'file:PATH' or 'record:DIR'"""
+    if spec == "stdout":
+        return JsonlSink()
+    if spec.startswith("file:") and len(spec) > 5:
+        return FileSink(spec[5:])
+    if spec.startswith("record:") and len(spec) > 7:
+        return RecorderSink(spec[7:])
+    raise ValueError(f"Unknown sink '{spec}' (use stdout, file:PATH or record:DIR)")
+
+
+class RateLimiter:
+    """Lets work through at most rate times per second (rate 0 = unlimited)"""
+
+    def __init__(self, rate):
+        self.period = 1.0 / rate if rate else 0.0
+        self.last = None
+
+    def ready(self, now=None):
+        now = time.monotonic() if now is None else now
+        if self.last is not None and now - self.last < self.period:
+            return False
+        self.last = now
+        return True
+
+
+class HeadlessPipeline:
+    """The apps' processing loops without any GUI"""
+
+    def __init__(self, modalities=MODALITIES, sinks=None, video_source=None, audio_source=None,
+                 speed=None, start_time=None, speech_backend=None, detector=None,
+                 gesture_fps=15, object_fps=10, actions=False, duration=None,
+                 batch_size=BATCH_SIZE, batch_wait=BATCH_WAIT):
+        unknown = set(modalities) - set(MODALITIES)
+        if unknown:
+            raise ValueError(f"Unknown modality {', '.join(sorted(unknown))} (choose from {', '.join(MODALITIES)})")
+        self.modalities = set(modalities)
+        self.sinks = sinks if sinks is not None else [JsonlSink()]
+        self.video_source = video_source
+        self.audio_source = audio_source
+        self.speed = speed
+        self.start_time = start_time
+        self.actions = actions
+        self.duration = duration
+        self.gesture_limit = RateLimiter(gesture_fps)
+        self.object_limit = RateLimiter(object_fps)
+        self.sample_rate = SAMPLE_RATE
+        self.running = False
+        self.last_gesture = None
+        self.detect_task = None
+        self.presence = PresenceTracker()
+        # Recent events by time, for questions like "what was visible during this utterance"
+        self.events = EventStore()
+        self.scheduler = PriorityScheduler()
+        self.executors = {name: THREAD_BUDGET.executor(name) for name in ("gesture", "vision", "speech")}
+
+        self.loader = ModelLoader(max_workers=3, after_load=THREAD_BUDGET.apply_libraries)
+        self.loader.register("hands", self._load_hands, warmup=warm_up_hands)
+        self.detector = None
+        if "objects" in self.modalities:
+            if detector is None and not is_camera(video_source):
+                detector = fixed_detector_name()
+            self.detector = create_detector(detector)
+            self.loader.register("yolo", self.detector.load, warmup=lambda detector: detector.warmup())
+        self.speech_backend = create_backend(speech_backend)
+        self.loader.register("speech", self.speech_backend.load, warmup=lambda _: self.speech_backend.warmup())
+
+        # Throughput mode: up to batch_size frames / segments per model call
+        self.batch_size = max(1, batch_size)
+        self.detect_batcher = self.speech_batcher = None
+        if self.batch_size > 1 and self.detector is not None:
+            self.detect_batcher = MicroBatcher(
+                lambda frames: self.detector.detect_batch(frames), self.batch_size, batch_wait,
+                run=scheduled(self.scheduler, "object", self.executors["vision"]), name="detector")
+        if self.batch_size > 1:
+            self.speech_batcher = MicroBatcher(
+                self.speech_backend.transcribe_batch, self.batch_size, batch_wait,
+                run=scheduled(self.scheduler, "speech", self.executors["speech"]), name="speech")
+
+    def _load_hands(self):
+        mp = timed_import("mediapipe")
+        return mp.solutions.hands.Hands(max_num_hands=1, min_detection_confidence=0.7, min_tracking_confidence=0.5)
+
+    def emit(self, kind, t=None, **fields):
+        event = {"t": round(time.time() if t is None else t, 3), "type": kind}
+        event.update(fields)
+        self.events.add_event(event)
+        for sink in self.sinks:
+            sink.write(event)
+        return event
+
+    def required_models(self):
+        names = []
+        if "gesture" in self.modalities:
+            names.append("hands")
+        if "objects" in self.modalities:
+            names.append("yolo")
+        if "speech" in self.modalities:
+            names.append("speech")
+        return names
+
+    async def run(self):
+        """Run until stop(), the duration elapses or an exit command is heard"""
+        self.running = True
+        log(THREAD_BUDGET.summary())
+        models = self.required_models()
+        self.loader.request_all(models)
+        tasks = [asyncio.create_task(self.report_ready(models))]
+        if self.modalities & {"gesture", "objects"}:
+            tasks.append(asyncio.create_task(self.vision_loop()))
+        if "speech" in self.modalities:
+            tasks.append(asyncio.create_task(self.speech_loop()))
+        try:
+            if self.duration:
+                await asyncio.wait(tasks, timeout=self.duration)
+            else:
+                await asyncio.gather(*tasks)
+        finally:
+            self.running = False
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for sink in self.sinks:
+                sink.close()
+            self.loader.shutdown()
+
+    def stop(self):
+        self.running = False
+
+    async def report_ready(self, models):
+        for name in models:
+            try:
+                await asyncio.wrap_future(self.loader.request(name))
+            except Exception as e:
+                log(f"❌ Failed to load {name}: {e}")
+        for line in self.loader.report():
+            log(line)
+        self.emit("status", message=self.loader.status_text())
+
+    async def vision_loop(self):
+        loop = asyncio.get_running_loop()
+        source = await loop.run_in_executor(
+            None, lambda: open_video_source(self.video_source, self.speed, self.start_time)
+        )
+        if not source.isOpened():
+            log(f"❌ Could not open video source {self.video_source or 'camera'}")
+            return
+        if not source.live:
+            # Replays wait for the models so every frame gets the same treatment
+            for name in self.required_models():
+                if name != "speech":
+                    try:
+                        await asyncio.wrap_future(self.loader.request(name))
+                    except Exception:
+                        pass    # report_ready logs the failure
+        in_flight = []
+        try:
+            while self.running:
+                captured = TRACER.clock()
+                ret, frame = await loop.run_in_executor(None, source.read)
+                if not ret:
+                    if source.finished:
+                        log("📼 Video replay finished")
+                        break
+                    await asyncio.sleep(0.01)
+                    continue
+                trace = TRACER.new_trace("frame")
+                TRACER.record(trace, "capture", captured)
+                # Rate limits run on frame time, so replays at any speed see the same frames
+                now = source.timestamp
+                if "gesture" in self.modalities and self.gesture_limit.ready(now):
+                    await self.process_gesture(frame, now, trace)
+                if "objects" in self.modalities and self.object_limit.ready(now):
+                    detector = self.loader.get_if_ready("yolo")
+                    if detector and self.detect_batcher:
+                        in_flight = [task for task in in_flight if not task.done()]
+                        while not source.live and len(in_flight) >= 2 * self.batch_size:
+                            await in_flight.pop(0)     # replays wait instead of dropping frames
+                        if len(in_flight) < 2 * self.batch_size:
+                            previous = in_flight[-1] if in_flight else None
+                            in_flight.append(asyncio.create_task(
+                                self.process_objects(detector, frame, now, trace, previous)))
+                        else:
+                            FRAMES_DROPPED.inc(stage="objects")
+                    elif detector and not source.live:
+                        await self.process_objects(detector, frame, now, trace)
+                    elif detector and (self.detect_task is None or self.detect_task.done()):
+                        self.detect_task = asyncio.create_task(self.process_objects(detector, frame, now, trace))
+                    elif detector:
+                        FRAMES_DROPPED.inc(stage="objects")
+                await asyncio.sleep(0)
+            if self.detect_task is not None:
+                await self.detect_task
+            await asyncio.gather(*in_flight)
+        finally:
+            source.release()
+
+    async def process_gesture(self, frame, timestamp=None, trace=None):
+        hands = self.loader.get_if_ready("hands")
+        if hands is None:
+            return
+        # Same mirror view as the GUI, so left/right gestures match
+        with TRACER.span(trace, "preprocess"):
+            rgb_frame = cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB)
+        results = await self.scheduler.run("gesture", self.executors["gesture"], hands.process, rgb_frame, trace=trace)
+        gesture = None
+        if results.multi_hand_landmarks:
+            with TRACER.span(trace, "classify", stage="gesture"):
+                gesture = analyze_gesture(results.multi_hand_landmarks[0])
+        # Report a held gesture once, not on every frame
+        if gesture != self.last_gesture:
+            self.last_gesture = gesture
+            if gesture:
+                self.emit("gesture", t=timestamp, gesture=gesture)
+
+    async def process_objects(self, detector, frame, timestamp=None, trace=None, previous=None):
+        """Detect objects in a frame and report presence changes
+
+        In throughput mode several frames are in flight; previous is the task
+        of the frame before, so presence is still updated in frame order.
+        """
+        try:
+            if self.detect_batcher:
+                detections = await self.detect_batcher(frame, trace)
+            else:
+                detections = await self.scheduler.run(
+                    "object", self.executors["vision"], detector.detect, frame, trace=trace
+                )
+        except Exception as e:
+            log(f"❌ Object detection error: {e}")
+            return
+        finally:
+            if previous is not None:
+                await previous
+        now = time.monotonic() if timestamp is None else timestamp
+        with TRACER.span(trace, "classify", stage="presence"):
+            events = self.presence.update(detections, now=now)
+        for event in events:
+            self.emit("object", t=timestamp, event=event.kind, name=event.name, count=event.count)
+
+    async def speech_loop(self):
+        try:
+            await asyncio.wrap_future(self.loader.request("speech"))
+        except Exception:
+            return
+        source = open_audio_source(self.audio_source, self.speed, self.start_time, sample_rate=self.sample_rate)
+        chunks = queue.Queue()
+
+        def audio_callback(samples, timestamp):
+            chunks.put((samples, timestamp))
+
+        buffer = np.zeros(0, dtype=np.float32)
+        buffer_start = None
+        segment = self.sample_rate * SEGMENT_SECONDS
+        in_flight = []
+        with source.stream(audio_callback):
+            while self.running:
+                while not chunks.empty():
+                    samples, timestamp = chunks.get_nowait()
+                    if buffer.size == 0:
+                        buffer_start = timestamp
+                    buffer = np.concatenate([buffer, samples])
+                if len(buffer) < segment:
+                    if source.finished and chunks.empty():
+                        if buffer.size:
+                            # Pad the tail of a replay to a full segment
+                            buffer = np.concatenate([buffer, np.zeros(segment - buffer.size, dtype=np.float32)])
+                        else:
+                            log("📼 Audio replay finished")
+                            break
+                    else:
+                        await asyncio.sleep(0.05)
+                        continue
+                audio, buffer = buffer[:segment], buffer[segment:]
+                start, buffer_start = buffer_start, buffer_start + segment / self.sample_rate
+                if np.mean(audio ** 2) < 0.001:
+                    continue
+                trace = TRACER.new_trace("audio")
+                if self.speech_batcher:
+                    in_flight = [task for task in in_flight if not task.done()]
+                    while len(in_flight) >= 2 * self.batch_size:
+                        await in_flight.pop(0)
+                    previous = in_flight[-1] if in_flight else None
+                    in_flight.append(asyncio.create_task(self.transcribe_segment(audio, start, trace, previous)))
+                    await asyncio.sleep(0)
+                    continue
+                await self.transcribe_segment(audio, start, trace)
+            await asyncio.gather(*in_flight)
+
+    async def transcribe_segment(self, audio, start, trace=None, previous=None):
+        """Transcribe one segment and handle the text; previous keeps batched segments in order"""
+        try:
+            if self.speech_batcher:
+                text = await self.speech_batcher(audio, trace)
+            else:
+                text = await self.scheduler.run(
+                    "speech", self.executors["speech"], timed_transcribe,
+                    self.speech_backend.transcribe, audio, self.sample_rate, trace=trace
+                )
+        except Exception as e:
+            log(f"❌ Speech backend error: {e}")
+            return
+        finally:
+            if previous is not None:
+                await previous
+        if text and self.running:
+            self.handle_transcript(text, start, trace)
+
+    def handle_transcript(self, text, timestamp=None, trace=None):
+        fields = {"text": text}
+        if "objects" in self.modalities:
+            start = time.time() - SEGMENT_SECONDS if timestamp is None else timestamp
+            fields["objects"] = self.events.visible_objects(start, start + SEGMENT_SECONDS)
+        self.emit("transcript", t=timestamp, **fields)
+        if not self.actions:
+            return
+        command = text.lower()
+        try:
+            with TRACER.span(trace, "action", command=command):
+                result = run_command(command)
+        except Exception as e:
+            log(f"❌ Voice command error: {e}")
+            return
+        if result == EXIT:
+            self.emit("command", command=command, result="exit")
+            self.stop()
+        elif result:
+            self.emit("command", command=command, result=result)
+
+
+def parse_modalities(value):
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in MODALITIES]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown modality {', '.join(unknown)} (choose from {', '.join(MODALITIES)})")
+    return names
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the multimodal pipeline without a GUI")
+    parser.add_argument("--modalities", type=parse_modalities, default=list(MODALITIES),
+                        help="comma-separated list of gesture, speech, objects (default: all)")
+    parser.add_argument("--sink", action="append", default=None,
+                        help="where events go: stdout, file:PATH or record:DIR (repeatable, default stdout)")
+    parser.add_argument("--video", default=None, help="camera index, video file or image directory (default camera 0)")
+    parser.add_argument("--audio", default=None, help="'mic' or a WAV file to replay (default mic)")
+    parser.add_argument("--speed", type=float, default=None, help="replay speed: 1 real time, 0 as fast as possible")
+    parser.add_argument("--start-time", type=float, default=None, help="timestamp of the first replayed sample")
+    parser.add_argument("--speech-backend", default=None, help="speech backend name")
+    parser.add_argument("--detector", default=None, help="object detector name")
+    parser.add_argument("--gesture-fps", type=float, default=15, help="max gesture frames per second (0 = unlimited)")
+    parser.add_argument("--object-fps", type=float, default=10, help="max detector frames per second (0 = unlimited)")
+    parser.add_argument("--actions", action="store_true", help="act on voice commands (volume, screenshots, ...)")
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE, metavar="N",
+                        help="throughput mode: detect / transcribe up to N frames or segments per call")
+    parser.add_argument("--duration", type=float, default=None, help="stop after this many seconds")
+    parser.add_argument("--metrics-port", type=int, default=METRICS_PORT,
+                        help="serve Prometheus metrics on this port (default off)")
+    parser.add_argument("--trace", default=None, help="write the trace spans as Chrome trace JSON here on exit")
+    parser.add_argument("--profile", type=float, default=None, metavar="SECONDS",
+                        help="sample all thread stacks for this long and write a collapsed-stack profile")
+    args = parser.parse_args(argv)
+
+    try:
+        sinks = [create_sink(spec) for spec in (args.sink or ["stdout"])]
+        if EVENT_DIR and not any(isinstance(sink, RecorderSink) for sink in sinks):
+            sinks.append(RecorderSink(EVENT_DIR))
+    except ValueError as e:
+        parser.error(str(e))
+    pipeline = HeadlessPipeline(
+        modalities=args.modalities,
+        sinks=sinks,
+        video_source=args.video,
+        audio_source=args.audio,
+        speed=args.speed,
+        start_time=args.start_time,
+        speech_backend=args.speech_backend,
+        detector=args.detector,
+        gesture_fps=args.gesture_fps,
+        object_fps=args.object_fps,
+        actions=args.actions,
+        duration=args.duration,
+        batch_size=args.batch,
+    )
+    server = start_metrics_server(args.metrics_port)
+    if server:
+        log(f"📈 Metrics on http://{server.server_address[0]}:{server.server_port}/metrics")
+    install_dump_signal(on_dump=log)
+    install_profile_signal(on_done=log)
+    if args.profile:
+        PROFILER.start(args.profile)
+    try:
+        asyncio.run(pipeline.run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if PROFILER.running:
+            PROFILER.stop()
+        if args.trace:
+            log(f"🧵 Trace written to {TRACER.dump(args.trace)}")
+
+
+if __name__ == "__main__":
+    main()
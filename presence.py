@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Object presence tracking with enter/leave semantics.
+
+Raw detections arrive several times per second and flicker. The tracker
+keeps per-class state and only reports changes:
+
+    appeared       - a class has been seen in enter_frames consecutive frames
+    left           - a present class has not been seen for leave_seconds
+    count_changed  - a present class has held a new count for count_frames frames
+"""
+
+import time
+from collections import Counter, namedtuple
+
+PresenceEvent = namedtuple("PresenceEvent", ["kind", "name", "count", "previous", "timestamp"])
+
+
+class PresenceTracker:
+    """Turns per-frame detections into appeared/left/count_changed events"""
+
+    def __init__(self, enter_frames=3, leave_seconds=1.5, count_frames=5):
+        self.enter_frames = enter_frames
+        self.leave_seconds = leave_seconds
+        self.count_frames = count_frames
+        self.state = {}
+
+    def present(self):
+        """Return {name: count} for every class currently present"""
+        return {name: st['count'] for name, st in self.state.items() if st['present']}
+
+    def update(self, detections, now=None):
+        """Feed one frame of detections (dicts with 'name', or plain names)"""
+        now = time.monotonic() if now is None else now
+        counts = Counter(d['name'] if isinstance(d, dict) else d for d in detections)
+        events = []
+
+        for name in set(self.state) | set(counts):
+            st = self.state.setdefault(name, {
+                'present': False, 'count': 0, 'streak': 0, 'last_seen': now,
+                'candidate': 0, 'candidate_streak': 0,
+            })
+            seen = counts.get(name, 0)
+            if seen:
+                st['streak'] += 1
+                st['last_seen'] = now
+            else:
+                st['streak'] = 0
+
+            if not st['present']:
+                if st['streak'] >= self.enter_frames:
+                    st.update(present=True, count=seen, candidate=seen, candidate_streak=0)
+                    events.append(PresenceEvent("appeared", name, seen, 0, now))
+            elif not seen:
+                # Hold the last count through short dropouts
+                if now - st['last_seen'] >= self.leave_seconds:
+                    events.append(PresenceEvent("left", name, 0, st['count'], now))
+                    st.update(present=False, count=0, candidate=0, candidate_streak=0)
+            elif seen != st['count']:
+                if seen == st['candidate']:
+                    st['candidate_streak'] += 1
+                else:
+                    st['candidate'] = seen
+                    st['candidate_streak'] = 1
+                if st['candidate_streak'] >= self.count_frames:
+                    events.append(PresenceEvent("count_changed", name, seen, st['count'], now))
+                    st.update(count=seen, candidate_streak=0)
+            else:
+                st['candidate_streak'] = 0
+
+            if not st['present'] and not st['streak']:
+                del self.state[name]
+
+        events.sort(key=lambda e: (e.kind != "left", e.name))
+        return events
+
+    def reset(self):
+        self.state.clear()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+On-demand sampling profiler for the running apps.
+
+A background thread samples the Python stack of every thread (event loop,
+modality executors, audio callbacks, Tk) every few milliseconds through
+sys._current_frames(), for a chosen window, without restarting anything.
+The result is written in collapsed-stack format, one line per unique stack:
+
+    MainThread;mainloop (tkinter/__init__.py:1458);... 42
+
+which flamegraph.pl, speedscope (https://www.speedscope.app) and inferno
+read directly. The thread name is the root frame, so each thread gets its
+own tower.
+
+Start and stop it from the Profile button in the main app, with SIGUSR1
+(install_profile_signal), or from a shell:
+
+    python profiler.py PID                  # toggle profiling in a running app
+    python pipeline.py --profile 30         # profile the first 30 s of a run
+
+Profiles go to MULTIMODAL_PROFILE_DIR (default: the working directory). A
+window stops on its own after MULTIMODAL_PROFILE_SECONDS (default 30);
+MULTIMODAL_PROFILE_INTERVAL_MS sets the sampling interval (default 5).
+"""
+
+import os
+import sys
+import time
+import signal
+import argparse
+import threading
+from collections import Counter
+
+PROFILE_DIR = os.environ.get("MULTIMODAL_PROFILE_DIR", ".")
+PROFILE_SECONDS = float(os.environ.get("MULTIMODAL_PROFILE_SECONDS", "30"))
+PROFILE_INTERVAL = float(os.environ.get("MULTIMODAL_PROFILE_INTERVAL_MS", "5")) / 1000
+
+
+def frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapse_stack(thread_name, frame):
+    """Root-first collapsed stack for one thread, e.g. 'MainThread;main (x.py:1);run (x.py:9)'"""
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    labels.append(thread_name.replace(";", ":"))
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    """Samples all thread stacks at a fixed interval while running"""
+
+    def __init__(self, interval=PROFILE_INTERVAL, on_done=None):
+        self.interval = interval
+        self.on_done = on_done
+        self.counts = Counter()
+        self.samples = 0
+        self.lock = threading.Lock()
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.started = None
+        self.elapsed = 0.0
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def sample(self):
+        """Take one sample of every thread except the profiler's own"""
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        own = threading.get_ident()
+        stacks = [
+            collapse_stack(names.get(ident, f"thread-{ident}"), frame)
+            for ident, frame in sys._current_frames().items() if ident != own
+        ]
+        with self.lock:
+            self.counts.update(stacks)
+            self.samples += 1
+
+    def start(self, duration=PROFILE_SECONDS, path=None):
+        """Sample for duration seconds (None = until stop()), then write to path"""
+        if self.running:
+            return False
+        with self.lock:
+            self.counts.clear()
+            self.samples = 0
+        self.stop_event.clear()
+        self.started = time.monotonic()
+        self.thread = threading.Thread(target=self._run, args=(duration, path), name="profiler", daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self):
+        """End the window early; the profile is written as if it had run out"""
+        self.stop_event.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+
+    def _run(self, duration, path):
+        deadline = None if duration is None else self.started + duration
+        while not self.stop_event.is_set():
+            self.sample()
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            self.stop_event.wait(self.interval)
+        self.elapsed = time.monotonic() - self.started
+        try:
+            path = self.write(path)
+        except OSError as e:
+            path = None
+            print(f"Profiler could not write its output: {e}")
+        if self.on_done is not None:
+            self.on_done(path)
+
+    def collapsed(self):
+        """Collapsed-stack lines, heaviest first"""
+        with self.lock:
+            return [f"{stack} {count}" for stack, count in self.counts.most_common()]
+
+    def top(self, n=5):
+        """The n functions most often on top of a stack, as (label, share of samples)"""
+        leaves = Counter()
+        with self.lock:
+            for stack, count in self.counts.items():
+                leaves[stack.rsplit(";", 1)[-1]] += count
+            total = sum(leaves.values()) or 1
+        return [(label, count / total) for label, count in leaves.most_common(n)]
+
+    def write(self, path=None):
+        """Write the collapsed stacks and return the file name"""
+        if path is None:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            path = os.path.join(PROFILE_DIR, f"profile-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.collapsed")
+        with open(path, "w", encoding="utf-8") as f:
+            for line in self.collapsed():
+                f.write(line + "\n")
+        return path
+
+    def describe(self, path):
+        """One log line for a finished window"""
+        return f"🔬 Profile: {self.samples} samples over {self.elapsed:.1f} s written to {path}"
+
+
+PROFILER = SamplingProfiler()
+
+
+def toggle(profiler=PROFILER, duration=PROFILE_SECONDS):
+    """Start a window if none is running, otherwise end the current one; True if started"""
+    if profiler.running:
+        profiler.stop_event.set()   # the sampler thread writes the profile
+        return False
+    return profiler.start(duration)
+
+
+def install_profile_signal(profiler=PROFILER, signum=None, on_done=print, duration=PROFILE_SECONDS):
+    """Toggle profiling whenever the process gets SIGUSR1 (Unix only)
+
+    Returns False where the signal does not exist or this is not the main thread.
+    """
+    signum = signum or getattr(signal, "SIGUSR1", None)
+    if signum is None or threading.current_thread() is not threading.main_thread():
+        return False
+    if profiler.on_done is None:
+        profiler.on_done = lambda path: on_done(profiler.describe(path))
+
+    def handler(signum, frame):
+        if toggle(profiler, duration):
+            on_done(f"🔬 Profiling for up to {duration:.0f} s (signal again to stop early)")
+
+    signal.signal(signum, handler)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Toggle the sampling profiler in a running app")
+    parser.add_argument("pid", type=int, help="process id of main.py, myfile.py, pipeline.py or the daemon")
+    args = parser.parse_args()
+    if not hasattr(signal, "SIGUSR1"):
+        parser.error("SIGUSR1 is not available on this platform; use the Profile button instead")
+    os.kill(args.pid, signal.SIGUSR1)
+    print(f"🔬 Sent SIGUSR1 to {args.pid}: profiling starts, or stops and writes its profile")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Resource monitor with graceful degradation.
+
+A coroutine samples CPU, memory, temperature and battery through psutil
+every few seconds and moves the apps between degradation levels:
+
+    normal  - full object detection rate and display FPS
+    reduced - YOLO at 2 fps, display at 15 fps
+    minimal - YOLO every 2 s, display at 10 fps
+    paused  - object detection paused, display at 5 fps
+
+Pressure has to persist for escalate_samples samples before the level goes
+up, and the level only comes down one step at a time once every metric has
+stayed below its threshold minus a margin for recover_samples samples, so
+a fanless unit near its thermal limit does not flap between levels.
+"""
+
+import time
+import asyncio
+from collections import namedtuple
+
+ResourceSample = namedtuple("ResourceSample", ["cpu", "memory", "temperature", "battery", "plugged"])
+DegradationLevel = namedtuple("DegradationLevel", ["name", "object_interval", "display_fps", "objects"])
+LevelChange = namedtuple("LevelChange", ["previous", "level", "reasons", "sample"])
+
+LEVELS = [
+    DegradationLevel("normal", 0.1, 30, True),
+    DegradationLevel("reduced", 0.5, 15, True),
+    DegradationLevel("minimal", 2.0, 10, True),
+    DegradationLevel("paused", None, 5, False),
+]
+
+# (metric, threshold, level index): at or above the threshold means at least that level.
+# Battery is checked as "below", and only when not plugged in.
+THRESHOLDS = [
+    ("cpu", 90.0, 1),
+    ("memory", 85.0, 1),
+    ("memory", 93.0, 3),
+    ("temperature", 80.0, 1),
+    ("temperature", 88.0, 2),
+    ("temperature", 95.0, 3),
+    ("battery", 25.0, 1),
+    ("battery", 10.0, 2),
+]
+
+
+def sample_resources():
+    """Take one ResourceSample; metrics the platform cannot report are None"""
+    import psutil
+    temperature = None
+    try:
+        readings = psutil.sensors_temperatures()
+    except (AttributeError, OSError):
+        readings = {}
+    currents = [entry.current for entries in readings.values() for entry in entries if entry.current]
+    if currents:
+        temperature = max(currents)
+    battery, plugged = None, None
+    try:
+        info = psutil.sensors_battery()
+    except (AttributeError, OSError):
+        info = None
+    if info is not None:
+        battery, plugged = info.percent, info.power_plugged
+    return ResourceSample(
+        cpu=psutil.cpu_percent(interval=None),
+        memory=psutil.virtual_memory().percent,
+        temperature=temperature,
+        battery=battery,
+        plugged=plugged,
+    )
+
+
+def pressure(sample, margin=0.0):
+    """Return (level index, reasons) the sample calls for
+
+    With a margin, thresholds are moved towards "healthy" by that much,
+    which is how recovery is checked.
+    """
+    level, reasons = 0, []
+    for metric, threshold, index in THRESHOLDS:
+        value = getattr(sample, metric)
+        if value is None:
+            continue
+        if metric == "battery":
+            hit = not sample.plugged and value <= threshold + margin
+        else:
+            hit = value >= threshold - margin
+        if hit and index >= level:
+            if index > level:
+                reasons = []
+            level = index
+            reasons.append(f"{metric} {value:.0f}")
+    return level, reasons
+
+
+class ResourceMonitor:
+    """Samples resources and steps through LEVELS with hysteresis"""
+
+    def __init__(self, sample=sample_resources, interval=2.0, escalate_samples=2,
+                 recover_samples=5, margin=5.0, on_change=None):
+        self.sample = sample
+        self.interval = interval
+        self.escalate_samples = escalate_samples
+        self.recover_samples = recover_samples
+        self.margin = margin
+        self.on_change = on_change
+        self.index = 0
+        self.high = 0
+        self.low = 0
+        self.last_sample = None
+        self.history = []
+
+    @property
+    def level(self):
+        return LEVELS[self.index]
+
+    def update(self, sample):
+        """Feed one sample; return a LevelChange if the level moved, else None"""
+        self.last_sample = sample
+        target, reasons = pressure(sample)
+        if target > self.index:
+            self.high, self.low = self.high + 1, 0
+            if self.high >= self.escalate_samples:
+                return self._move(target, reasons, sample)
+            return None
+        self.high = 0
+        if self.index > 0 and pressure(sample, self.margin)[0] < self.index:
+            self.low += 1
+            if self.low >= self.recover_samples:
+                return self._move(self.index - 1, ["pressure eased"], sample)
+        else:
+            self.low = 0
+        return None
+
+    def _move(self, index, reasons, sample):
+        change = LevelChange(LEVELS[self.index], LEVELS[index], reasons, sample)
+        self.index = index
+        self.high = self.low = 0
+        self.history.append((time.time(), change))
+        if self.on_change is not None:
+            self.on_change(change)
+        return change
+
+    async def run(self, should_run=lambda: True):
+        """Sample every interval seconds until should_run() is False"""
+        while should_run():
+            try:
+                self.update(self.sample())
+            except Exception as e:
+                print(f"Resource monitor error: {e}")
+            await asyncio.sleep(self.interval)
+
+
+def describe(change):
+    """One log line for a level change"""
+    arrow = "⬇️" if LEVELS.index(change.level) > LEVELS.index(change.previous) else "⬆️"
+    return f"{arrow} Performance {change.previous.name} → {change.level.name} ({', '.join(change.reasons)})"
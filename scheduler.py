@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Priority-aware scheduling of the modality workloads.
+
+Every inference call goes through PriorityScheduler.run(), which admits it
+into one of a fixed number of slots before it is handed to the modality's
+executor. Waiting work is started in priority order (then earliest
+deadline), and background work (object detection) may only ever hold
+background_slots of them. An interactive call (gesture, speech command)
+therefore never waits behind a queue of YOLO frames; at most it waits for
+a slot held by another interactive call. Running inference cannot be
+interrupted, so pre-emption happens at admission time.
+
+Rate-limited background work such as the display refresh asks due(); its
+period is stretched while interactive work is waiting or running.
+"""
+
+import time
+import asyncio
+import heapq
+import itertools
+from collections import namedtuple
+from metrics import INFERENCE_SECONDS, SCHEDULER_WAIT_SECONDS, QUEUE_DEPTH
+from tracing import TRACER
+
+INTERACTIVE, NORMAL, BACKGROUND = 0, 1, 2
+
+# deadline: seconds from request to result (None = best effort)
+# period: minimum seconds between runs for due()
+ModalityPolicy = namedtuple("ModalityPolicy", ["priority", "deadline", "period"])
+
+DEFAULT_POLICIES = {
+    "gesture": ModalityPolicy(INTERACTIVE, 0.1, 0.0),
+    "speech": ModalityPolicy(INTERACTIVE, 2.0, 0.0),
+    "object": ModalityPolicy(BACKGROUND, None, 0.1),
+    "display": ModalityPolicy(BACKGROUND, None, 1 / 30),
+}
+
+
+class ModalityStats:
+    """Per-modality counters for the scheduler report"""
+
+    def __init__(self):
+        self.runs = 0
+        self.deadline_misses = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.run_total = 0.0
+        self.skipped = 0
+
+    def as_dict(self):
+        return {
+            "runs": self.runs,
+            "deadline_misses": self.deadline_misses,
+            "mean_wait_ms": 1000 * self.wait_total / self.runs if self.runs else 0.0,
+            "max_wait_ms": 1000 * self.wait_max,
+            "mean_run_ms": 1000 * self.run_total / self.runs if self.runs else 0.0,
+            "skipped": self.skipped,
+        }
+
+
+class PriorityScheduler:
+    """Admits modality work in priority/deadline order into a fixed number of slots"""
+
+    def __init__(self, slots=3, background_slots=1, policies=None, busy_stretch=4.0):
+        self.slots = slots
+        self.background_slots = background_slots
+        self.policies = dict(DEFAULT_POLICIES)
+        self.policies.update(policies or {})
+        self.busy_stretch = busy_stretch
+        self.running = 0
+        self.running_background = 0
+        self.running_interactive = 0
+        self.waiters = []
+        self.sequence = itertools.count()
+        self.last_due = {}
+        self.stats = {name: ModalityStats() for name in self.policies}
+
+    def policy(self, modality):
+        return self.policies.get(modality, ModalityPolicy(NORMAL, None, 0.0))
+
+    def _can_start(self, priority):
+        if self.running >= self.slots:
+            return False
+        return priority < BACKGROUND or self.running_background < self.background_slots
+
+    def _start(self, priority):
+        self.running += 1
+        if priority >= BACKGROUND:
+            self.running_background += 1
+        elif priority == INTERACTIVE:
+            self.running_interactive += 1
+
+    def _release(self, priority):
+        self.running -= 1
+        if priority >= BACKGROUND:
+            self.running_background -= 1
+        elif priority == INTERACTIVE:
+            self.running_interactive -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        # Start waiters in priority/deadline order; a background waiter that is
+        # over its slot limit does not block higher-numbered work behind it
+        blocked = []
+        while self.waiters and self.running < self.slots:
+            entry = heapq.heappop(self.waiters)
+            priority, _, _, future = entry
+            if future.done():
+                continue
+            if self._can_start(priority):
+                self._start(priority)
+                future.set_result(None)
+            else:
+                blocked.append(entry)
+        for entry in blocked:
+            heapq.heappush(self.waiters, entry)
+        QUEUE_DEPTH.set(len(self.waiters), queue="scheduler")
+
+    def interactive_pending(self):
+        """True while interactive work is running or waiting for a slot"""
+        return self.running_interactive > 0 or any(
+            entry[0] == INTERACTIVE and not entry[3].done() for entry in self.waiters
+        )
+
+    async def acquire(self, modality):
+        policy = self.policy(modality)
+        ahead = any(entry[0] <= policy.priority and not entry[3].done() for entry in self.waiters)
+        if not ahead and self._can_start(policy.priority):
+            self._start(policy.priority)
+            return
+        deadline = time.monotonic() + policy.deadline if policy.deadline is not None else float("inf")
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (policy.priority, deadline, next(self.sequence), future))
+        QUEUE_DEPTH.set(len(self.waiters), queue="scheduler")
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release(policy.priority)
+            raise
+
+    async def run(self, modality, executor, func, *args, trace=None):
+        """Run func(*args) on executor once the scheduler admits it
+
+        With a trace ID, the slot wait and the call are recorded as
+        queue_wait and inference spans of that trace.
+        """
+        policy = self.policy(modality)
+        requested = time.perf_counter()
+        await self.acquire(modality)
+        started = time.perf_counter()
+        TRACER.record(trace, "queue_wait", requested, started, modality=modality)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+        finally:
+            finished = time.perf_counter()
+            TRACER.record(trace, "inference", started, finished, modality=modality)
+            self._release(policy.priority)
+            stats = self.stats.setdefault(modality, ModalityStats())
+            stats.runs += 1
+            stats.wait_total += started - requested
+            stats.wait_max = max(stats.wait_max, started - requested)
+            stats.run_total += finished - started
+            SCHEDULER_WAIT_SECONDS.observe(started - requested, modality=modality)
+            INFERENCE_SECONDS.observe(finished - started, modality=modality)
+            if policy.deadline is not None and finished - requested > policy.deadline:
+                stats.deadline_misses += 1
+
+    def due(self, modality, now=None):
+        """For rate-limited work: True if it should run now
+
+        The period is stretched by busy_stretch while interactive work is pending.
+        """
+        now = time.monotonic() if now is None else now
+        period = self.policy(modality).period
+        if self.interactive_pending():
+            period *= self.busy_stretch
+        last = self.last_due.get(modality)
+        if last is not None and now - last < period:
+            self.stats.setdefault(modality, ModalityStats()).skipped += 1
+            return False
+        self.last_due[modality] = now
+        return True
+
+    def report(self):
+        """Return the per-modality statistics as a list of lines"""
+        lines = ["Scheduler:"]
+        for name, stats in self.stats.items():
+            if not stats.runs and not stats.skipped:
+                continue
+            s = stats.as_dict()
+            line = f"  {name:<8} runs {s['runs']:5d}  wait {s['mean_wait_ms']:6.1f} ms (max {s['max_wait_ms']:.0f})"
+            line += f"  run {s['mean_run_ms']:6.1f} ms  missed {s['deadline_misses']}"
+            if s["skipped"]:
+                line += f"  skipped {s['skipped']}"
+            lines.append(line)
+        return lines
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Pluggable camera and microphone sources, live or replayed from files.
+
+Video sources behave like cv2.VideoCapture (read / isOpened / release) and
+also record the timestamp of the last frame. Audio sources deliver mono
+float32 blocks at 16 kHz to a callback(samples, timestamp), like the
+sounddevice callbacks the apps already use:
+
+    with open_audio_source(spec).stream(callback):
+        ...
+
+Replay sources pace themselves by media time: speed 1 is real time, 4 is
+four times faster and 0 is as fast as possible. Their timestamps are
+start_time + media time, so a replay with a fixed start_time produces the
+same timestamps on every run. Sources are picked by spec:
+
+    video: camera index ("0"), a video file, or a directory of images
+    audio: "mic" or a WAV file
+
+or through MULTIMODAL_VIDEO_SOURCE, MULTIMODAL_AUDIO_SOURCE and
+MULTIMODAL_REPLAY_SPEED.
+"""
+
+import os
+import time
+import wave
+import threading
+from contextlib import contextmanager
+import numpy as np
+from model_loader import timed_import, lazy_import
+from metrics import frame_captured
+
+cv2 = lazy_import("cv2")
+
+VIDEO_SOURCE = os.environ.get("MULTIMODAL_VIDEO_SOURCE", "0")
+AUDIO_SOURCE = os.environ.get("MULTIMODAL_AUDIO_SOURCE", "mic")
+REPLAY_SPEED = float(os.environ.get("MULTIMODAL_REPLAY_SPEED", "1"))
+SAMPLE_RATE = 16000
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+class ReplayClock:
+    """Sleeps until a media time is due at the given speed (0 = never sleeps)"""
+
+    def __init__(self, speed=1.0, start_time=None):
+        self.speed = speed
+        self.start_time = time.time() if start_time is None else start_time
+        self.started = None
+
+    def wait(self, media_time):
+        if self.started is None:
+            self.started = time.monotonic()
+        if self.speed <= 0:
+            return
+        delay = self.started + media_time / self.speed - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def timestamp(self, media_time):
+        return self.start_time + media_time
+
+
+class CameraSource:
+    """Live camera through cv2.VideoCapture"""
+
+    live = True
+
+    def __init__(self, index=0):
+        self.cap = cv2.VideoCapture(index)
+        self.timestamp = None
+        self.finished = False
+
+    def read(self):
+        ret, frame = self.cap.read()
+        if ret:
+            self.timestamp = time.time()
+            frame_captured("camera")
+        return ret, frame
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource:
+    """Replays a video file at its own frame rate times speed"""
+
+    live = False
+
+    def __init__(self, path, speed=REPLAY_SPEED, start_time=None, loop=False):
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.clock = ReplayClock(speed, start_time)
+        self.loop = loop
+        self.index = 0
+        self.timestamp = None
+        self.finished = False
+
+    def read(self):
+        ret, frame = self.cap.read()
+        if not ret and self.loop and self.index:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        if not ret:
+            self.finished = True
+            return False, None
+        media_time = self.index / self.fps
+        self.clock.wait(media_time)
+        self.timestamp = self.clock.timestamp(media_time)
+        self.index += 1
+        frame_captured("video")
+        return True, frame
+
+    def isOpened(self):
+        return self.cap.isOpened() and not self.finished
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirSource:
+    """Replays a directory of images (sorted by name) at a fixed frame rate"""
+
+    live = False
+
+    def __init__(self, path, fps=10.0, speed=REPLAY_SPEED, start_time=None, loop=False):
+        self.paths = sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        self.fps = fps
+        self.clock = ReplayClock(speed, start_time)
+        self.loop = loop
+        self.index = 0
+        self.timestamp = None
+        self.finished = not self.paths
+
+    def read(self):
+        # index keeps counting across loops so timestamps keep increasing
+        if self.finished or (self.index >= len(self.paths) and not self.loop):
+            self.finished = True
+            return False, None
+        frame = cv2.imread(self.paths[self.index % len(self.paths)])
+        media_time = self.index / self.fps
+        self.clock.wait(media_time)
+        self.timestamp = self.clock.timestamp(media_time)
+        self.index += 1
+        if frame is not None:
+            frame_captured("images")
+        return frame is not None, frame
+
+    def isOpened(self):
+        return not self.finished
+
+    def release(self):
+        self.finished = True
+
+
+class MicrophoneSource:
+    """Live microphone through sounddevice"""
+
+    live = True
+
+    def __init__(self, sample_rate=SAMPLE_RATE, block_seconds=0.1):
+        self.sample_rate = sample_rate
+        self.block_seconds = block_seconds
+        self.finished = False
+
+    @contextmanager
+    def stream(self, callback):
+        sd = timed_import("sounddevice")
+
+        def audio_callback(indata, frames, time_info, status):
+            callback(indata[:, 0].astype(np.float32), time.time())
+
+        with sd.InputStream(callback=audio_callback, channels=1, samplerate=self.sample_rate,
+                            dtype=np.float32, blocksize=int(self.sample_rate * self.block_seconds)):
+            yield self
+
+
+def wav_duration(path):
+    """Length of a WAV file in seconds, from its header"""
+    with wave.open(path, "rb") as wav:
+        return wav.getnframes() / wav.getframerate()
+
+
+def read_wav(path, sample_rate=SAMPLE_RATE, start=0.0, end=None):
+    """Read a PCM WAV file (or its start..end seconds) as mono float32 at sample_rate"""
+    with wave.open(path, "rb") as wav:
+        channels, width, rate = wav.getnchannels(), wav.getsampwidth(), wav.getframerate()
+        total = wav.getnframes()
+        first = min(int(round(start * rate)), total)
+        last = total if end is None else min(int(round(end * rate)), total)
+        wav.setpos(first)
+        raw = wav.readframes(max(0, last - first))
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128.0
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 4:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"{path}: unsupported sample width {width}")
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    if rate != sample_rate and samples.size:
+        duration = samples.size / rate
+        target = np.arange(int(duration * sample_rate)) / sample_rate
+        samples = np.interp(target, np.arange(samples.size) / rate, samples).astype(np.float32)
+    return samples
+
+
+class WavFileSource:
+    """Replays a WAV file in microphone-sized blocks from a background thread"""
+
+    live = False
+
+    def __init__(self, path, speed=REPLAY_SPEED, start_time=None, sample_rate=SAMPLE_RATE,
+                 block_seconds=0.1, loop=False):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.samples = read_wav(path, sample_rate)
+        self.block = int(sample_rate * block_seconds)
+        self.speed = speed
+        self.start_time = start_time
+        self.loop = loop
+        self.finished = False
+        self.done = threading.Event()
+
+    def _play(self, callback, stop):
+        clock = ReplayClock(self.speed, self.start_time)
+        played = 0
+        while not stop.is_set() and self.samples.size:
+            offset = played % self.samples.size if self.loop else played
+            if offset >= self.samples.size:
+                break
+            media_time = played / self.sample_rate
+            clock.wait(media_time)
+            block = self.samples[offset:offset + self.block]
+            callback(block, clock.timestamp(media_time))
+            played += block.size
+        self.finished = True
+        self.done.set()
+
+    @contextmanager
+    def stream(self, callback):
+        stop = threading.Event()
+        thread = threading.Thread(target=self._play, args=(callback, stop), name="wav-replay", daemon=True)
+        thread.start()
+        try:
+            yield self
+        finally:
+            stop.set()
+            thread.join(timeout=1.0)
+
+
+def is_camera(spec=None):
+    """Whether a video source spec names a live camera rather than a recording"""
+    return (VIDEO_SOURCE if spec is None else str(spec)).isdigit()
+
+
+def open_video_source(spec=None, speed=None, start_time=None, loop=False):
+    """Camera index, video file or image directory -> video source"""
+    spec = VIDEO_SOURCE if spec is None else str(spec)
+    speed = REPLAY_SPEED if speed is None else speed
+    if is_camera(spec):
+        return CameraSource(int(spec))
+    if os.path.isdir(spec):
+        return ImageDirSource(spec, speed=speed, start_time=start_time, loop=loop)
+    if os.path.isfile(spec):
+        return VideoFileSource(spec, speed=speed, start_time=start_time, loop=loop)
+    raise ValueError(f"Video source '{spec}' is not a camera index, file or directory")
+
+
+def open_audio_source(spec=None, speed=None, start_time=None, loop=False, sample_rate=SAMPLE_RATE):
+    """'mic' or a WAV file -> audio source"""
+    spec = AUDIO_SOURCE if spec is None else spec
+    speed = REPLAY_SPEED if speed is None else speed
+    if spec == "mic":
+        return MicrophoneSource(sample_rate)
+    if os.path.isfile(spec):
+        return WavFileSource(spec, speed=speed, start_time=start_time, loop=loop, sample_rate=sample_rate)
+    raise ValueError(f"Audio source '{spec}' is not 'mic' or a WAV file")
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Speech recognition backends for the Multimodal AI Assistant.
+
+Every backend takes mono float32 audio (range -1..1) and returns the
+recognized text, or None when nothing was understood. Pick a backend by
+name with create_backend(), or set the MULTIMODAL_SPEECH_BACKEND
+environment variable:
+
+    whisper  - local OpenAI Whisper model (default, works offline)
+    whisper-int8   - Whisper with int8 dynamic quantization (faster on CPU)
+    faster-whisper - CTranslate2 Whisper engine, int8 on CPU (pip install faster-whisper)
+    keyword  - local PocketSphinx keyword spotting for the command words
+    google   - Google Speech Recognition API (needs internet)
+    stub     - deterministic canned transcripts, for tests and demos
+"""
+
+import os
+import numpy as np
+from model_loader import timed_import
+from thread_budget import THREAD_BUDGET
+
+SAMPLE_RATE = 16000
+DEFAULT_BACKEND = os.environ.get("MULTIMODAL_SPEECH_BACKEND", "whisper")
+DEFAULT_PRESET = os.environ.get("MULTIMODAL_WHISPER_PRESET", "fast")
+
+# Decoding settings for the Whisper backends, from most accurate to fastest.
+# "accurate" is Whisper's own default (temperature fallback, timestamps).
+LATENCY_PRESETS = {
+    "accurate": {
+        "beam_size": 5,
+        "temperature": (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        "without_timestamps": False,
+        "condition_on_previous_text": True,
+    },
+    "balanced": {
+        "beam_size": None,
+        "temperature": (0.0, 0.4),
+        "without_timestamps": True,
+        "condition_on_previous_text": False,
+    },
+    "fast": {
+        "beam_size": None,
+        "temperature": 0.0,
+        "without_timestamps": True,
+        "condition_on_previous_text": False,
+    },
+}
+
+# Words and phrases the voice command handlers react to
+COMMAND_KEYWORDS = [
+    "volume up", "volume down", "increase volume", "decrease volume",
+    "mute", "unmute",
+    "brightness up", "brightness down", "increase brightness", "decrease brightness",
+    "screenshot", "take screenshot",
+    "open notepad", "open calculator",
+    "close", "exit",
+]
+
+
+class SpeechBackendError(Exception):
+    """Raised when a backend cannot reach its engine or service"""
+
+
+def audio_data_to_array(audio, sample_rate=SAMPLE_RATE):
+    """Convert a speech_recognition AudioData object to float32 samples"""
+    raw = audio.get_raw_data(convert_rate=sample_rate, convert_width=2)
+    return np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def array_to_audio_data(samples, sample_rate=SAMPLE_RATE):
+    """Convert float32 samples to a speech_recognition AudioData object"""
+    import speech_recognition as sr
+    audio_int16 = np.int16(np.clip(samples, -1.0, 1.0) * 32767)
+    return sr.AudioData(audio_int16.tobytes(), sample_rate, 2)
+
+
+def _warmup_clip(seconds, sample_rate):
+    """Low-level noise: exercises the encoder and decoder like real speech would"""
+    rng = np.random.default_rng(0)
+    return (0.01 * rng.standard_normal(int(seconds * sample_rate))).astype(np.float32)
+
+
+class SpeechBackend:
+    """Base class for speech recognition backends"""
+
+    name = "base"
+    offline = True
+
+    def load(self):
+        """Load models ahead of the first call (optional)"""
+        pass
+
+    def warmup(self, seconds=1.0, sample_rate=SAMPLE_RATE):
+        """Decode a short synthetic clip so the first real call runs at full speed"""
+        pass
+
+    def transcribe(self, samples, sample_rate=SAMPLE_RATE):
+        """Recognize float32 mono samples, return text or None"""
+        raise NotImplementedError
+
+    def transcribe_batch(self, segments, sample_rate=SAMPLE_RATE):
+        """Recognize several segments, one text (or None) per segment
+
+        Backends that can decode a batch in one forward pass override this.
+        """
+        return [self.transcribe(samples, sample_rate) for samples in segments]
+
+    def recognize(self, audio, sample_rate=SAMPLE_RATE):
+        """Recognize either an AudioData object or a sample array"""
+        if hasattr(audio, "get_raw_data"):
+            samples = audio_data_to_array(audio, sample_rate)
+        else:
+            samples = np.asarray(audio, dtype=np.float32)
+        if samples.size == 0:
+            return None
+        return self.transcribe(samples, sample_rate)
+
+    def transcribe_words(self, samples, sample_rate=SAMPLE_RATE, prompt=None):
+        """Recognize samples and return (word, start, end) tuples in seconds
+
+        Backends without word timings spread the words evenly over the clip.
+        """
+        text = self.transcribe(samples, sample_rate)
+        if not text:
+            return []
+        words = text.split()
+        step = len(samples) / sample_rate / len(words)
+        return [(word, i * step, (i + 1) * step) for i, word in enumerate(words)]
+
+
+def get_preset(name):
+    """Look up a Whisper latency preset by name"""
+    if name not in LATENCY_PRESETS:
+        raise ValueError(f"Unknown Whisper preset '{name}' (choose from {', '.join(LATENCY_PRESETS)})")
+    return dict(LATENCY_PRESETS[name])
+
+
+class WhisperBackend(SpeechBackend):
+    """Local Whisper model, no network access needed"""
+
+    name = "whisper"
+
+    def __init__(self, model_name="base", language="en", model=None, preset=None):
+        self.model_name = model_name
+        self.language = language
+        self.model = model
+        self.preset = preset or DEFAULT_PRESET
+        self.options = get_preset(self.preset)
+
+    def load(self):
+        if self.model is None:
+            whisper = timed_import("whisper")
+            self.model = whisper.load_model(self.model_name, device="cpu")
+        return self.model
+
+    def _decode_options(self):
+        options = dict(self.options)
+        if options["beam_size"] is None:
+            del options["beam_size"]
+        return options
+
+    def warmup(self, seconds=1.0, sample_rate=SAMPLE_RATE):
+        self.transcribe(_warmup_clip(seconds, sample_rate), sample_rate)
+
+    def transcribe(self, samples, sample_rate=SAMPLE_RATE):
+        if sample_rate != SAMPLE_RATE:
+            raise ValueError(f"Whisper expects {SAMPLE_RATE} Hz audio, got {sample_rate} Hz")
+        model = self.load()
+        result = model.transcribe(
+            samples.astype(np.float32),
+            language=self.language,
+            fp16=False,
+            **self._decode_options()
+        )
+        text = result["text"].strip()
+        return text or None
+
+    def transcribe_batch(self, segments, sample_rate=SAMPLE_RATE):
+        """Encode and decode up to 30 s segments as one batch
+
+        model.transcribe() pads every segment to a 30 s window anyway, so one
+        batched pass costs little more than a single segment. Decoding uses
+        the preset's first temperature without fallback, and segments Whisper
+        judges to be silence come back as None, as in transcribe().
+        """
+        if sample_rate != SAMPLE_RATE:
+            raise ValueError(f"Whisper expects {SAMPLE_RATE} Hz audio, got {sample_rate} Hz")
+        whisper = timed_import("whisper")
+        if len(segments) < 2 or any(len(samples) > whisper.audio.N_SAMPLES for samples in segments):
+            return super().transcribe_batch(segments, sample_rate)
+        model = self.load()
+        torch = timed_import("torch")
+        n_mels = getattr(model.dims, "n_mels", 80)
+        mel_options = {"n_mels": n_mels} if n_mels != 80 else {}
+        mels = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(np.asarray(samples, dtype=np.float32)), **mel_options)
+            for samples in segments
+        ]).to(model.device)
+        temperature = self.options["temperature"]
+        if isinstance(temperature, (tuple, list)):
+            temperature = temperature[0]
+        options = whisper.DecodingOptions(
+            language=self.language, temperature=temperature, beam_size=self.options["beam_size"],
+            without_timestamps=True, fp16=False,
+        )
+        texts = []
+        for result in whisper.decode(model, mels, options):
+            silent = result.no_speech_prob > 0.6 and result.avg_logprob < -1.0
+            text = "" if silent else result.text.strip()
+            texts.append(text or None)
+        return texts
+
+    def transcribe_words(self, samples, sample_rate=SAMPLE_RATE, prompt=None):
+        if sample_rate != SAMPLE_RATE:
+            raise ValueError(f"Whisper expects {SAMPLE_RATE} Hz audio, got {sample_rate} Hz")
+        model = self.load()
+        options = self._decode_options()
+        options.update(without_timestamps=False, condition_on_previous_text=False)
+        result = model.transcribe(
+            samples.astype(np.float32),
+            language=self.language,
+            fp16=False,
+            initial_prompt=prompt or None,
+            word_timestamps=True,
+            **options
+        )
+        words = []
+        for segment in result["segments"]:
+            for word in segment.get("words", []):
+                text = word["word"].strip()
+                if text:
+                    words.append((text, word["start"], word["end"]))
+        return words
+
+
+class QuantizedWhisperBackend(WhisperBackend):
+    """Whisper with int8 dynamic quantization of its Linear layers (CPU only)"""
+
+    name = "whisper-int8"
+
+    def load(self):
+        if self.model is None:
+            import platform
+            model = super().load()
+            torch = timed_import("torch")
+            if platform.machine().lower() in ("arm64", "aarch64") and "qnnpack" in torch.backends.quantized.supported_engines:
+                torch.backends.quantized.engine = "qnnpack"
+            self.model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return self.model
+
+
+class FasterWhisperBackend(SpeechBackend):
+    """CTranslate2 Whisper engine (faster-whisper) with int8 weights on CPU"""
+
+    name = "faster-whisper"
+
+    def __init__(self, model_name="base", language="en", compute_type="int8",
+                 cpu_threads=0, preset=None):
+        self.model_name = model_name
+        self.language = language
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.preset = preset or DEFAULT_PRESET
+        self.options = get_preset(self.preset)
+        self.model = None
+
+    def load(self):
+        if self.model is None:
+            try:
+                WhisperModel = timed_import("faster_whisper").WhisperModel
+            except ImportError:
+                raise SpeechBackendError("faster-whisper is not installed (pip install faster-whisper)")
+            self.model = WhisperModel(
+                self.model_name,
+                device="cpu",
+                compute_type=self.compute_type,
+                cpu_threads=self.cpu_threads or THREAD_BUDGET.threads("ctranslate2")
+            )
+        return self.model
+
+    def _decode_options(self):
+        options = dict(self.options)
+        options["beam_size"] = options["beam_size"] or 1
+        return options
+
+    def warmup(self, seconds=1.0, sample_rate=SAMPLE_RATE):
+        self.transcribe(_warmup_clip(seconds, sample_rate), sample_rate)
+
+    def transcribe(self, samples, sample_rate=SAMPLE_RATE):
+        if sample_rate != SAMPLE_RATE:
+            raise ValueError(f"Whisper expects {SAMPLE_RATE} Hz audio, got {sample_rate} Hz")
+        model = self.load()
+        segments, _ = model.transcribe(
+            samples.astype(np.float32),
+            language=self.language,
+            **self._decode_options()
+        )
+        text = " ".join(segment.text.strip() for segment in segments).strip()
+        return text or None
+
+    def transcribe_words(self, samples, sample_rate=SAMPLE_RATE, prompt=None):
+        if sample_rate != SAMPLE_RATE:
+            raise ValueError(f"Whisper expects {SAMPLE_RATE} Hz audio, got {sample_rate} Hz")
+        model = self.load()
+        options = self._decode_options()
+        options.update(without_timestamps=False, condition_on_previous_text=False)
+        segments, _ = model.transcribe(
+            samples.astype(np.float32),
+            language=self.language,
+            initial_prompt=prompt or None,
+            word_timestamps=True,
+            **options
+        )
+        words = []
+        for segment in segments:
+            for word in segment.words or []:
+                text = word.word.strip()
+                if text:
+                    words.append((text, word.start, word.end))
+        return words
+
+
+class KeywordBackend(SpeechBackend):
+    """Small local keyword model that only listens for the command words"""
+
+    name = "keyword"
+
+    def __init__(self, keywords=None, sensitivity=0.8):
+        self.keywords = list(keywords or COMMAND_KEYWORDS)
+        self.sensitivity = sensitivity
+        self.recognizer = None
+
+    def load(self):
+        if self.recognizer is None:
+            import speech_recognition as sr
+            self.recognizer = sr.Recognizer()
+        return self.recognizer
+
+    def transcribe(self, samples, sample_rate=SAMPLE_RATE):
+        import speech_recognition as sr
+        recognizer = self.load()
+        entries = [(keyword, self.sensitivity) for keyword in self.keywords]
+        try:
+            text = recognizer.recognize_sphinx(
+                array_to_audio_data(samples, sample_rate),
+                keyword_entries=entries
+            )
+        except sr.UnknownValueError:
+            return None
+        except sr.RequestError as e:
+            raise SpeechBackendError(str(e))
+        text = " ".join(text.split())
+        return text or None
+
+
+class GoogleBackend(SpeechBackend):
+    """Google Speech Recognition API (requires an internet connection)"""
+
+    name = "google"
+    offline = False
+
+    def __init__(self, language="en-US"):
+        self.language = language
+        self.recognizer = None
+
+    def load(self):
+        if self.recognizer is None:
+            import speech_recognition as sr
+            self.recognizer = sr.Recognizer()
+        return self.recognizer
+
+    def transcribe(self, samples, sample_rate=SAMPLE_RATE):
+        import speech_recognition as sr
+        recognizer = self.load()
+        try:
+            return recognizer.recognize_google(
+                array_to_audio_data(samples, sample_rate),
+                language=self.language
+            )
+        except sr.UnknownValueError:
+            return None
+        except sr.RequestError as e:
+            raise SpeechBackendError(str(e))
+
+
+class StubBackend(SpeechBackend):
+    """Deterministic backend that replays canned transcripts in order"""
+
+    name = "stub"
+
+    def __init__(self, responses=None):
+        if responses is None:
+            env = os.environ.get("MULTIMODAL_STUB_TRANSCRIPTS", "")
+            responses = [item.strip() for item in env.split(",") if item.strip()]
+        self.responses = list(responses)
+        self.calls = 0
+
+    def transcribe(self, samples, sample_rate=SAMPLE_RATE):
+        if not self.responses:
+            return None
+        text = self.responses[self.calls % len(self.responses)]
+        self.calls += 1
+        return text
+
+
+BACKENDS = {
+    "whisper": WhisperBackend,
+    "whisper-int8": QuantizedWhisperBackend,
+    "faster-whisper": FasterWhisperBackend,
+    "keyword": KeywordBackend,
+    "google": GoogleBackend,
+    "stub": StubBackend,
+}
+
+
+def create_backend(name=None, **kwargs):
+    """Create a speech backend by name (defaults to MULTIMODAL_SPEECH_BACKEND)"""
+    name = (name or DEFAULT_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown speech backend '{name}' (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[name](**kwargs)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Streaming incremental transcription on top of a speech backend.
+
+Every step the transcriber re-decodes a sliding window of recent audio.
+Words that two consecutive hypotheses agree on are committed and will not
+change any more; the rest is reported as a partial hypothesis. Committed
+text is passed as the prompt for the next window, and audio up to the last
+committed word is dropped so the window stays short. Enable it in EVA with
+MULTIMODAL_STREAMING_ASR=1.
+"""
+
+import os
+from collections import namedtuple
+import numpy as np
+from speech_backends import SAMPLE_RATE
+
+STREAMING_ENABLED = os.environ.get("MULTIMODAL_STREAMING_ASR", "0") == "1"
+
+# committed: words committed by this step, partial: unstable tail,
+# text: whole utterance so far, final: utterance closed by silence
+StreamingUpdate = namedtuple("StreamingUpdate", ["committed", "partial", "text", "final"])
+
+
+def _normalize(word):
+    return word.lower().strip(".,!?;:\"'")
+
+
+def _join(words):
+    return " ".join(word for word, _, _ in words)
+
+
+class StreamingTranscriber:
+    """Sliding-window transcriber with local-agreement prefix commits"""
+
+    def __init__(self, backend, sample_rate=SAMPLE_RATE, step_seconds=0.5,
+                 max_window_seconds=8.0, overlap_seconds=1.0,
+                 silence_threshold=0.001, end_of_utterance_seconds=0.8,
+                 prompt_chars=200):
+        self.backend = backend
+        self.sample_rate = sample_rate
+        self.step_seconds = step_seconds
+        self.max_window_seconds = max_window_seconds
+        self.overlap_seconds = overlap_seconds
+        self.silence_threshold = silence_threshold
+        self.end_of_utterance_seconds = end_of_utterance_seconds
+        self.prompt_chars = prompt_chars
+
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.buffer_start = 0.0      # stream time (seconds) of buffer[0]
+        self.pending_samples = 0     # samples fed since the last decode
+        self.silent_seconds = 0.0    # trailing silence
+        self.committed = []          # committed (word, start, end) of this utterance
+        self.hypothesis = []         # uncommitted tail of the last decode
+        self.history = ""            # text of finished utterances, used as prompt
+
+    def feed(self, samples):
+        """Append new audio samples to the window"""
+        samples = np.asarray(samples, dtype=np.float32)
+        if samples.size == 0:
+            return
+        self.buffer = np.concatenate([self.buffer, samples])
+        self.pending_samples += samples.size
+        if np.mean(samples ** 2) < self.silence_threshold:
+            self.silent_seconds += samples.size / self.sample_rate
+        else:
+            self.silent_seconds = 0.0
+
+    def step(self):
+        """Decode the current window, return a StreamingUpdate or None"""
+        if self.pending_samples < self.step_seconds * self.sample_rate:
+            return None
+        self.pending_samples = 0
+
+        in_utterance = bool(self.committed or self.hypothesis)
+        if in_utterance and self.silent_seconds >= self.end_of_utterance_seconds:
+            return self.finalize()
+        if not in_utterance and np.mean(self.buffer ** 2) < self.silence_threshold:
+            # Nothing said yet: keep only a little audio so word onsets survive
+            self._trim_to(self._buffer_end() - self.overlap_seconds)
+            return None
+
+        words = self.backend.transcribe_words(self.buffer, self.sample_rate, prompt=self._prompt())
+        words = [(word, start + self.buffer_start, end + self.buffer_start) for word, start, end in words]
+
+        agreed = 0
+        limit = min(len(words), len(self.hypothesis))
+        while agreed < limit and _normalize(words[agreed][0]) == _normalize(self.hypothesis[agreed][0]):
+            agreed += 1
+        new_words = words[:agreed]
+        self.hypothesis = words[agreed:]
+
+        if not new_words and self._buffer_end() - self.buffer_start > self.max_window_seconds:
+            # No agreement for a whole window: force out everything but the overlap
+            cutoff = self._buffer_end() - self.overlap_seconds
+            new_words = [w for w in self.hypothesis if w[2] <= cutoff]
+            self.hypothesis = self.hypothesis[len(new_words):]
+
+        if new_words:
+            self.committed.extend(new_words)
+            self._trim_to(new_words[-1][2])
+        elif not words:
+            # Noise or music with no words in it: don't let the window grow forever
+            if self._buffer_end() - self.buffer_start > self.max_window_seconds:
+                self._trim_to(self._buffer_end() - self.overlap_seconds)
+            return None
+        if self._buffer_end() - self.buffer_start > self.max_window_seconds:
+            # Hypotheses that never settle (or one word running past the cutoff) must
+            # not make every later step decode an ever longer window
+            self._trim_to(self._buffer_end() - self.max_window_seconds)
+
+        return StreamingUpdate(
+            committed=_join(new_words),
+            partial=_join(self.hypothesis),
+            text=_join(self.committed + self.hypothesis),
+            final=False
+        )
+
+    def finalize(self):
+        """Commit whatever is left and close the current utterance"""
+        remaining = self.hypothesis
+        text = _join(self.committed + remaining)
+        self.history = f"{self.history} {text}".strip()[-self.prompt_chars:]
+        self.committed = []
+        self.hypothesis = []
+        self._trim_to(self._buffer_end() - self.overlap_seconds)
+        if not text:
+            return None
+        return StreamingUpdate(committed=_join(remaining), partial="", text=text, final=True)
+
+    def _prompt(self):
+        prompt = f"{self.history} {_join(self.committed)}".strip()
+        return prompt[-self.prompt_chars:]
+
+    def _buffer_end(self):
+        return self.buffer_start + self.buffer.size / self.sample_rate
+
+    def _trim_to(self, stream_time):
+        cut = int(round((stream_time - self.buffer_start) * self.sample_rate))
+        if cut <= 0:
+            return
+        cut = min(cut, self.buffer.size)
+        self.buffer = self.buffer[cut:]
+        self.buffer_start += cut / self.sample_rate
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test script for offline batch analysis.
+Uses generated WAV files and the stub speech backend in real worker processes.
+"""
+
+import os
+import json
+import wave
+import tempfile
+import numpy as np
+from batch_analysis import find_recordings, plan_units, run_batch
+from sources import read_wav
+
+
+def write_wav(path, seconds, seed=1):
+    noise = np.random.default_rng(seed).uniform(-0.5, 0.5, int(16000 * seconds))
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes((noise * 32767).astype("<i2").tobytes())
+    return noise
+
+
+def read_events(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_wav_ranges():
+    """read_wav can read just a slice of a recording"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "a.wav")
+        write_wav(path, 3)
+        whole = read_wav(path)
+        part = read_wav(path, start=1.0, end=2.5)
+        assert part.size == 24000 and np.array_equal(part, whole[16000:40000])
+        assert read_wav(path, start=5.0).size == 0
+    print("✅ WAV ranges - OK")
+
+
+def test_recordings_are_found_and_chunked():
+    """Directories are searched and recordings split into whole-segment chunks"""
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "day1"))
+        write_wav(os.path.join(tmp, "day1", "mic.wav"), 5)
+        with open(os.path.join(tmp, "day1", "notes.txt"), "w") as f:
+            f.write("not a recording")
+        recordings = find_recordings([tmp])
+        assert recordings == [(os.path.join(tmp, "day1", "mic.wav"), "audio")], recordings
+
+        units = plan_units(recordings, 3, ["speech"], root=tmp)
+        assert [(u.source, u.start, u.end) for u in units] == [
+            (os.path.join("day1", "mic.wav"), 0.0, 2.0), (os.path.join("day1", "mic.wav"), 2.0, 4.0),
+            (os.path.join("day1", "mic.wav"), 4.0, 5.0),
+        ]
+        assert len({u.id for u in units}) == 3
+        assert plan_units(recordings, 3, ["gesture", "objects"]) == [], "audio planned for vision modalities"
+        assert len(plan_units(recordings, 0, ["speech"])) == 1
+    print("✅ Recordings found and chunked - OK")
+
+
+def test_batch_run_merges_and_resumes():
+    """Chunks run in a process pool, merge in order, and are not redone on a second run"""
+    os.environ["MULTIMODAL_STUB_TRANSCRIPTS"] = "volume up"
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            recordings = os.path.join(tmp, "recordings")
+            os.makedirs(recordings)
+            write_wav(os.path.join(recordings, "a.wav"), 5, seed=1)
+            write_wav(os.path.join(recordings, "b.wav"), 3, seed=2)
+            output = os.path.join(tmp, "out")
+            options = dict(modalities=["speech"], workers=2, chunk_seconds=2, speech_backend="stub")
+
+            report = run_batch([recordings], output, **options)
+            assert (report.units, report.done, report.skipped, report.failed) == (5, 5, 0, 0), report
+            events = read_events(report.output)
+            assert [(e["source"], e["t"]) for e in events] == [
+                ("a.wav", 0.0), ("a.wav", 2.0), ("a.wav", 4.0), ("b.wav", 0.0), ("b.wav", 2.0),
+            ], events
+            assert all(e["type"] == "transcript" and e["text"] == "volume up" for e in events)
+            with open(os.path.join(output, "manifest.json"), encoding="utf-8") as f:
+                used = json.load(f)["settings"]["detector"]
+            assert used and used != "adaptive", "manifest does not name a fixed detector"
+
+            # Lose one chunk, as if the run had been interrupted
+            parts = os.path.join(output, "parts")
+            os.remove(os.path.join(parts, sorted(os.listdir(parts))[0]))
+            report = run_batch([recordings], output, **options)
+            assert (report.done, report.skipped) == (1, 4), report
+            assert read_events(report.output) == events
+
+            try:
+                run_batch([recordings], output, **dict(options, chunk_seconds=4))
+            except ValueError:
+                pass
+            else:
+                raise AssertionError("different settings reused the old progress")
+            report = run_batch([recordings], output, restart=True, **dict(options, chunk_seconds=4))
+            assert (report.units, report.skipped) == (3, 0), report
+
+            # Batched recognition gives the same events
+            report = run_batch([recordings], os.path.join(tmp, "batched"), **dict(options, batch_size=2))
+            assert read_events(report.output) == events
+    finally:
+        del os.environ["MULTIMODAL_STUB_TRANSCRIPTS"]
+    print("✅ Batch run merges and resumes - OK")
+
+
+def test_failed_chunks_are_retried():
+    """A chunk that fails is reported and left for the next run"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "a.wav")
+        write_wav(path, 2)
+        output = os.path.join(tmp, "out")
+        report = run_batch([path], output, modalities=["speech"], workers=1, speech_backend="no-such-backend")
+        assert (report.failed, report.events) == (1, 0), report
+        assert not [name for name in os.listdir(os.path.join(output, "parts")) if name.endswith(".jsonl")]
+    print("✅ Failed chunks are retried - OK")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Batch Analysis Test Suite")
+    print("=" * 40)
+    tests = [
+        test_wav_ranges, test_recordings_are_found_and_chunked, test_batch_run_merges_and_resumes,
+        test_failed_chunks_are_retried,
+    ]
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test_func.__name__} - FAILED: {e}")
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    main()
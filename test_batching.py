@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Test script for micro-batching and the batched pipeline (throughput mode).
+Batch functions are plain Python; the pipeline uses the stub speech backend.
+"""
+
+import io
+import json
+import time
+import asyncio
+import numpy as np
+from batching import MicroBatcher, BATCH_SIZES
+from pipeline import HeadlessPipeline, JsonlSink
+from detectors import ObjectDetector
+
+
+class RecordingBatchFn:
+    """Doubles its inputs and remembers the batches it was given"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.batches = []
+
+    def __call__(self, items):
+        self.batches.append(list(items))
+        time.sleep(self.delay)
+        return [item * 2 for item in items]
+
+
+def test_concurrent_requests_share_a_batch():
+    """Requests that arrive together run as one call and get their own results"""
+    fn = RecordingBatchFn()
+    batcher = MicroBatcher(fn, max_batch=8, max_wait=0.02, name="test")
+
+    async def scenario():
+        return await asyncio.gather(*(batcher(i) for i in range(5)))
+
+    assert asyncio.run(scenario()) == [0, 2, 4, 6, 8]
+    assert fn.batches == [[0, 1, 2, 3, 4]], fn.batches
+    assert BATCH_SIZES.get(model="test")[0] == 1
+    print("✅ Concurrent requests share a batch - OK")
+
+
+def test_batches_are_capped_and_form_while_busy():
+    """No batch exceeds max_batch; requests arriving during a batch form the next one"""
+    fn = RecordingBatchFn(delay=0.05)
+    batcher = MicroBatcher(fn, max_batch=4, max_wait=0.01)
+
+    async def scenario():
+        first = [asyncio.ensure_future(batcher(i)) for i in range(6)]
+        await asyncio.sleep(0.02)
+        later = [asyncio.ensure_future(batcher(i)) for i in range(6, 9)]
+        return await asyncio.gather(*first, *later)
+
+    assert asyncio.run(scenario()) == [i * 2 for i in range(9)]
+    assert all(len(batch) <= 4 for batch in fn.batches), fn.batches
+    assert fn.batches[0] == [0, 1, 2, 3] and sorted(sum(fn.batches, [])) == list(range(9))
+    assert len(fn.batches) == 3, fn.batches
+    print("✅ Batches capped and formed while busy - OK")
+
+
+def test_lone_request_waits_at_most_max_wait():
+    """A single request runs on its own once the wait window has passed"""
+    fn = RecordingBatchFn()
+    batcher = MicroBatcher(fn, max_batch=8, max_wait=0.01)
+
+    async def scenario():
+        started = time.perf_counter()
+        result = await batcher(21)
+        return result, time.perf_counter() - started
+
+    result, elapsed = asyncio.run(scenario())
+    assert result == 42 and fn.batches == [[21]] and elapsed < 0.5
+    print("✅ Lone request - OK")
+
+
+def test_batch_errors_reach_every_caller():
+    """A failing batch call raises in each waiting request"""
+
+    def broken(items):
+        raise RuntimeError("model crashed")
+
+    batcher = MicroBatcher(broken, max_batch=2, max_wait=0.01)
+
+    async def scenario():
+        return await asyncio.gather(batcher(1), batcher(2), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results), results
+    print("✅ Batch errors - OK")
+
+
+def test_cancelled_batch_releases_callers():
+    """A batch run that is cancelled cancels its callers instead of leaving them hanging"""
+
+    async def cancelled_run(batch_fn, items, trace=None):
+        raise asyncio.CancelledError()
+
+    batcher = MicroBatcher(RecordingBatchFn(), max_batch=2, max_wait=0.01, run=cancelled_run)
+
+    async def scenario():
+        callers = asyncio.gather(batcher(1), batcher(2), return_exceptions=True)
+        return await asyncio.wait_for(callers, 1.0)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, asyncio.CancelledError) for result in results), results
+    assert not batcher.busy
+    print("✅ Cancelled batch - OK")
+
+
+class BatchCountingDetector(ObjectDetector):
+    """Sees a person in every frame and counts batch calls"""
+
+    name = "counting"
+
+    def __init__(self):
+        self.batches = []
+
+    def detect(self, frame):
+        return [{'name': "person", 'confidence': 0.9, 'bbox': [0, 0, 1, 1]}]
+
+    def detect_batch(self, frames):
+        self.batches.append(len(frames))
+        time.sleep(0.01)
+        return [self.detect(frame) for frame in frames]
+
+
+def test_pipeline_batches_detection_in_frame_order():
+    """Throughput mode batches frames and still reports presence in frame order"""
+    stream = io.StringIO()
+    pipeline = HeadlessPipeline(sinks=[JsonlSink(stream)], speech_backend="stub", detector="onnx",
+                                modalities=["objects"], batch_size=4)
+    pipeline.detector = detector = BatchCountingDetector()
+    frame = np.zeros((4, 4, 3), dtype=np.uint8)
+
+    async def scenario():
+        tasks = []
+        for i in range(8):
+            previous = tasks[-1] if tasks else None
+            tasks.append(asyncio.create_task(pipeline.process_objects(detector, frame, float(i), None, previous)))
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [(e["type"], e["event"], e["t"]) for e in events] == [("object", "appeared", 2.0)], events
+    assert max(detector.batches) > 1 and sum(detector.batches) == 8, detector.batches
+    print("✅ Pipeline batches detection - OK")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Batching Test Suite")
+    print("=" * 40)
+    tests = [
+        test_concurrent_requests_share_a_batch, test_batches_are_capped_and_form_while_busy,
+        test_lone_request_waits_at_most_max_wait, test_batch_errors_reach_every_caller,
+        test_cancelled_batch_releases_callers,
+        test_pipeline_batches_detection_in_frame_order,
+    ]
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test_func.__name__} - FAILED: {e}")
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    main()
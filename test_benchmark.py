@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script for the benchmark suite (metrics, stages, result comparison).
+Runs the pure NumPy stages in-process with a handful of iterations.
+"""
+
+from benchmark import (
+    BenchmarkOptions, DEFAULT_OPTIONS, run_stage, run_benchmarks, compare, summarize, format_results,
+)
+
+QUICK = DEFAULT_OPTIONS._replace(iterations=20, warmup=2)
+
+
+def test_summarize_percentiles():
+    """Latencies are reported in ms and items per second over the wall time"""
+    result = summarize([i / 1000 for i in range(1, 101)], items=100, wall=2.0, cpu=0.5)
+    assert result["fps"] == 50.0 and result["cpu_ms_per_item"] == 5.0
+    assert abs(result["p50_ms"] - 50.5) < 1e-6 and abs(result["p99_ms"] - 99.01) < 1e-6
+    assert result["p50_ms"] < result["p95_ms"] < result["p99_ms"]
+    assert result["peak_rss_mb"] > 0
+    print("✅ Metric summary - OK")
+
+
+def test_numpy_stages_run():
+    """Stages that need only NumPy produce the full set of metrics"""
+    for name in ("gesture", "letterbox", "yolo_decode", "audio_segment"):
+        result = run_stage(name, QUICK)
+        assert result["items"] == 20 and result["fps"] > 0, (name, result)
+        assert set(result) >= {"p50_ms", "p95_ms", "p99_ms", "cpu_ms_per_item", "peak_rss_mb"}
+    print("✅ NumPy stages - OK")
+
+
+def test_pipeline_stage_counts_inference_calls():
+    """The end-to-end stage replays synthetic audio through the stub recognizer"""
+    result = run_stage("pipeline", QUICK._replace(warmup=0, speech_backend="stub"))
+    assert result["items"] == 9, result    # 3 replays x 3 segments of the 6 s clip
+    print("✅ Pipeline stage - OK")
+
+
+def test_missing_dependencies_are_skipped():
+    """Stages that cannot run here are reported as skipped, not failed"""
+    results = run_benchmarks(["gesture", "detector"], QUICK._replace(detector="onnx"), isolate=False)
+    detector = results["stages"]["detector"]
+    if "skipped" in detector:
+        assert any("skipped" in line for line in format_results(results))
+    assert "fps" in results["stages"]["gesture"]
+    print("✅ Skipped stages - OK")
+
+
+def test_compare_flags_regressions():
+    """Slower stages beyond the tolerance are flagged, noise below it is not"""
+    def doc(fps, p95):
+        return {"stages": {"yolo_decode": {
+            "fps": fps, "p50_ms": 2.0, "p95_ms": p95, "p99_ms": 4.0, "cpu_ms_per_item": 2.0, "peak_rss_mb": 50.0,
+        }, "detector": {"skipped": "no onnxruntime"}}}
+
+    rows = {(stage, metric): regressed for stage, metric, _, _, _, regressed in
+            compare(doc(500.0, 3.0), doc(400.0, 3.2), tolerance=0.1)}
+    assert rows[("yolo_decode", "fps")] and not rows[("yolo_decode", "p95_ms")]
+    assert not any(stage == "detector" for stage, _ in rows)
+
+    tiny = {"stages": {"gesture": {"fps": 1e5, "p50_ms": 0.003, "p95_ms": 0.004, "p99_ms": 0.005,
+                                   "cpu_ms_per_item": 0.004, "peak_rss_mb": 40.0}}}
+    noisy = {"stages": {"gesture": dict(tiny["stages"]["gesture"], p99_ms=0.009)}}
+    assert not any(row[5] for row in compare(tiny, noisy, tolerance=0.1))
+    print("✅ Result comparison - OK")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Benchmark Suite Test Suite")
+    print("=" * 40)
+    tests = [
+        test_summarize_percentiles, test_numpy_stages_run, test_pipeline_stage_counts_inference_calls,
+        test_missing_dependencies_are_skipped, test_compare_flags_regressions,
+    ]
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test_func.__name__} - FAILED: {e}")
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    main()
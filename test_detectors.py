@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Test script for the object detector backends and the latency ladder.
+The ONNX path runs against a fake session with a hand-made YOLOv8 output,
+so neither onnxruntime nor a model file is needed.
+"""
+
+import io
+import os
+import sys
+import time
+import types
+import contextlib
+import tempfile
+import numpy as np
+import detectors
+from detectors import (
+    OnnxDetector, AdaptiveDetector, LatencyLadder, ObjectDetector,
+    create_detector, fixed_detector_name, export_onnx, letterbox, non_max_suppression, COCO_NAMES,
+)
+
+
+class FakeSession:
+    """Stands in for onnxruntime.InferenceSession"""
+
+    def __init__(self, output, shape=None):
+        self.output = output
+        self.shape = shape
+        self.inputs = []
+
+    def get_inputs(self):
+        return [type("Input", (), {"name": "images", "shape": self.shape})]
+
+    def run(self, outputs, feeds):
+        self.inputs.append(feeds["images"])
+        # The same detections for every image in the batch
+        return [np.repeat(self.output, len(feeds["images"]), axis=0)]
+
+
+def yolo_output(boxes, num_classes=80, anchors=50):
+    """Build a (1, 4 + classes, anchors) tensor from (cx, cy, w, h, class, score) rows"""
+    output = np.zeros((1, 4 + num_classes, anchors), dtype=np.float32)
+    for i, (cx, cy, w, h, class_id, score) in enumerate(boxes):
+        output[0, :4, i] = [cx, cy, w, h]
+        output[0, 4 + class_id, i] = score
+    return output
+
+
+def test_letterbox_geometry():
+    """A 480x640 frame is scaled to 480x640 inside a 640 square, padded top and bottom"""
+    frame = np.full((480, 640, 3), 200, dtype=np.uint8)
+    image, scale, (left, top) = letterbox(frame, 640)
+    assert image.shape == (640, 640, 3) and scale == 1.0 and (left, top) == (0, 80)
+    assert image[0, 0, 0] == 114 and image[320, 320, 0] == 200
+    print("✅ Letterbox geometry - OK")
+
+
+def test_nms_keeps_best_box():
+    """Overlapping boxes collapse to the highest-scoring one"""
+    boxes = np.array([[0, 0, 100, 100], [5, 5, 105, 105], [200, 200, 300, 300]], dtype=np.float32)
+    scores = np.array([0.6, 0.9, 0.7], dtype=np.float32)
+    assert sorted(non_max_suppression(boxes, scores, 0.45).tolist()) == [1, 2]
+    print("✅ Non-max suppression - OK")
+
+
+def test_onnx_detections_match_app_format():
+    """ONNX output decodes to the same dicts the ultralytics path produces"""
+    output = yolo_output([
+        (320, 320, 100, 200, 0, 0.92),      # person in the middle of the frame
+        (322, 318, 104, 196, 0, 0.80),      # duplicate of the same person
+        (100, 150, 40, 40, 56, 0.70),       # chair, near the top
+        (500, 400, 50, 50, 41, 0.30),       # cup below the threshold
+    ])
+    session = FakeSession(output)
+    detector = OnnxDetector(session=session)
+    detections = detector.detect(np.zeros((480, 640, 3), dtype=np.uint8))
+    assert session.inputs[0].shape == (1, 3, 640, 640) and session.inputs[0].dtype == np.float32
+    assert [d['name'] for d in detections] == ["person", "chair"]
+    person = detections[0]
+    assert abs(person['confidence'] - 0.92) < 1e-6
+    assert person['bbox'] == [270, 140, 370, 340]      # y shifted back by the 80 px padding
+    assert detections[1]['bbox'] == [80, 50, 120, 90]
+    print("✅ ONNX detections - OK")
+
+
+def test_onnx_batch_matches_single_frames():
+    """A dynamic-batch model runs several frames in one call with per-frame results"""
+    output = yolo_output([(320, 320, 100, 200, 0, 0.92), (100, 150, 40, 40, 56, 0.70)])
+    frames = [np.zeros((480, 640, 3), dtype=np.uint8), np.zeros((240, 320, 3), dtype=np.uint8)]
+    single = OnnxDetector(session=FakeSession(output))
+    expected = [single.detect(frame) for frame in frames]
+
+    session = FakeSession(output, shape=["batch", 3, 640, 640])
+    batched = OnnxDetector(session=session)
+    assert batched.detect_batch(frames) == expected
+    assert [batch.shape[0] for batch in session.inputs] == [2], "frames were not run as one batch"
+
+    fixed = FakeSession(output, shape=[1, 3, 640, 640])
+    assert OnnxDetector(session=fixed).detect_batch(frames) == expected
+    assert [batch.shape[0] for batch in fixed.inputs] == [1, 1]
+    print("✅ ONNX batches - OK")
+
+
+def test_create_detector():
+    """Detectors are picked by name; unknown names are rejected"""
+    assert create_detector("onnx-int8").int8
+    assert create_detector("onnx").names == COCO_NAMES
+    try:
+        create_detector("nope")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown detector should raise")
+    # Repeatable runs never get the adaptive ladder
+    assert fixed_detector_name("adaptive") == detectors.LADDER_BACKEND
+    assert fixed_detector_name("onnx-int8") == "onnx-int8"
+    print("✅ Detector factory - OK")
+
+
+class FakeYOLO:
+    """Exports like ultralytics: a .onnx file next to the weights"""
+
+    def __init__(self, weights):
+        self.weights = weights
+
+    def export(self, format, imgsz, **kwargs):
+        path = os.path.splitext(self.weights)[0] + ".onnx"
+        with open(path, "w") as f:
+            f.write(str(imgsz))
+        return path
+
+
+def test_export_keeps_other_sizes():
+    """Exporting a 320 px model leaves an existing 640 px export alone"""
+    saved = sys.modules.get("ultralytics")
+    sys.modules["ultralytics"] = types.SimpleNamespace(YOLO=FakeYOLO)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            weights = os.path.join(tmp, "yolov8n.pt")
+            open(weights, "w").close()
+            assert export_onnx(weights, 640) == os.path.join(tmp, "yolov8n.onnx")
+            small = export_onnx(weights, 320, target=os.path.join(tmp, "yolov8n-320.onnx"))
+            sizes = {}
+            for name in ("yolov8n.onnx", "yolov8n-320.onnx"):
+                with open(os.path.join(tmp, name)) as f:
+                    sizes[name] = f.read()
+            assert sizes == {"yolov8n.onnx": "640", "yolov8n-320.onnx": "320"}, sizes
+            assert small.endswith("yolov8n-320.onnx")
+            assert sorted(os.listdir(tmp)) == ["yolov8n-320.onnx", "yolov8n.onnx", "yolov8n.pt"]
+    finally:
+        if saved is None:
+            del sys.modules["ultralytics"]
+        else:
+            sys.modules["ultralytics"] = saved
+    print("✅ Export keeps other sizes - OK")
+
+
+class SleepyDetector(ObjectDetector):
+    """Takes longer on bigger inputs, like a real model would"""
+
+    name = "sleepy"
+
+    def __init__(self, weights="yolov8n.pt", input_size=640):
+        self.input_size = input_size
+
+    def detect(self, frame):
+        time.sleep(self.input_size / 640 * 0.004)
+        return [{'name': "person", 'confidence': 0.9, 'bbox': [0, 0, 1, 1]}]
+
+
+def test_ladder_steps_down_and_up():
+    """Sustained over-budget steps down; sustained headroom steps back up"""
+    ladder = LatencyLadder(["s@640", "n@640", "n@320"], budget=0.1, start=1, down_frames=3, up_frames=5)
+    assert [ladder.observe(0.15, now=0) for _ in range(3)] == [None, None, 2]
+    ladder.switch(2, now=1)
+    assert [ladder.observe(0.03, now=2) for _ in range(5)][-1] == 1
+    ladder.switch(1, now=3)
+    assert ladder.observe(0.08, now=4) is None        # inside the band: stay put
+    print("✅ Ladder steps - OK")
+
+
+def test_ladder_backs_off_after_failed_probe():
+    """A step up that has to be undone quickly blocks the next step up for a while"""
+    ladder = LatencyLadder(["n@640", "n@320"], budget=0.1, start=1, down_frames=1, up_frames=1,
+                           probe_seconds=10, backoff_seconds=30)
+    assert ladder.observe(0.01, now=0) == 0
+    ladder.switch(0, now=0)
+    assert ladder.observe(0.2, now=2) == 1
+    ladder.switch(1, now=2)
+    assert ladder.observe(0.01, now=5) is None         # blocked until t=32
+    assert ladder.observe(0.01, now=33) == 0
+    assert ladder.backoff_seconds == 60
+    print("✅ Ladder backoff - OK")
+
+
+def test_adaptive_detector_switches_without_restart():
+    """The adaptive detector moves to a lighter variant and keeps detecting"""
+    detectors.DETECTORS["sleepy"] = SleepyDetector
+    try:
+        detector = AdaptiveDetector(backend="sleepy", ladder=[("yolov8n.pt", 640), ("yolov8n.pt", 160)],
+                                    budget_ms=2, start=0)
+        detector.ladder.down_frames = 2
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        for _ in range(50):
+            assert detector.detect(frame)[0]['name'] == "person"
+            if detector.ladder.index == 1:
+                break
+            time.sleep(0.01)
+        assert detector.ladder.index == 1 and detector.current.input_size == 160
+        assert detector.status().startswith("yolov8n@160")
+    finally:
+        del detectors.DETECTORS["sleepy"]
+    print("✅ Adaptive detector - OK")
+
+
+class LocalOnlyDetector(SleepyDetector):
+    """Has yolov8n on disk but not yolov8s"""
+
+    def __init__(self, weights="yolov8n.pt", input_size=640):
+        super().__init__(weights, input_size)
+        self.weights = weights
+
+    def available(self):
+        return self.weights != "yolov8s.pt"
+
+
+def test_ladder_skips_missing_weights():
+    """Rungs without local weights are never proposed, and stdout stays clean"""
+    detectors.DETECTORS["local-only"] = LocalOnlyDetector
+    try:
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            detector = AdaptiveDetector(backend="local-only", ladder=[("yolov8s.pt", 640), ("yolov8n.pt", 640)],
+                                        start=1)
+        assert detector.ladder.disabled == {0}
+        assert stdout.getvalue() == "", "ladder diagnostics on stdout would break the JSONL stream"
+        for _ in range(100):
+            assert detector.ladder.observe(0.0001) is None
+    finally:
+        del detectors.DETECTORS["local-only"]
+    print("✅ Ladder skips missing weights - OK")
+
+
+class NothingLocalDetector(SleepyDetector):
+    """First launch: no weights on disk yet"""
+
+    def available(self):
+        return False
+
+
+def test_ladder_keeps_rungs_on_start_weights():
+    """Lighter sizes of the start model stay usable before its weights are downloaded"""
+    detectors.DETECTORS["nothing-local"] = NothingLocalDetector
+    try:
+        detector = AdaptiveDetector(backend="nothing-local", budget_ms=1, start=1, log=lambda message: None,
+                                    ladder=[("yolov8s.pt", 640), ("yolov8n.pt", 640), ("yolov8n.pt", 320)])
+        assert detector.ladder.disabled == {0}, detector.ladder.disabled
+        target = None
+        for _ in range(detector.ladder.down_frames):
+            target = detector.ladder.observe(0.5)
+        assert target == 2, "the ladder cannot step down"
+    finally:
+        del detectors.DETECTORS["nothing-local"]
+    print("✅ Ladder keeps rungs on start weights - OK")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Object Detector Test Suite")
+    print("=" * 40)
+    tests = [
+        test_letterbox_geometry, test_nms_keeps_best_box,
+        test_onnx_detections_match_app_format, test_onnx_batch_matches_single_frames, test_create_detector,
+        test_export_keeps_other_sizes,
+        test_ladder_steps_down_and_up, test_ladder_backs_off_after_failed_probe,
+        test_adaptive_detector_switches_without_restart, test_ladder_skips_missing_weights,
+        test_ladder_keeps_rungs_on_start_weights,
+    ]
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test_func.__name__} - FAILED: {e}")
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test script for the buffered event recorder.
+Writes into temporary directories; the clock is faked for time rotation.
+"""
+
+import os
+import json
+import time
+import tempfile
+import threading
+from event_recorder import EventRecorder, open_recorder, EVENTS_DROPPED
+from pipeline import create_sink, RecorderSink
+
+
+def read_events(paths):
+    events = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            events.extend(json.loads(line) for line in f)
+    return events
+
+
+def test_events_written_in_order():
+    """Events from record() and write() land as JSON lines, in order"""
+    with tempfile.TemporaryDirectory() as tmp:
+        recorder = EventRecorder(tmp, batch_size=4, flush_interval=0.05)
+        for i in range(10):
+            recorder.record("gesture", gesture="VOLUME_UP", index=i)
+        recorder.write({"t": 1.0, "type": "transcript", "text": "volume up"})
+        recorder.close()
+        events = read_events(recorder.files)
+        assert [event.get("index") for event in events[:10]] == list(range(10))
+        assert events[0]["type"] == "gesture" and "t" in events[0]
+        assert events[-1] == {"t": 1.0, "type": "transcript", "text": "volume up"}
+        assert not recorder.record("gesture", gesture="late"), "closed recorder accepted an event"
+    print("✅ Events written in order - OK")
+
+
+def test_rotation_by_size():
+    """A file that reaches max_bytes is closed and the next batch starts a new one"""
+    with tempfile.TemporaryDirectory() as tmp:
+        recorder = EventRecorder(tmp, max_bytes=200, batch_size=1, flush_interval=0.01, fsync="never")
+        for i in range(20):
+            recorder.record("object", event="appeared", name="person", count=i)
+            time.sleep(0.002)
+        recorder.close()
+        assert len(recorder.files) > 1, recorder.files
+        assert sorted(os.listdir(tmp)) == sorted(os.path.basename(path) for path in recorder.files)
+        assert [event["count"] for event in read_events(recorder.files)] == list(range(20))
+    print("✅ Rotation by size - OK")
+
+
+def test_rotation_by_time():
+    """Files older than max_age are rotated, even while nothing is being written"""
+    now = [1000.0]
+    with tempfile.TemporaryDirectory() as tmp:
+        recorder = EventRecorder(tmp, max_age=60, flush_interval=0.01, clock=lambda: now[0])
+        recorder.record("gesture", gesture="a")
+        deadline = time.monotonic() + 2
+        while not recorder.files and time.monotonic() < deadline:
+            time.sleep(0.01)
+        now[0] += 61
+        while recorder.file is not None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert recorder.file is None, "idle file was not closed at max_age"
+        now[0] += 1
+        recorder.record("gesture", gesture="b")
+        recorder.close()
+        assert len(recorder.files) == 2, recorder.files
+        assert [event["gesture"] for event in read_events(recorder.files)] == ["a", "b"]
+    print("✅ Rotation by time - OK")
+
+
+def test_full_queue_drops_instead_of_blocking():
+    """With the writer stalled, record() returns at once and counts the drop"""
+
+    class StalledRecorder(EventRecorder):
+        release = threading.Event()
+
+        def _write_batch(self, batch):
+            self.release.wait()
+            super()._write_batch(batch)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        recorder = StalledRecorder(tmp, queue_size=2, batch_size=1, flush_interval=0.01)
+        dropped_before = EVENTS_DROPPED.get()
+        started = time.perf_counter()
+        accepted = [recorder.record("gesture", gesture=str(i)) for i in range(50)]
+        elapsed = time.perf_counter() - started
+        recorder.release.set()
+        recorder.close()
+        assert elapsed < 0.5, f"record() blocked for {elapsed:.3f} s"
+        assert accepted.count(False) == recorder.dropped > 0
+        assert EVENTS_DROPPED.get() - dropped_before == recorder.dropped
+        assert len(read_events(recorder.files)) == accepted.count(True)
+    print("✅ Full queue drops instead of blocking - OK")
+
+
+def test_fsync_policy_and_env():
+    """Unknown fsync policies are rejected; no directory means no recorder"""
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            EventRecorder(tmp, fsync="sometimes")
+            raise AssertionError("unknown fsync policy accepted")
+        except ValueError:
+            pass
+    assert open_recorder(None) is None or os.environ.get("MULTIMODAL_EVENT_DIR")
+    print("✅ fsync policy and env - OK")
+
+
+def test_pipeline_record_sink():
+    """--sink record:DIR hands pipeline events to a recorder"""
+    with tempfile.TemporaryDirectory() as tmp:
+        sink = create_sink(f"record:{tmp}")
+        assert isinstance(sink, RecorderSink)
+        sink.write({"t": 1.0, "type": "command", "command": "mute", "result": "🔇 Muted"})
+        sink.close()
+        assert read_events(sink.recorder.files)[0]["command"] == "mute"
+    print("✅ Pipeline record sink - OK")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Event Recorder Test Suite")
+    print("=" * 40)
+    tests = [
+        test_events_written_in_order, test_rotation_by_size, test_rotation_by_time,
+        test_full_queue_drops_instead_of_blocking, test_fsync_policy_and_env, test_pipeline_record_sink,
+    ]
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test_func.__name__} - FAILED: {e}")
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    main()
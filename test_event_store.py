@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test script for the time-indexed event store.
+All timestamps are given explicitly; no models or devices are needed.
+"""
+
+import time
+import random
+from event_store import EventStore, TimeSeries, StoredEvent
+
+
+def test_range_and_nearest():
+    """Range queries merge kinds in time order; nearest picks the closest event"""
+    store = EventStore()
+    store.add("gesture", t=1.0, gesture="VOLUME_UP")
+    store.add("object", t=2.0, event="appeared", name="cup", count=1)
+    store.add("transcript", t=3.0, text="what is that")
+    store.add("gesture", t=4.5, gesture="SCREENSHOT")
+    assert [event.kind for event in store.range(1.5, 4.5)] == ["object", "transcript", "gesture"]
+    assert [event.t for event in store.range(0, 10, kinds=["gesture"])] == [1.0, 4.5]
+    assert store.range(5, 6) == [] and store.range(0, 10, kinds=["missing"]) == []
+    assert store.nearest(3.9, kinds=["gesture"]).fields["gesture"] == "SCREENSHOT"
+    assert store.nearest(2.4).kind == "object"
+    assert store.nearest(10.0, max_gap=1.0) is None
+    assert store.latest("gesture").t == 4.5 and store.latest("missing") is None
+    print("✅ Range and nearest - OK")
+
+
+def test_out_of_order_events_are_sorted():
+    """Late events (slow detections) are inserted at their own time"""
+    series = TimeSeries(capacity=100, max_age=None)
+    times = [float(t) for t in range(50)]
+    shuffled = times[:]
+    random.Random(3).shuffle(shuffled)
+    for t in shuffled:
+        series.add(StoredEvent(t, "gesture", {}))
+    assert [event.t for event in series.range(0, 100)] == times
+    assert series.before(10.5).t == 10.0 and series.before(-1) is None
+    print("✅ Out-of-order events - OK")
+
+
+def test_ring_is_bounded_by_count_and_age():
+    """Each kind keeps at most capacity events and none older than max_age"""
+    store = EventStore(capacity=10, max_age=None)
+    for i in range(1000):
+        store.add("gesture", t=float(i))
+    store.add("object", t=0.0, event="appeared", name="cup", count=1)
+    gestures = store.range(0, 1000, kinds=["gesture"])
+    assert [event.t for event in gestures] == [float(t) for t in range(990, 1000)]
+    assert len(store.series["gesture"].times) <= 15, "evicted entries were never cut off"
+    assert store.latest("object") is not None, "a busy kind pushed out another kind"
+
+    store = EventStore(capacity=1000, max_age=5.0)
+    for i in range(20):
+        store.add("transcript", t=float(i), text=str(i))
+    assert [event.t for event in store.range(0, 100)] == [14.0, 15.0, 16.0, 17.0, 18.0, 19.0]
+    print("✅ Bounded ring - OK")
+
+
+def test_visible_objects():
+    """Objects present going into a window, or appearing in it, are visible"""
+    store = EventStore()
+    store.add("object", t=1.0, event="appeared", name="lamp", count=1)
+    store.add("object", t=2.0, event="appeared", name="cup", count=1)
+    store.add("object", t=5.0, event="left", name="cup", count=0)
+    store.add("object", t=7.0, event="appeared", name="person", count=1)
+    assert store.visible_objects(0.0) == []
+    assert store.visible_objects(3.0, 4.0) == ["cup", "lamp"]
+    assert store.visible_objects(6.0, 8.0) == ["lamp", "person"]
+    assert store.visible_objects(4.0, 6.0) == ["cup", "lamp"]
+    print("✅ Visible objects - OK")
+
+
+def test_pipeline_style_events_and_query_speed():
+    """Dict events are accepted, and a fusion query on a full store stays fast"""
+    store = EventStore(capacity=4096)
+    store.add_event({"t": 1.0, "type": "transcript", "text": "volume up"})
+    assert store.latest("transcript").fields == {"text": "volume up"}
+
+    for i in range(4096):
+        store.add("gesture", t=i * 0.01, gesture="VOLUME_UP")
+        store.add("object", t=i * 0.01, event="count_changed", name=f"class{i % 20}", count=1 + i % 3)
+    started = time.perf_counter()
+    for i in range(200):
+        t = i * 0.2
+        store.range(t, t + 2.0, kinds=["gesture"])
+        store.nearest(t, kinds=["gesture"])
+        store.visible_objects(t, t + 2.0)
+    per_query = (time.perf_counter() - started) / 200
+    assert per_query < 0.005, f"{per_query * 1000:.2f} ms per fusion query"
+    print(f"✅ Fusion query {per_query * 1e6:.0f} µs - OK")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Event Store Test Suite")
+    print("=" * 40)
+    tests = [
+        test_range_and_nearest, test_out_of_order_events_are_sorted, test_ring_is_bounded_by_count_and_age,
+        test_visible_objects, test_pipeline_style_events_and_query_speed,
+    ]
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test_func.__name__} - FAILED: {e}")
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test script for the warm inference daemon's IPC (Unix socket + shared memory).
+Camera and microphone stay closed; messages are published by hand.
+"""
+
+import os
+import time
+import asyncio
+import threading
+import tempfile
+import numpy as np
+from inference_daemon import InferenceDaemon, DaemonClient, SharedFrameRing, landmarks_from_points
+
+
+def test_frame_ring_detects_overwrites():
+    """A reader never gets a frame that was replaced during the read"""
+    ring = SharedFrameRing(slots=2, shape=(4, 4, 3), create=True)
+    try:
+        reader = SharedFrameRing(name=ring.name, slots=2, shape=(4, 4, 3))
+        frame = np.full((4, 4, 3), 7, dtype=np.uint8)
+        slot = ring.write(frame, seq=1)
+        assert reader.read(slot, 1).tolist() == frame.tolist()
+        ring.write(frame + 1, seq=3)           # same slot, newer frame
+        assert reader.read(slot, 1) is None
+        reader.close()
+    finally:
+        ring.close()
+    print("✅ Shared frame ring - OK")
+
+
+def test_landmark_wrapper():
+    """Daemon landmarks look like MediaPipe landmarks to the gesture code"""
+    hand = landmarks_from_points([[0.1, 0.2, 0.3]] * 21)
+    assert len(hand.landmark) == 21 and hand.landmark[4].y == 0.2
+    print("✅ Landmark wrapper - OK")
+
+
+async def _client_round_trip(socket_path):
+    daemon = InferenceDaemon(socket_path=socket_path, vision=False, speech=False)
+    server = asyncio.create_task(daemon.serve())
+    for _ in range(100):
+        if os.path.exists(socket_path):
+            break
+        await asyncio.sleep(0.01)
+
+    clients = [DaemonClient(socket_path), DaemonClient(socket_path)]
+    try:
+        for client in clients:
+            hello = await client.connect(topics=["frame", "transcript"])
+            assert hello["topic"] == "hello"
+        await asyncio.sleep(0.05)
+
+        frame = np.zeros(daemon.ring.shape, dtype=np.uint8)
+        slot = daemon.ring.write(frame, seq=5)
+        daemon.publish({"topic": "detections", "seq": 5, "detections": []})   # not subscribed
+        daemon.publish({"topic": "frame", "seq": 5, "slot": slot, "t": 0.0})
+        daemon.publish({"topic": "transcript", "text": "volume up", "t": 0.0})
+
+        for client in clients:
+            messages = client.messages()
+            first = await asyncio.wait_for(messages.__anext__(), 1.0)
+            assert first["topic"] == "frame", first
+            assert client.read_frame(first).shape == daemon.ring.shape
+            second = await asyncio.wait_for(messages.__anext__(), 1.0)
+            assert second == {"topic": "transcript", "text": "volume up", "t": 0.0}
+    finally:
+        for client in clients:
+            client.close()
+        server.cancel()
+        try:
+            await server
+        except asyncio.CancelledError:
+            pass
+    assert not os.path.exists(socket_path)
+
+
+def test_clients_share_one_daemon():
+    """Several clients attach to one daemon and get the topics they asked for"""
+    socket_path = os.path.join(tempfile.mkdtemp(), "daemon.sock")
+    asyncio.run(_client_round_trip(socket_path))
+    print("✅ Daemon client round trip - OK")
+
+
+async def _shutdown_with_busy_writer(socket_path, errors):
+    daemon = InferenceDaemon(socket_path=socket_path, vision=False, speech=False)
+    server = asyncio.create_task(daemon.serve())
+    for _ in range(100):
+        if os.path.exists(socket_path):
+            break
+        await asyncio.sleep(0.01)
+
+    def writer():
+        # Like vision_worker: the frame being processed is written after the stop flag is set
+        frame = np.zeros(daemon.ring.shape, dtype=np.uint8)
+        seq = 0
+        while daemon.running:
+            seq += 1
+            time.sleep(0.05)
+            try:
+                daemon.ring.write(frame, seq)
+            except Exception as e:
+                errors.append(e)
+
+    worker = threading.Thread(target=writer, daemon=True)
+    daemon.workers.append(worker)
+    worker.start()
+    await asyncio.sleep(0.02)
+    server.cancel()
+    try:
+        await server
+    except asyncio.CancelledError:
+        pass
+    assert not worker.is_alive()
+
+
+def test_shutdown_waits_for_workers():
+    """The shared memory is only released after the workers have stopped writing"""
+    errors = []
+    asyncio.run(_shutdown_with_busy_writer(os.path.join(tempfile.mkdtemp(), "daemon.sock"), errors))
+    assert errors == [], errors
+    print("✅ Shutdown waits for workers - OK")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Inference Daemon Test Suite")
+    print("=" * 40)
+    tests = [
+        test_frame_ring_detects_overwrites, test_landmark_wrapper, test_clients_share_one_daemon,
+        test_shutdown_waits_for_workers,
+    ]
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test_func.__name__} - FAILED: {e}")
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for the wake-word / keyword spotting gate.
+The stub speech backend stands in for the keyword model.
+"""
+
+import numpy as np
+from speech_backends import StubBackend
+from keyword_spotter import KeywordSpotter, AudioRingBuffer
+
+SAMPLE_RATE = 16000
+
+
+def speech(seconds):
+    return np.full(int(seconds * SAMPLE_RATE), 0.1, dtype=np.float32)
+
+
+def test_ring_buffer_wraps():
+    """Ring buffer keeps the newest samples in order"""
+    ring = AudioRingBuffer(seconds=1.0, sample_rate=10)
+    ring.write(np.arange(7, dtype=np.float32))
+    ring.write(np.arange(7, 13, dtype=np.float32))
+    assert ring.latest(1.0).tolist() == list(range(3, 13))
+    assert ring.latest(0.3).tolist() == [10, 11, 12]
+    ring.clear()
+    assert ring.latest(1.0).size == 0
+    print("✅ Ring buffer - OK")
+
+
+def test_wake_word_opens_gate():
+    """Wake word opens the ASR gate for a while"""
+    spotter = KeywordSpotter(detector=StubBackend(["hey eva"]), open_seconds=5.0)
+    assert not spotter.is_open(now=0.0)
+    hit = spotter.spot(speech(1.0), now=10.0)
+    assert hit.kind == "wake" and hit.keyword == "hey eva"
+    assert spotter.is_open(now=14.0) and not spotter.is_open(now=15.5)
+    print("✅ Wake word gate - OK")
+
+
+def test_direct_commands():
+    """Single-keyword commands bypass full ASR; the longest match wins"""
+    spotter = KeywordSpotter(detector=StubBackend(["unmute", "volume up please"]))
+    assert spotter.spot(speech(1.0), now=0.0).keyword == "unmute"
+    assert spotter.spot(speech(1.0), now=0.0).keyword == "volume up"
+    assert not spotter.is_open(now=0.0)
+    print("✅ Direct commands - OK")
+
+
+def test_silence_skips_detector():
+    """Silent windows never reach the keyword model"""
+    detector = StubBackend(["eva"])
+    spotter = KeywordSpotter(detector=detector)
+    assert spotter.spot(np.zeros(SAMPLE_RATE, dtype=np.float32)) is None
+    assert detector.calls == 0
+    print("✅ Silence skipped - OK")
+
+
+def test_poll_hops_and_clears():
+    """Polling waits for a hop of new audio and clears after a hit"""
+    spotter = KeywordSpotter(detector=StubBackend(["screenshot"]), hop_seconds=0.25)
+    ring = AudioRingBuffer(seconds=3.0)
+    ring.write(speech(0.1))
+    assert spotter.poll(ring) is None
+    ring.write(speech(0.2))
+    assert spotter.poll(ring).keyword == "screenshot"
+    assert ring.latest(3.0).size == 0
+    print("✅ Ring buffer polling - OK")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Keyword Spotter Test Suite")
+    print("=" * 40)
+    tests = [
+        test_ring_buffer_wraps, test_wake_word_opens_gate, test_direct_commands,
+        test_silence_skips_detector, test_poll_hops_and_clears,
+    ]
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test_func.__name__} - FAILED: {e}")
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test script for the metrics registry and its Prometheus endpoint.
+Uses a private registry and a server on a free local port.
+"""
+
+import asyncio
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from metrics import (
+    MetricsRegistry, RateMeter, INFERENCE_SECONDS, ASR_REAL_TIME_FACTOR,
+    timed_transcribe, start_metrics_server,
+)
+from scheduler import PriorityScheduler
+
+
+def test_counters_and_gauges_render():
+    """Counters and gauges render as Prometheus text with escaped labels"""
+    registry = MetricsRegistry()
+    dropped = registry.counter("frames_dropped_total", "Dropped frames", ["stage"])
+    depth = registry.gauge("queue_depth", "Queue depth", ["queue"])
+    dropped.inc(stage="objects")
+    dropped.inc(2, stage="objects")
+    depth.set(3, queue='say "hi"')
+    depth.dec(queue='say "hi"')
+    text = registry.render()
+    assert "# TYPE frames_dropped_total counter" in text
+    assert 'frames_dropped_total{stage="objects"} 3' in text
+    assert 'queue_depth{queue="say \\"hi\\""} 2' in text
+    for bad in (lambda: dropped.inc(-1, stage="objects"), lambda: dropped.inc(queue="x")):
+        try:
+            bad()
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("invalid update should be rejected")
+    print("✅ Counters and gauges - OK")
+
+
+def test_histogram_buckets_and_quantiles():
+    """Histograms are cumulative per bucket and estimate quantiles from bucket bounds"""
+    registry = MetricsRegistry()
+    latency = registry.histogram("inference_seconds", "Inference time", ["modality"], buckets=(0.01, 0.1, 1.0))
+    for value in (0.005, 0.05, 0.05, 0.5, 5.0):
+        latency.observe(value, modality="object")
+    text = registry.render()
+    assert 'inference_seconds_bucket{modality="object",le="0.01"} 1' in text
+    assert 'inference_seconds_bucket{modality="object",le="0.1"} 3' in text
+    assert 'inference_seconds_bucket{modality="object",le="+Inf"} 5' in text
+    assert 'inference_seconds_count{modality="object"} 5' in text
+    count, total = latency.get(modality="object")
+    assert count == 5 and abs(total - 5.605) < 1e-9
+    assert latency.quantile(0.5, modality="object") == 0.1
+    assert latency.quantile(0.99, modality="object") == float("inf")
+    assert latency.quantile(0.5, modality="gesture") is None
+    assert any(line.startswith("inference_seconds object: n=5") for line in registry.summary())
+    print("✅ Histograms - OK")
+
+
+def test_registry_reuses_and_checks_types():
+    """Registering a name again returns the same metric unless the type differs"""
+    registry = MetricsRegistry()
+    assert registry.counter("events_total", "Events") is registry.counter("events_total", "Events")
+    try:
+        registry.gauge("events_total", "Events")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("type clash should be rejected")
+    print("✅ Registry - OK")
+
+
+def test_rate_meter():
+    """The FPS gauge is recomputed once per window"""
+    registry = MetricsRegistry()
+    fps = registry.gauge("capture_fps", "Capture rate")
+    meter = RateMeter(fps, window=1.0)
+    for i in range(31):
+        meter.tick(now=i / 30)
+    assert abs(fps.get() - 31) < 1e-9
+    print("✅ Rate meter - OK")
+
+
+def test_pipeline_metrics_are_recorded():
+    """Scheduled inference and transcription land in the shared registry"""
+    before = INFERENCE_SECONDS.get(modality="gesture")[0]
+    scheduler = PriorityScheduler()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        asyncio.run(scheduler.run("gesture", executor, sum, [1, 2]))
+    assert INFERENCE_SECONDS.get(modality="gesture")[0] == before + 1
+
+    count = ASR_REAL_TIME_FACTOR.get()[0]
+    assert timed_transcribe(lambda samples, rate: f"hello at {rate}", [0.0] * 8000, 8000) == "hello at 8000"
+    assert ASR_REAL_TIME_FACTOR.get()[0] == count + 1
+    print("✅ Pipeline metrics - OK")
+
+
+def test_http_endpoint():
+    """/metrics serves the registry as Prometheus text"""
+    server = start_metrics_server(port=0, host="127.0.0.1")
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            body = response.read().decode()
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert "# TYPE multimodal_inference_seconds histogram" in body
+        assert "multimodal_capture_fps" in body
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{server.server_port}/other", timeout=5)
+        except urllib.error.HTTPError as e:
+            assert e.code == 404
+        else:
+            raise AssertionError("unknown paths should 404")
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("✅ HTTP endpoint - OK")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Metrics Test Suite")
+    print("=" * 40)
+    tests = [
+        test_counters_and_gauges_render, test_histogram_buckets_and_quantiles, test_registry_reuses_and_checks_types,
+        test_rate_meter, test_pipeline_metrics_are_recorded, test_http_endpoint,
+    ]
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test_func.__name__} - FAILED: {e}")
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test script for lazy, parallel model loading and the startup report.
+Uses sleeping factories instead of real models.
+"""
+
+import time
+from model_loader import ModelLoader
+
+
+def slow_model(name, seconds, calls):
+    def factory():
+        calls.append(name)
+        time.sleep(seconds)
+        return f"{name}-model"
+    return factory
+
+
+def test_models_load_lazily():
+    """Nothing loads until a modality asks for it"""
+    calls = []
+    loader = ModelLoader()
+    loader.register("yolo", slow_model("yolo", 0.01, calls))
+    time.sleep(0.05)
+    assert calls == [] and loader.progress() == (0, 0)
+    assert loader.get("yolo") == "yolo-model"
+    assert loader.get("yolo") == "yolo-model" and calls == ["yolo"]
+    print("✅ Lazy loading - OK")
+
+
+def test_models_load_in_parallel():
+    """Requested models load concurrently in the background"""
+    calls = []
+    loader = ModelLoader(max_workers=3)
+    for name in ("hands", "yolo", "speech"):
+        loader.register(name, slow_model(name, 0.2, calls))
+    start = time.perf_counter()
+    loader.request_all()
+    assert loader.get_if_ready("yolo") is None
+    for name in ("hands", "yolo", "speech"):
+        loader.get(name)
+    elapsed = time.perf_counter() - start
+    assert elapsed < 0.45, f"loads took {elapsed:.2f} s"
+    assert loader.progress() == (3, 3)
+    assert loader.status_text().startswith("Models ready")
+    assert any("load   yolo" in line for line in loader.report())
+    print(f"✅ Parallel loading - OK ({elapsed:.2f} s for 3 x 0.2 s)")
+
+
+def test_failed_load_is_reported():
+    """A failing loader surfaces its error without blocking the others"""
+    loader = ModelLoader()
+    loader.register("broken", lambda: 1 / 0)
+    loader.register("fine", lambda: "ok")
+    loader.request_all()
+    assert loader.get("fine") == "ok"
+    try:
+        loader.get("broken")
+    except ZeroDivisionError:
+        pass
+    else:
+        raise AssertionError("loader error should propagate")
+    assert not loader.is_ready("broken")
+    assert "broken" in loader.status_text()
+    print("✅ Load errors - OK")
+
+
+def test_warmup_runs_before_ready():
+    """A model is only ready once its warm-up pass has finished"""
+    warmed = []
+    loader = ModelLoader()
+    loader.register("yolo", lambda: "yolo-model", warmup=lambda model: (time.sleep(0.1), warmed.append(model)))
+    loader.request("yolo")
+    time.sleep(0.03)
+    assert loader.phase("yolo") == "warming up" and not loader.is_ready("yolo")
+    assert loader.status_text().startswith("Warming up models")
+    assert loader.get("yolo") == "yolo-model" and warmed == ["yolo-model"]
+    assert loader.phase("yolo") == "ready"
+    assert loader.warmup_timings["yolo"] >= 0.1
+    assert any("warmup yolo" in line for line in loader.report())
+    print("✅ Warm-up before ready - OK")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Model Loader Test Suite")
+    print("=" * 40)
+    tests = [
+        test_models_load_lazily, test_models_load_in_parallel,
+        test_failed_load_is_reported, test_warmup_runs_before_ready,
+    ]
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test_func.__name__} - FAILED: {e}")
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Test script for the headless pipeline (sinks, rate limits, event flow).
+Uses the stub speech backend and a fake detector; no camera, microphone or Tk.
+"""
+
+import io
+import os
+import json
+import wave
+import asyncio
+import argparse
+import tempfile
+import numpy as np
+from pipeline import HeadlessPipeline, JsonlSink, RateLimiter, create_sink, parse_modalities
+from gestures import analyze_gesture
+from inference_daemon import landmarks_from_points
+
+
+class FakeDetector:
+    def __init__(self, names):
+        self.names = names
+
+    def detect(self, frame):
+        return [{'name': name, 'confidence': 0.9, 'bbox': [0, 0, 1, 1]} for name in self.names]
+
+
+def make_pipeline(**kwargs):
+    stream = io.StringIO()
+    pipeline = HeadlessPipeline(sinks=[JsonlSink(stream)], speech_backend="stub", detector="onnx", **kwargs)
+    return pipeline, stream
+
+
+def events(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_sinks_and_cli_parsing():
+    """Sinks come from CLI specs; unknown specs and modalities are rejected"""
+    assert isinstance(create_sink("stdout"), JsonlSink)
+    for bad in ("tcp:1234", "file:"):
+        try:
+            create_sink(bad)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"{bad} should be rejected")
+    assert parse_modalities("gesture, objects") == ["gesture", "objects"]
+    try:
+        parse_modalities("gesture,smell")
+    except argparse.ArgumentTypeError:
+        pass
+    else:
+        raise AssertionError("unknown modality should be rejected")
+    print("✅ Sinks and CLI parsing - OK")
+
+
+def test_rate_limiter():
+    """At most rate calls per second get through"""
+    limiter = RateLimiter(4)
+    assert [limiter.ready(now=t) for t in (0.0, 0.1, 0.2, 0.25, 0.3)] == [True, False, False, True, False]
+    assert all(RateLimiter(0).ready(now=t) for t in (0.0, 0.0, 0.0))
+    print("✅ Rate limiter - OK")
+
+
+def test_object_events_are_emitted_as_jsonl():
+    """Presence events from the detector reach the sink as JSON lines"""
+    pipeline, stream = make_pipeline(modalities=["objects"])
+    detector = FakeDetector(["person"])
+
+    async def scenario():
+        for _ in range(3):
+            await pipeline.process_objects(detector, None)
+
+    asyncio.run(scenario())
+    assert [(e["type"], e["event"], e["name"]) for e in events(stream)] == [("object", "appeared", "person")]
+    print("✅ Object events - OK")
+
+
+def test_transcripts_only_act_with_actions():
+    """Transcripts are always emitted; exit stops the pipeline only with --actions"""
+    pipeline, stream = make_pipeline(modalities=["speech"])
+    assert pipeline.detector is None and pipeline.required_models() == ["speech"]
+    pipeline.running = True
+    pipeline.handle_transcript("Exit")
+    assert [e["type"] for e in events(stream)] == ["transcript"] and pipeline.running
+
+    pipeline, stream = make_pipeline(modalities=["speech"], actions=True)
+    pipeline.running = True
+    pipeline.handle_transcript("Exit")
+    assert [(e["type"], e.get("result")) for e in events(stream)] == [("transcript", None), ("command", "exit")]
+    assert not pipeline.running
+    print("✅ Transcript actions - OK")
+
+
+def test_transcripts_list_visible_objects():
+    """A transcript names the objects present while it was spoken"""
+    pipeline, stream = make_pipeline(modalities=["speech", "objects"])
+
+    async def scenario():
+        for t in (10.0, 10.1, 10.2):
+            await pipeline.process_objects(FakeDetector(["lamp"]), None, timestamp=t)
+        for t in (12.0, 13.0):
+            await pipeline.process_objects(FakeDetector([]), None, timestamp=t)
+
+    asyncio.run(scenario())
+    pipeline.handle_transcript("turn that on", timestamp=11.0)
+    pipeline.handle_transcript("and off", timestamp=14.0)
+    transcripts = [(e["text"], e["objects"]) for e in events(stream) if e["type"] == "transcript"]
+    assert transcripts == [("turn that on", ["lamp"]), ("and off", [])], transcripts
+    print("✅ Transcripts list visible objects - OK")
+
+
+def test_audio_replay_gives_repeatable_events():
+    """Replaying a WAV at speed 0 emits the same transcripts with recording timestamps"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "speech.wav")
+        noise = np.random.default_rng(1).uniform(-0.5, 0.5, 16000 * 5)
+        with wave.open(path, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(16000)
+            wav.writeframes((noise * 32767).astype("<i2").tobytes())
+
+        def replay(batch_size=1):
+            pipeline, stream = make_pipeline(modalities=["speech"], audio_source=path, speed=0, start_time=0.0,
+                                             batch_size=batch_size)
+            pipeline.speech_backend.responses = ["volume up", "exit"]
+            asyncio.run(pipeline.run())
+            return [(e["t"], e["text"]) for e in events(stream) if e["type"] == "transcript"]
+
+        first, second, batched = replay(), replay(), replay(batch_size=4)
+    assert first == [(0.0, "volume up"), (2.0, "exit"), (4.0, "volume up")], first
+    assert second == first
+    assert batched == first, batched
+    print("✅ Audio replay - OK")
+
+
+def test_shared_gesture_classifier():
+    """The GUI and the pipeline share the gesture classifier"""
+    points = [[0.5, 0.5, 0.0] for _ in range(21)]
+    for tip in (8, 12, 16, 20):
+        points[tip][1] = 0.2
+    assert analyze_gesture(landmarks_from_points(points)) == "MOUSE_CONTROL"
+    assert analyze_gesture(landmarks_from_points(points[:3])) is None
+    print("✅ Gesture classifier - OK")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Headless Pipeline Test Suite")
+    print("=" * 40)
+    tests = [
+        test_sinks_and_cli_parsing, test_rate_limiter, test_object_events_are_emitted_as_jsonl,
+        test_transcripts_only_act_with_actions, test_transcripts_list_visible_objects,
+        test_audio_replay_gives_repeatable_events,
+        test_shared_gesture_classifier,
+    ]
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test_func.__name__} - FAILED: {e}")
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for object presence events (appeared / left / count_changed).
+Runs on synthetic detections, no camera or YOLO model needed.
+"""
+
+from presence import PresenceTracker
+
+
+def frames(tracker, detections, count, start=0.0, fps=10):
+    events = []
+    for i in range(count):
+        events.extend(tracker.update(detections, now=start + i / fps))
+    return events
+
+
+def test_appeared_after_hysteresis():
+    """A class must be seen for enter_frames before it appears"""
+    tracker = PresenceTracker(enter_frames=3)
+    assert frames(tracker, ["person"], 2) == []
+    events = tracker.update(["person"], now=0.3)
+    assert [(e.kind, e.name, e.count) for e in events] == [("appeared", "person", 1)]
+    assert frames(tracker, ["person"], 20, start=0.4) == []
+    print("✅ Appeared with hysteresis - OK")
+
+
+def test_flicker_does_not_leave():
+    """Short dropouts do not produce left events"""
+    tracker = PresenceTracker(enter_frames=1, leave_seconds=1.0)
+    tracker.update(["chair"], now=0.0)
+    assert frames(tracker, [], 5, start=0.1) == []
+    assert tracker.update(["chair"], now=0.6) == []
+    events = frames(tracker, [], 12, start=0.7)
+    assert [(e.kind, e.previous) for e in events] == [("left", 1)]
+    assert tracker.present() == {}
+    print("✅ Leave after timeout - OK")
+
+
+def test_count_changed():
+    """Count changes are reported once the new count is stable"""
+    tracker = PresenceTracker(enter_frames=1, count_frames=3)
+    tracker.update(["person"], now=0.0)
+    assert tracker.update(["person", "person"], now=0.1) == []
+    assert tracker.update(["person"], now=0.2) == []      # flicker resets the streak
+    frames(tracker, ["person", "person"], 2, start=0.3)
+    events = tracker.update([{'name': "person"}, {'name': "person"}], now=0.5)
+    assert [(e.kind, e.count, e.previous) for e in events] == [("count_changed", 2, 1)]
+    assert tracker.present() == {"person": 2}
+    print("✅ Count changed - OK")
+
+
+def test_single_frame_noise_is_ignored():
+    """A one-frame false positive never appears and leaves no state"""
+    tracker = PresenceTracker(enter_frames=3)
+    tracker.update(["cat"], now=0.0)
+    assert frames(tracker, [], 30, start=0.1) == []
+    assert tracker.state == {}
+    print("✅ Noise ignored - OK")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Presence Tracker Test Suite")
+    print("=" * 40)
+    tests = [
+        test_appeared_after_hysteresis, test_flicker_does_not_leave,
+        test_count_changed, test_single_frame_noise_is_ignored,
+    ]
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test_func.__name__} - FAILED: {e}")
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    main()
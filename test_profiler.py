@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test script for the sampling profiler (stack collapsing, windows, toggling).
+Profiles a busy worker thread for a fraction of a second.
+"""
+
+import os
+import sys
+import time
+import signal
+import tempfile
+import threading
+from profiler import SamplingProfiler, collapse_stack, toggle, install_profile_signal
+
+
+def spin_until(event):
+    while not event.is_set():
+        sum(range(1000))
+
+
+def busy_thread():
+    event = threading.Event()
+    thread = threading.Thread(target=spin_until, args=(event,), name="gesture_0", daemon=True)
+    thread.start()
+    return event, thread
+
+
+def test_collapse_stack_is_root_first():
+    """Collapsed stacks start with the thread name and end with the innermost function"""
+    def inner():
+        return collapse_stack("Main;Thread", sys._getframe())
+
+    stack = inner().split(";")
+    assert stack[0] == "Main:Thread"
+    assert stack[-1].startswith("inner (test_profiler.py:")
+    assert stack[-2].startswith("test_collapse_stack_is_root_first (test_profiler.py:")
+    print("✅ Stack collapsing - OK")
+
+
+def test_window_samples_all_threads_and_writes():
+    """A timed window samples other threads and writes collapsed stacks when it ends"""
+    event, thread = busy_thread()
+    done = []
+    profiler = SamplingProfiler(interval=0.002, on_done=done.append)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "profile.collapsed")
+        try:
+            assert profiler.start(duration=0.2, path=path)
+            assert not profiler.start(duration=0.2)    # one window at a time
+            profiler.thread.join(timeout=5)
+        finally:
+            event.set()
+            thread.join()
+        assert done == [path] and not profiler.running
+        with open(path) as f:
+            lines = f.read().splitlines()
+    assert profiler.samples >= 10
+    spinning = [line for line in lines if line.startswith("gesture_0;") and "spin_until" in line]
+    assert spinning, lines[:5]
+    stack, count = spinning[0].rsplit(" ", 1)
+    assert int(count) > 0 and not any(line.startswith("profiler;") for line in lines)
+    assert any("spin_until" in label for label, _ in profiler.top(5))
+    print("✅ Sampling window - OK")
+
+
+def test_toggle_stops_an_open_window():
+    """toggle() starts an open-ended window and the next toggle ends it"""
+    done = threading.Event()
+    profiler = SamplingProfiler(interval=0.002, on_done=lambda path: done.set())
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "open.collapsed")
+        assert profiler.start(duration=None, path=path)
+        time.sleep(0.05)
+        assert profiler.running
+        assert toggle(profiler) is False
+        assert done.wait(5) and os.path.exists(path)
+    print("✅ Toggle - OK")
+
+
+def test_signal_toggles_profiling():
+    """SIGUSR1 starts a window and a second SIGUSR1 writes it"""
+    if not hasattr(signal, "SIGUSR1"):
+        print("⏭️ SIGUSR1 not available - skipped")
+        return
+    import profiler as profiler_module
+    messages = []
+    previous = signal.getsignal(signal.SIGUSR1)
+    original_dir = profiler_module.PROFILE_DIR
+    profiler = SamplingProfiler(interval=0.002)
+    with tempfile.TemporaryDirectory() as tmp:
+        profiler_module.PROFILE_DIR = tmp
+        try:
+            assert install_profile_signal(profiler, on_done=messages.append, duration=30)
+            os.kill(os.getpid(), signal.SIGUSR1)
+            time.sleep(0.05)
+            assert profiler.running
+            os.kill(os.getpid(), signal.SIGUSR1)
+            profiler.thread.join(timeout=5)
+            assert [name for name in os.listdir(tmp) if name.endswith(".collapsed")]
+            assert messages[0].startswith("🔬 Profiling") and messages[-1].startswith("🔬 Profile:")
+        finally:
+            profiler_module.PROFILE_DIR = original_dir
+            signal.signal(signal.SIGUSR1, previous)
+    print("✅ Signal toggle - OK")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Sampling Profiler Test Suite")
+    print("=" * 40)
+    tests = [
+        test_collapse_stack_is_root_first, test_window_samples_all_threads_and_writes,
+        test_toggle_stops_an_open_window, test_signal_toggles_profiling,
+    ]
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test_func.__name__} - FAILED: {e}")
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    main()
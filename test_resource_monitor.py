@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test script for the resource monitor's degradation levels.
+Uses synthetic samples, so psutil sensors are not needed.
+"""
+
+from resource_monitor import ResourceMonitor, ResourceSample, pressure, describe, LEVELS
+
+
+def sample(cpu=20.0, memory=40.0, temperature=50.0, battery=None, plugged=None):
+    return ResourceSample(cpu, memory, temperature, battery, plugged)
+
+
+def test_pressure_levels():
+    """Each metric maps to the level its thresholds call for"""
+    assert pressure(sample())[0] == 0
+    assert pressure(sample(cpu=95))[0] == 1
+    assert pressure(sample(temperature=90))[0] == 2
+    assert pressure(sample(memory=95)) == (3, ["memory 95"])
+    assert pressure(sample(battery=8, plugged=False))[0] == 2
+    assert pressure(sample(battery=8, plugged=True))[0] == 0
+    assert pressure(sample(temperature=None))[0] == 0
+    print("✅ Pressure levels - OK")
+
+
+def test_escalates_after_sustained_pressure():
+    """A single hot sample is ignored; sustained heat steps the level up"""
+    changes = []
+    monitor = ResourceMonitor(escalate_samples=2, on_change=changes.append)
+    assert monitor.update(sample(temperature=90)) is None
+    assert monitor.update(sample()) is None
+    assert monitor.update(sample(temperature=90)) is None
+    change = monitor.update(sample(temperature=90))
+    assert change.level.name == "minimal" and monitor.level.object_interval == 2.0
+    assert changes == [change]
+    assert "normal → minimal" in describe(change)
+    print("✅ Escalation - OK")
+
+
+def test_recovers_one_level_at_a_time():
+    """Recovery waits for headroom below the thresholds and steps down gradually"""
+    monitor = ResourceMonitor(escalate_samples=1, recover_samples=3, margin=5.0)
+    monitor.update(sample(memory=95))
+    assert monitor.level.name == "paused" and not monitor.level.objects
+    for _ in range(5):
+        monitor.update(sample(memory=90))            # below 93 but inside the margin
+    assert monitor.level.name == "paused"
+    for _ in range(3):
+        monitor.update(sample(memory=60))
+    assert monitor.level.name == "minimal"
+    for _ in range(6):
+        monitor.update(sample(memory=60))
+    assert monitor.level == LEVELS[0]
+    assert [change.level.name for _, change in monitor.history] == ["paused", "minimal", "reduced", "normal"]
+    print("✅ Gradual recovery - OK")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Resource Monitor Test Suite")
+    print("=" * 40)
+    tests = [test_pressure_levels, test_escalates_after_sustained_pressure, test_recovers_one_level_at_a_time]
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test_func.__name__} - FAILED: {e}")
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    main()
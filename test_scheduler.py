@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test script for the priority-aware modality scheduler.
+Sleeping jobs stand in for model inference.
+"""
+
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from scheduler import PriorityScheduler, ModalityPolicy, INTERACTIVE
+
+
+def test_interactive_runs_before_queued_background():
+    """Queued object frames never delay a speech command"""
+    async def scenario():
+        scheduler = PriorityScheduler(slots=1, background_slots=1)
+        executor = ThreadPoolExecutor(max_workers=4)
+        order = []
+
+        async def job(modality, label, seconds):
+            await scheduler.run(modality, executor, time.sleep, seconds)
+            order.append(label)
+
+        tasks = [asyncio.create_task(job("object", f"object{i}", 0.05)) for i in range(3)]
+        await asyncio.sleep(0.01)                 # object0 holds the slot, 1 and 2 queue
+        tasks.append(asyncio.create_task(job("speech", "speech", 0.01)))
+        await asyncio.gather(*tasks)
+        executor.shutdown()
+        return order, scheduler
+
+    order, scheduler = asyncio.run(scenario())
+    assert order == ["object0", "speech", "object1", "object2"], order
+    assert scheduler.stats["speech"].runs == 1
+    print("✅ Interactive pre-empts background - OK")
+
+
+def test_background_slot_limit():
+    """Object detection holds at most background_slots even when slots are free"""
+    async def scenario():
+        scheduler = PriorityScheduler(slots=3, background_slots=1)
+        executor = ThreadPoolExecutor(max_workers=4)
+        peak = 0
+
+        async def job():
+            nonlocal peak
+            await scheduler.acquire("object")
+            peak = max(peak, scheduler.running_background)
+            await asyncio.sleep(0.02)
+            scheduler._release(scheduler.policy("object").priority)
+
+        await asyncio.gather(*(job() for _ in range(4)))
+        executor.shutdown()
+        return peak, scheduler
+
+    peak, scheduler = asyncio.run(scenario())
+    assert peak == 1 and scheduler.running == 0
+    print("✅ Background slot limit - OK")
+
+
+def test_deadline_misses_are_counted():
+    """Interactive work that takes longer than its deadline is counted"""
+    async def scenario():
+        scheduler = PriorityScheduler(policies={"gesture": ModalityPolicy(INTERACTIVE, 0.01, 0.0)})
+        executor = ThreadPoolExecutor(max_workers=1)
+        await scheduler.run("gesture", executor, time.sleep, 0.03)
+        await scheduler.run("gesture", executor, time.sleep, 0.0)
+        executor.shutdown()
+        return scheduler
+
+    scheduler = asyncio.run(scenario())
+    assert scheduler.stats["gesture"].runs == 2
+    assert scheduler.stats["gesture"].deadline_misses == 1
+    assert any("gesture" in line for line in scheduler.report())
+    print("✅ Deadline misses - OK")
+
+
+def test_display_is_throttled_while_busy():
+    """Display refresh slows down while interactive work is in flight"""
+    scheduler = PriorityScheduler(busy_stretch=4.0)
+    assert scheduler.due("display", now=0.0)
+    assert scheduler.due("display", now=0.04)
+    scheduler.running_interactive = 1
+    assert not scheduler.due("display", now=0.08)
+    assert scheduler.due("display", now=0.18)
+    assert scheduler.stats["display"].skipped == 1
+    print("✅ Display throttling - OK")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Scheduler Test Suite")
+    print("=" * 40)
+    tests = [
+        test_interactive_runs_before_queued_background, test_background_slot_limit,
+        test_deadline_misses_are_counted, test_display_is_throttled_while_busy,
+    ]
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test_func.__name__} - FAILED: {e}")
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for the replay input sources (WAV reading, pacing, timestamps).
+Writes small WAV files with the wave module; no camera or microphone needed.
+"""
+
+import os
+import time
+import wave
+import tempfile
+import numpy as np
+from sources import (
+    ReplayClock, ImageDirSource, WavFileSource, read_wav, open_video_source, open_audio_source, is_camera,
+)
+
+
+def write_wav(path, samples, rate=16000, channels=1):
+    data = (np.clip(samples, -1, 1) * 32767).astype("<i2")
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(data.tobytes())
+
+
+def test_read_wav_mixes_down_and_resamples():
+    """Stereo 8 kHz input comes back as mono float32 at 16 kHz"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "stereo.wav")
+        left, right = np.full(8000, 0.5), np.full(8000, -0.25)
+        write_wav(path, np.stack([left, right], axis=1).ravel(), rate=8000, channels=2)
+        samples = read_wav(path)
+    assert samples.dtype == np.float32 and samples.shape == (16000,)
+    assert abs(float(samples.mean()) - 0.125) < 1e-3
+    print("✅ WAV mixdown and resampling - OK")
+
+
+def test_wav_replay_is_deterministic():
+    """At speed 0 a replay delivers the same blocks and timestamps every run"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "clip.wav")
+        write_wav(path, np.random.default_rng(0).uniform(-0.5, 0.5, 16000 * 2 + 800))
+
+        def replay():
+            blocks = []
+            source = WavFileSource(path, speed=0, start_time=100.0)
+            with source.stream(lambda samples, timestamp: blocks.append((timestamp, samples))):
+                assert source.done.wait(5.0)
+            assert source.finished
+            return blocks
+
+        first, second = replay(), replay()
+    assert [t for t, _ in first] == [t for t, _ in second]
+    assert all(np.array_equal(a, b) for (_, a), (_, b) in zip(first, second))
+    assert len(first) == 21 and first[0][0] == 100.0 and abs(first[-1][0] - 102.0) < 1e-9
+    assert sum(block.size for _, block in first) == 16000 * 2 + 800
+    print("✅ Deterministic WAV replay - OK")
+
+
+def test_replay_clock_paces_by_media_time():
+    """Speed 1 waits for media time, speed 0 never sleeps"""
+    clock = ReplayClock(speed=10.0, start_time=50.0)
+    started = time.monotonic()
+    clock.wait(0.0)
+    clock.wait(0.5)
+    assert time.monotonic() - started >= 0.045
+    assert clock.timestamp(0.5) == 50.5
+
+    clock = ReplayClock(speed=0, start_time=0.0)
+    started = time.monotonic()
+    clock.wait(0.0)
+    clock.wait(1000.0)
+    assert time.monotonic() - started < 0.1
+    print("✅ Replay clock - OK")
+
+
+def test_source_specs():
+    """Empty image directories finish at once; unknown specs are rejected"""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = open_video_source(tmp)
+        assert isinstance(source, ImageDirSource) and source.finished and not source.isOpened()
+        assert source.read() == (False, None)
+        missing = os.path.join(tmp, "missing.mp4")
+        for opener in (open_video_source, open_audio_source):
+            try:
+                opener(missing)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError(f"{opener.__name__} should reject {missing}")
+    assert open_audio_source("mic").live
+    assert is_camera("0") and is_camera(1) and not is_camera("clip.mp4")
+    print("✅ Source specs - OK")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Replay Sources Test Suite")
+    print("=" * 40)
+    tests = [
+        test_read_wav_mixes_down_and_resamples, test_wav_replay_is_deterministic,
+        test_replay_clock_paces_by_media_time, test_source_specs,
+    ]
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test_func.__name__} - FAILED: {e}")
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test script for streaming incremental transcription.
+A scripted backend stands in for Whisper, so no model or microphone is needed.
+"""
+
+import numpy as np
+from speech_backends import SpeechBackend
+from streaming_asr import StreamingTranscriber
+
+SAMPLE_RATE = 16000
+
+
+class ScriptedBackend(SpeechBackend):
+    """Hears one word per 0.5 s of audio from a fixed sentence"""
+
+    def __init__(self, sentence):
+        self.sentence = sentence.split()
+        self.heard = 0          # words already trimmed away from the window
+        self.prompts = []
+
+    def transcribe_words(self, samples, sample_rate=SAMPLE_RATE, prompt=None):
+        self.prompts.append(prompt)
+        count = int(len(samples) / sample_rate / 0.5)
+        words = self.sentence[self.heard:self.heard + count]
+        return [(word, i * 0.5, (i + 1) * 0.5) for i, word in enumerate(words)]
+
+
+def speech(seconds):
+    return np.full(int(seconds * SAMPLE_RATE), 0.1, dtype=np.float32)
+
+
+def silence(seconds):
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+def test_prefix_commit_and_prompt_reuse():
+    """Agreed words are committed, the rest stays partial"""
+    backend = ScriptedBackend("please turn the volume up")
+    streamer = StreamingTranscriber(backend)
+
+    streamer.feed(speech(0.5))
+    first = streamer.step()
+    assert first.committed == "" and first.partial == "please"
+
+    streamer.feed(speech(0.5))
+    second = streamer.step()
+    assert second.committed == "please", second
+    assert second.partial == "turn"
+    assert streamer.buffer_start == 0.5     # committed audio is dropped
+
+    backend.heard = 1
+    streamer.feed(speech(0.5))
+    third = streamer.step()
+    assert third.text.startswith("please turn")
+    assert backend.prompts[-1] == "please"
+    print("✅ Prefix commit and prompt reuse - OK")
+
+
+def test_silence_finalizes_utterance():
+    """Trailing silence closes the utterance with a final update"""
+    backend = ScriptedBackend("volume up")
+    streamer = StreamingTranscriber(backend)
+    streamer.feed(speech(1.0))
+    streamer.step()
+    streamer.feed(silence(1.0))
+    update = streamer.step()
+    assert update.final and update.text == "volume up", update
+    assert streamer.history == "volume up"
+    assert streamer.step() is None
+    print("✅ End of utterance - OK")
+
+
+def test_idle_audio_is_not_decoded():
+    """Silence before any speech never reaches the backend"""
+    backend = ScriptedBackend("hello")
+    streamer = StreamingTranscriber(backend)
+    for _ in range(10):
+        streamer.feed(silence(0.5))
+        assert streamer.step() is None
+    assert backend.prompts == []
+    assert streamer.buffer.size <= SAMPLE_RATE * streamer.overlap_seconds
+    print("✅ Idle audio skipped - OK")
+
+
+def test_wordless_noise_keeps_window_bounded():
+    """Audio the backend hears no words in is trimmed once the window is full"""
+    backend = ScriptedBackend("")
+    streamer = StreamingTranscriber(backend)
+    for _ in range(200):
+        streamer.feed(speech(0.5))
+        assert streamer.step() is None
+    assert len(backend.prompts) == 200, "noise was not decoded"
+    window = streamer.buffer.size / SAMPLE_RATE
+    assert window <= streamer.max_window_seconds + streamer.step_seconds, window
+    print("✅ Wordless noise bounded - OK")
+
+
+class RestlessBackend(SpeechBackend):
+    """Never agrees with itself: one different word spanning the whole window each time"""
+
+    def __init__(self):
+        self.calls = 0
+        self.window_seconds = []
+
+    def transcribe_words(self, samples, sample_rate=SAMPLE_RATE, prompt=None):
+        self.calls += 1
+        seconds = len(samples) / sample_rate
+        self.window_seconds.append(seconds)
+        return [(f"word{self.calls}", 0.0, seconds)]
+
+
+def test_disagreeing_hypotheses_keep_window_bounded():
+    """The decoded window stays within max_window_seconds even if nothing is ever agreed"""
+    backend = RestlessBackend()
+    streamer = StreamingTranscriber(backend)
+    for _ in range(60):
+        streamer.feed(speech(0.5))
+        streamer.step()
+    assert backend.calls == 60
+    limit = streamer.max_window_seconds + streamer.step_seconds
+    assert max(backend.window_seconds) <= limit, max(backend.window_seconds)
+    print("✅ Disagreeing hypotheses bounded - OK")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Streaming Transcription Test Suite")
+    print("=" * 40)
+    tests = [
+        test_prefix_commit_and_prompt_reuse, test_silence_finalizes_utterance, test_idle_audio_is_not_decoded,
+        test_wordless_noise_keeps_window_bounded, test_disagreeing_hypotheses_keep_window_bounded,
+    ]
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test_func.__name__} - FAILED: {e}")
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    main()
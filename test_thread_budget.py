@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test script for the thread budget (native pool limits and modality executors).
+Does not need torch or OpenCV; a fake module stands in for torch.
+"""
+
+import os
+import sys
+import types
+from thread_budget import ThreadBudget, BLAS_ENV_VARS
+
+
+def test_budget_leaves_a_core_free():
+    """Model pools share the cores left after the GUI/capture core"""
+    assert ThreadBudget(cores=8).threads("torch") == 3
+    assert ThreadBudget(cores=2).threads("onnx") == 1
+    assert ThreadBudget(cores=1).threads("torch") == 1
+    assert ThreadBudget(cores=16).threads("opencv") == 1
+    print("✅ Core split - OK")
+
+
+def test_env_does_not_override_user_settings():
+    """BLAS limits are defaults; explicit environment settings win"""
+    saved = {var: os.environ.pop(var, None) for var in BLAS_ENV_VARS}
+    try:
+        os.environ["MKL_NUM_THREADS"] = "7"
+        ThreadBudget(cores=8).apply_env()
+        assert os.environ["OMP_NUM_THREADS"] == "3"
+        assert os.environ["MKL_NUM_THREADS"] == "7"
+    finally:
+        for var, value in saved.items():
+            os.environ.pop(var, None)
+            if value is not None:
+                os.environ[var] = value
+    print("✅ Environment defaults - OK")
+
+
+def test_library_limits_applied_once():
+    """Imported libraries get their limits the first time apply_libraries runs"""
+    calls = []
+    fake_torch = types.SimpleNamespace(
+        set_num_threads=lambda n: calls.append(("intra", n)),
+        set_num_interop_threads=lambda n: calls.append(("inter", n)),
+    )
+    had_torch = "torch" in sys.modules
+    saved = sys.modules.get("torch")
+    sys.modules["torch"] = fake_torch
+    try:
+        budget = ThreadBudget(cores=5)
+        budget.apply_libraries()
+        budget.apply_libraries()
+        assert calls == [("intra", 2), ("inter", 1)]
+    finally:
+        if had_torch:
+            sys.modules["torch"] = saved
+        else:
+            del sys.modules["torch"]
+    print("✅ Library limits - OK")
+
+
+def test_modality_executors_are_sized():
+    """Each modality gets an executor of its configured size"""
+    budget = ThreadBudget(cores=4)
+    speech = budget.executor("speech")
+    try:
+        assert speech._max_workers == 2
+        assert speech.submit(lambda: 1 + 1).result() == 2
+    finally:
+        speech.shutdown()
+    print("✅ Modality executors - OK")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Thread Budget Test Suite")
+    print("=" * 40)
+    tests = [
+        test_budget_leaves_a_core_free, test_env_does_not_override_user_settings,
+        test_library_limits_applied_once, test_modality_executors_are_sized,
+    ]
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test_func.__name__} - FAILED: {e}")
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test script for trace spans and the Chrome trace export.
+Uses private tracers except where the scheduler records into the shared one.
+"""
+
+import os
+import json
+import time
+import signal
+import asyncio
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import tracing
+from tracing import Tracer, TRACER, install_dump_signal
+from scheduler import PriorityScheduler
+
+
+def test_spans_and_ring_bound():
+    """Spans are recorded per trace and the ring keeps only the newest"""
+    tracer = Tracer(capacity=3)
+    trace = tracer.new_trace("frame")
+    assert trace.startswith("frame-")
+    with tracer.span(trace, "capture"):
+        pass
+    tracer.record(trace, "inference", 1.0, 1.5, modality="gesture")
+    assert [span.name for span in tracer.spans(trace)] == ["capture", "inference"]
+    assert tracer.spans(trace)[1].args == {"modality": "gesture"}
+    for i in range(5):
+        tracer.record(tracer.new_trace("audio"), "inference", i, i + 1)
+    assert len(tracer.spans()) == 3 and not tracer.spans(trace)
+    print("✅ Spans and ring - OK")
+
+
+def test_disabled_tracer_records_nothing():
+    """With capacity 0 there are no trace IDs and spans cost nothing"""
+    tracer = Tracer(capacity=0)
+    trace = tracer.new_trace("frame")
+    with tracer.span(trace, "capture"):
+        pass
+    tracer.record("frame-1", "inference", 0.0, 1.0)
+    assert trace is None and tracer.spans() == []
+    print("✅ Disabled tracer - OK")
+
+
+def test_chrome_trace_export():
+    """Spans become complete events in microseconds, linked by flow events across threads"""
+    tracer = Tracer()
+    trace = tracer.new_trace("frame")
+    tracer.record(trace, "capture", 10.0, 10.002)
+    worker = threading.Thread(target=lambda: tracer.record(trace, "inference", 10.003, 10.013), name="gesture_0")
+    worker.start()
+    worker.join()
+    tracer.record(trace, "render", 10.020, 10.021)
+
+    events = tracer.chrome_trace()["traceEvents"]
+    complete = [e for e in events if e["ph"] == "X"]
+    assert [e["name"] for e in complete] == ["capture", "inference", "render"]
+    assert complete[0]["ts"] == 0.0 and abs(complete[1]["ts"] - 3000) < 1e-3 and abs(complete[1]["dur"] - 10000) < 1e-3
+    assert all(e["cat"] == "frame" and e["args"]["trace"] == trace for e in complete)
+    assert complete[1]["tid"] != complete[0]["tid"]
+    assert [e["ph"] for e in events if e.get("cat") == "trace"] == ["s", "t", "f"]
+    names = {e["args"]["name"] for e in events if e["ph"] == "M"}
+    assert "gesture_0" in names
+    print("✅ Chrome trace export - OK")
+
+
+def test_scheduler_records_wait_and_inference():
+    """Scheduled calls with a trace ID add queue_wait and inference spans"""
+    trace = TRACER.new_trace("frame")
+    scheduler = PriorityScheduler()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        asyncio.run(scheduler.run("gesture", executor, time.sleep, 0.01, trace=trace))
+    spans = {span.name: span for span in TRACER.spans(trace)}
+    assert set(spans) == {"queue_wait", "inference"}
+    assert spans["inference"].end - spans["inference"].start >= 0.009
+    assert spans["inference"].args == {"modality": "gesture"}
+    print("✅ Scheduler spans - OK")
+
+
+def test_dump_on_signal():
+    """SIGUSR2 writes the ring as JSON to MULTIMODAL_TRACE_DIR"""
+    if not hasattr(signal, "SIGUSR2"):
+        print("⏭️ SIGUSR2 not available - skipped")
+        return
+    tracer = Tracer()
+    tracer.record(tracer.new_trace("audio"), "inference", 0.0, 0.5)
+    messages = []
+    previous = signal.getsignal(signal.SIGUSR2)
+    original_dir = tracing.TRACE_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        tracing.TRACE_DIR = tmp
+        try:
+            assert install_dump_signal(tracer, on_dump=messages.append)
+            os.kill(os.getpid(), signal.SIGUSR2)
+            deadline = time.monotonic() + 5
+            while not messages and time.monotonic() < deadline:
+                time.sleep(0.01)
+            files = os.listdir(tmp)
+            assert len(files) == 1 and files[0].startswith("trace-"), files
+            with open(os.path.join(tmp, files[0])) as f:
+                assert any(e["ph"] == "X" for e in json.load(f)["traceEvents"])
+        finally:
+            tracing.TRACE_DIR = original_dir
+            signal.signal(signal.SIGUSR2, previous)
+    print("✅ Dump on signal - OK")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Tracing Test Suite")
+    print("=" * 40)
+    tests = [
+        test_spans_and_ring_bound, test_disabled_tracer_records_nothing, test_chrome_trace_export,
+        test_scheduler_records_wait_and_inference, test_dump_on_signal,
+    ]
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test_func.__name__} - FAILED: {e}")
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Test script for the non-blocking text-to-speech worker.
+A fake engine writes short WAV files and playback is recorded, so neither
+pyttsx3 nor a sound device is needed.
+"""
+
+import time
+import wave
+import threading
+import numpy as np
+from tts_worker import TTSWorker
+
+
+class FakeEngine:
+    """Stands in for a pyttsx3 engine; renders 0.1 s of tone per phrase"""
+
+    def __init__(self):
+        self.properties = {}
+        self.rendered = []
+        self.pending = None
+
+    def setProperty(self, name, value):
+        self.properties[name] = value
+
+    def getProperty(self, name):
+        return [] if name == "voices" else self.properties.get(name)
+
+    def save_to_file(self, text, path):
+        self.pending = (text, path)
+
+    def runAndWait(self):
+        text, path = self.pending
+        self.rendered.append(text)
+        with wave.open(path, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(16000)
+            wav.writeframes(np.full(1600, 1000, dtype="<i2").tobytes())
+
+
+class RecordingWorker(TTSWorker):
+    """Remembers what it played; with hold set, plays until interrupted"""
+
+    def __init__(self, hold=False, **kwargs):
+        self.engine_instance = FakeEngine()
+        super().__init__(engine_factory=lambda: self.engine_instance, **kwargs)
+        self.hold = hold
+        self.played = []
+        self.cut_off = 0
+        self.playing = threading.Event()
+
+    def _play(self, samples, sample_rate):
+        self.played.append(samples.shape)
+        self.playing.set()
+        if self.hold and self.interrupted.wait(2.0):
+            self.cut_off += 1
+        self.playing.clear()
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def test_repeated_phrases_are_dropped():
+    """The same text within dedup_seconds is spoken once"""
+    worker = RecordingWorker(dedup_seconds=60)
+    worker.start()
+    try:
+        assert worker.speak("Volume up")
+        assert not worker.speak("  Volume   up ")
+        assert not worker.speak("")
+        assert worker.speak("Volume down")
+        assert wait_until(lambda: len(worker.played) == 2), worker.played
+    finally:
+        worker.stop()
+    print("✅ Repeated phrases dropped - OK")
+
+
+def test_phrase_cache_is_lru():
+    """Cached phrases are not rendered again; the least recently used one is evicted"""
+    worker = RecordingWorker(dedup_seconds=0, cache_size=2)
+    worker.start()
+    try:
+        for text in ["one", "two", "one", "three", "one", "two"]:
+            worker.speak(text, interrupt=False)
+            assert wait_until(lambda: worker.queue.empty() and not worker.playing.is_set())
+            time.sleep(0.02)
+        assert wait_until(lambda: len(worker.played) == 6), worker.played
+    finally:
+        worker.stop()
+    # "two" was evicted by "three" while "one" stayed in use
+    assert worker.engine_instance.rendered == ["one", "two", "three", "two"], worker.engine_instance.rendered
+    assert list(worker.cache) == ["one", "two"]
+    print("✅ LRU phrase cache - OK")
+
+
+def test_queue_is_bounded_and_keeps_newest():
+    """A full queue gives up its oldest phrase, in either interrupt mode"""
+    for interrupt in (False, True):
+        worker = RecordingWorker(dedup_seconds=0, max_queue=2)
+        for text in ["a", "b", "c", "d"]:
+            assert worker.speak(text, interrupt=interrupt)
+        pending = []
+        while not worker.queue.empty():
+            pending.append(worker.queue.get_nowait())
+        assert pending == ["c", "d"], (interrupt, pending)
+    print("✅ Bounded queue - OK")
+
+
+def test_new_speech_cuts_off_current_phrase():
+    """Barge-in stops the phrase being played and the new one is spoken"""
+    worker = RecordingWorker(hold=True, dedup_seconds=0)
+    worker.start()
+    try:
+        worker.speak("a long explanation")
+        assert wait_until(worker.playing.is_set)
+        worker.speak("stop")
+        assert wait_until(lambda: worker.cut_off == 1), worker.cut_off
+        assert wait_until(lambda: worker.engine_instance.rendered[-1:] == ["stop"])
+    finally:
+        worker.stop()
+    print("✅ Barge-in - OK")
+
+
+def test_engine_failure_is_reported():
+    """If the engine cannot start, speak() turns text away instead of queueing it"""
+
+    def broken():
+        raise RuntimeError("no speech driver")
+
+    worker = TTSWorker(engine_factory=broken)
+    worker.start()
+    worker.thread.join(timeout=2.0)
+    assert isinstance(worker.error, RuntimeError) and not worker.running
+    assert not worker.speak("hello")
+    assert worker.queue.empty()
+    print("✅ Engine failure reported - OK")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Text-to-Speech Worker Test Suite")
+    print("=" * 40)
+    tests = [
+        test_repeated_phrases_are_dropped, test_phrase_cache_is_lru, test_queue_is_bounded_and_keeps_newest,
+        test_new_speech_cuts_off_current_phrase, test_engine_failure_is_reported,
+    ]
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test_func.__name__} - FAILED: {e}")
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Thread budget for the Multimodal AI Assistant.
+
+PyTorch, OpenCV, ONNX Runtime and the BLAS/OpenMP runtimes each size their
+thread pools to the whole machine by default, so with several models loaded
+the process ends up with many more runnable threads than cores. The budget
+splits the cores once: one is kept for Tk, the asyncio loop and capture,
+the rest is shared by the native intra-op pools, and each modality gets its
+own small executor for its blocking calls.
+
+Import this module before numpy/torch so the OpenMP/BLAS limits apply.
+Set MULTIMODAL_CPU_THREADS to override the detected core count; BLAS
+variables already set in the environment are left alone.
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+BLAS_ENV_VARS = [
+    "OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS", "VECLIB_MAXIMUM_THREADS",
+]
+
+# Blocking calls per modality: speech listens while the previous phrase is recognized
+MODALITY_WORKERS = {"gesture": 1, "vision": 1, "speech": 2}
+
+
+def physical_cores():
+    """Physical core count, falling back to logical cores"""
+    try:
+        import psutil
+        cores = psutil.cpu_count(logical=False)
+    except ImportError:
+        cores = None
+    return cores or os.cpu_count() or 1
+
+
+class ThreadBudget:
+    """Splits the machine's cores between native thread pools and modality executors"""
+
+    def __init__(self, cores=None, workers=None):
+        self.cores = cores or int(os.environ.get("MULTIMODAL_CPU_THREADS", "0")) or physical_cores()
+        self.workers = dict(workers or MODALITY_WORKERS)
+        # One core stays free for Tk, the event loop and camera/microphone capture.
+        # YOLO and Whisper usually run at the same time, so they split the rest.
+        spare = max(1, self.cores - 1)
+        model_threads = max(1, spare // 2)
+        self.limits = {
+            "blas": model_threads,
+            "torch": model_threads,
+            "onnx": model_threads,
+            "ctranslate2": model_threads,
+            "opencv": 1,
+        }
+        self.applied = set()
+
+    def threads(self, library):
+        """Intra-op thread count for a library"""
+        return self.limits[library]
+
+    def apply_env(self):
+        """Cap OpenMP/BLAS pools; only effective before those libraries load"""
+        for var in BLAS_ENV_VARS:
+            os.environ.setdefault(var, str(self.limits["blas"]))
+
+    def apply_libraries(self):
+        """Apply the limits to libraries that have been imported since the last call"""
+        if "torch" in sys.modules and "torch" not in self.applied:
+            torch = sys.modules["torch"]
+            torch.set_num_threads(self.limits["torch"])
+            try:
+                torch.set_num_interop_threads(1)
+            except RuntimeError:
+                pass    # inter-op pool already started; intra-op limit still applies
+            self.applied.add("torch")
+        if "cv2" in sys.modules and "cv2" not in self.applied:
+            sys.modules["cv2"].setNumThreads(self.limits["opencv"])
+            self.applied.add("cv2")
+
+    def executor(self, modality):
+        """A dedicated, sized executor for one modality's blocking calls"""
+        return ThreadPoolExecutor(max_workers=self.workers[modality], thread_name_prefix=modality)
+
+    def summary(self):
+        limits = ", ".join(f"{name} {count}" for name, count in self.limits.items())
+        workers = ", ".join(f"{name} {count}" for name, count in self.workers.items())
+        return f"Thread budget: {self.cores} cores; intra-op {limits}; executors {workers}"
+
+
+THREAD_BUDGET = ThreadBudget()
+THREAD_BUDGET.apply_env()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Per-frame and per-utterance trace spans.
+
+Every camera frame and audio segment gets a trace ID from new_trace(), and
+each stage it passes through records a timed span against that ID:
+
+    capture     reading the frame / audio
+    preprocess  flip, colour conversion, resizing
+    queue_wait  waiting for a scheduler slot or in an app queue
+    inference   the model call
+    classify    gesture classification, presence tracking
+    action      pyautogui / brightness / TTS
+    render      Tk widget updates
+
+Spans go into a bounded in-memory ring (MULTIMODAL_TRACE_SPANS, default
+20000, 0 turns tracing off) and are only serialized on demand, as Chrome
+trace JSON that chrome://tracing and https://ui.perfetto.dev open directly.
+Spans of one trace are linked with flow arrows across threads, and the
+trace ID is in each span's args. Dump with TRACER.dump(), SIGUSR2 (see
+install_dump_signal) or the Trace button in the main app; files go to
+MULTIMODAL_TRACE_DIR (default: the working directory).
+"""
+
+import os
+import json
+import time
+import signal
+import itertools
+import threading
+from collections import deque, namedtuple
+from contextlib import contextmanager
+
+TRACE_CAPACITY = int(os.environ.get("MULTIMODAL_TRACE_SPANS", "20000"))
+TRACE_DIR = os.environ.get("MULTIMODAL_TRACE_DIR", ".")
+
+Span = namedtuple("Span", ["trace", "name", "start", "end", "thread", "args"])
+
+
+class Tracer:
+    """Records spans into a ring and exports them as Chrome trace JSON"""
+
+    def __init__(self, capacity=TRACE_CAPACITY, clock=time.perf_counter):
+        self.enabled = capacity > 0
+        self.ring = deque(maxlen=max(1, capacity))
+        self.clock = clock
+        self.ids = itertools.count(1)
+        self.thread_names = {}
+
+    def new_trace(self, kind):
+        """A new trace ID such as 'frame-42' or 'audio-7' (None while disabled)"""
+        if not self.enabled:
+            return None
+        return f"{kind}-{next(self.ids)}"
+
+    def record(self, trace, name, start, end=None, **args):
+        """Record a span that has already happened (times from the tracer clock)"""
+        if trace is None or not self.enabled:
+            return
+        thread = threading.get_ident()
+        if thread not in self.thread_names:
+            self.thread_names[thread] = threading.current_thread().name
+        self.ring.append(Span(trace, name, start, self.clock() if end is None else end, thread, args))
+
+    @contextmanager
+    def span(self, trace, name, **args):
+        """Time the body as one span of trace"""
+        if trace is None or not self.enabled:
+            yield
+            return
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.record(trace, name, start, **args)
+
+    def spans(self, trace=None):
+        """Recorded spans, oldest first, optionally for one trace"""
+        spans = list(self.ring)
+        return spans if trace is None else [span for span in spans if span.trace == trace]
+
+    def clear(self):
+        self.ring.clear()
+
+    def chrome_trace(self):
+        """The ring as a Chrome trace event document"""
+        spans = sorted(self.spans(), key=lambda span: span.start)
+        pid = os.getpid()
+        origin = spans[0].start if spans else 0.0
+        events = [
+            {"ph": "M", "name": "thread_name", "pid": pid, "tid": thread, "args": {"name": name}}
+            for thread, name in list(self.thread_names.items())
+        ]
+        by_trace = {}
+        for span in spans:
+            events.append({
+                "ph": "X",
+                "name": span.name,
+                "cat": span.trace.rsplit("-", 1)[0],
+                "ts": round((span.start - origin) * 1e6, 3),
+                "dur": round((span.end - span.start) * 1e6, 3),
+                "pid": pid,
+                "tid": span.thread,
+                "args": dict(span.args, trace=span.trace),
+            })
+            by_trace.setdefault(span.trace, []).append(span)
+
+        # Flow arrows join the spans of one trace, across threads
+        for flow_id, (trace, trace_spans) in enumerate(by_trace.items(), 1):
+            if len(trace_spans) < 2:
+                continue
+            for i, span in enumerate(trace_spans):
+                phase = "s" if i == 0 else "f" if i == len(trace_spans) - 1 else "t"
+                event = {"ph": phase, "id": flow_id, "name": trace, "cat": "trace", "pid": pid,
+                         "tid": span.thread, "ts": round((span.start - origin) * 1e6, 3)}
+                if phase == "f":
+                    event["bp"] = "e"
+                events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump(self, path=None):
+        """Write the ring as Chrome trace JSON and return the file name"""
+        if path is None:
+            os.makedirs(TRACE_DIR, exist_ok=True)
+            path = os.path.join(TRACE_DIR, f"trace-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+        return path
+
+
+TRACER = Tracer()
+
+
+def install_dump_signal(tracer=TRACER, signum=None, on_dump=print):
+    """Dump the trace ring whenever the process gets SIGUSR2 (Unix only)
+
+    Returns False where the signal does not exist or this is not the main thread.
+    """
+    signum = signum or getattr(signal, "SIGUSR2", None)
+    if signum is None or threading.current_thread() is not threading.main_thread():
+        return False
+
+    def handler(signum, frame):
+        # Write from a thread: the handler runs between bytecodes of whatever was interrupted
+        threading.Thread(target=lambda: on_dump(f"🧵 Trace written to {tracer.dump()}"), daemon=True).start()
+
+    signal.signal(signum, handler)
+    return True
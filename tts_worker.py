@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Non-blocking text-to-speech for EVA.
+
+A dedicated worker thread owns the pyttsx3 engine, so callers on the
+asyncio loop never wait for an utterance to finish. Phrases are rendered
+to audio once and kept in a small LRU cache, repeated phrases are dropped,
+the queue is bounded (the oldest pending phrase gives way), and newer
+speech cuts off whatever is playing. If the engine cannot be started the
+error is logged once and speak() returns False from then on.
+"""
+
+import os
+import time
+import queue
+import wave
+import tempfile
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+class TTSWorker:
+    """Background speech worker with dedup, phrase cache and barge-in"""
+
+    def __init__(self, rate=170, voice_hint="female", max_queue=3,
+                 dedup_seconds=8.0, cache_size=32, engine_factory=None):
+        self.rate = rate
+        self.voice_hint = voice_hint
+        self.dedup_seconds = dedup_seconds
+        self.cache_size = cache_size
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.cache = OrderedDict()      # text -> (samples, sample_rate)
+        self.recent = {}                # text -> time it was last accepted
+        self.interrupted = threading.Event()
+        self.running = False
+        self.thread = None
+        self.engine = None
+        self.engine_factory = engine_factory
+        self.error = None               # why the engine could not start, if it could not
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="tts-worker", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.clear()
+        self.interrupt()
+        try:
+            self.queue.put_nowait(None)
+        except queue.Full:
+            pass
+
+    def speak(self, text, interrupt=True):
+        """Queue text for speaking; returns False if it was dropped"""
+        text = " ".join(str(text).split())
+        if not text or self.error is not None:
+            return False
+        now = time.monotonic()
+        if now - self.recent.get(text, -self.dedup_seconds) < self.dedup_seconds:
+            return False
+        self.recent = {t: ts for t, ts in self.recent.items() if now - ts < self.dedup_seconds}
+        self.recent[text] = now
+
+        if interrupt:
+            self.interrupt()
+        while True:
+            try:
+                self.queue.put_nowait(text)
+                return True
+            except queue.Full:
+                # Drop the oldest pending phrase, newer speech matters more
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def interrupt(self):
+        """Cut off the phrase being spoken; pending phrases still play"""
+        self.interrupted.set()
+
+    def clear(self):
+        """Drop every pending phrase"""
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                break
+
+    def _create_engine(self):
+        if self.engine_factory is not None:
+            return self.engine_factory()
+        import pyttsx3
+        return pyttsx3.init()
+
+    def _run(self):
+        try:
+            self.engine = self._create_engine()
+        except Exception as e:
+            # No speech from now on; speak() turns text away instead of queueing it
+            self.error = e
+            self.running = False
+            self.clear()
+            print(f"[TTS] Text-to-speech unavailable: {e}")
+            return
+        self.engine.setProperty('rate', self.rate)
+        for voice in self.engine.getProperty('voices'):
+            if self.voice_hint and self.voice_hint in voice.name.lower():
+                self.engine.setProperty('voice', voice.id)
+                break
+
+        while self.running:
+            text = self.queue.get()
+            if text is None:
+                break
+            self.interrupted.clear()
+            try:
+                audio = self._render(text)
+                if audio is None:
+                    # Engine cannot render to a file here, speak directly
+                    self.engine.say(text)
+                    self.engine.runAndWait()
+                else:
+                    self._play(*audio)
+            except Exception as e:
+                print(f"[TTS] Error speaking '{text}': {e}")
+
+    def _render(self, text):
+        if text in self.cache:
+            self.cache.move_to_end(text)
+            return self.cache[text]
+
+        path = os.path.join(tempfile.gettempdir(), f"eva_tts_{os.getpid()}_{threading.get_ident()}.wav")
+        try:
+            self.engine.save_to_file(text, path)
+            self.engine.runAndWait()
+            with wave.open(path, 'rb') as wf:
+                sample_rate = wf.getframerate()
+                channels = wf.getnchannels()
+                frames = wf.readframes(wf.getnframes())
+                if wf.getsampwidth() != 2 or not frames:
+                    return None
+        except (OSError, EOFError, wave.Error):
+            return None
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+        samples = np.frombuffer(frames, dtype=np.int16).reshape(-1, channels).astype(np.float32) / 32768.0
+        self.cache[text] = (samples, sample_rate)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return samples, sample_rate
+
+    def _play(self, samples, sample_rate):
+        import sounddevice as sd
+        if self.interrupted.is_set():
+            return
+        sd.play(samples, sample_rate)
+        end = time.monotonic() + len(samples) / sample_rate
+        while time.monotonic() < end:
+            if self.interrupted.wait(0.02):
+                sd.stop()
+                return
+        sd.wait()